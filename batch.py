@@ -0,0 +1,325 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext, redirect_stdout
+
+import util.grammar as gram
+from parser import LL1
+from scanner import iter_tokens
+from util.create_transition_table import get_compiled_transition_table
+from util.result_cache import MAX_BYTES, RESULTS_DIR, ResultCache
+from util.shared_tables import SharedTables
+from util.stats import Stats
+from util.symbol_table import SymbolTable
+from util.token_dict import TOKENS
+from util.token_stream import TokenBuffer
+
+GRAMMAR_TXT = os.path.join(os.path.dirname(__file__), "util", "grammar.txt")
+
+# grammar and compiled tables, loaded once per worker process
+_grammar = None
+_parse_table = None
+_transition_table = None  # None scans with the scanner's own table
+_shared_tables = None  # kept alive so the shared block stays mapped
+_result_cache = None  # None checks every file
+_cache_reported = None  # counters of _result_cache already returned with a result
+_collect_stats = False
+
+
+def init_worker(grammar_file: str = GRAMMAR_TXT, shared_layout: dict = None, cache_dir: str = None,
+                cache_bytes: int = MAX_BYTES, collect_stats: bool = False):
+    """
+    Loads the grammar tables for the current process.
+
+    args
+        grammar_file: location of the grammar .txt
+        shared_layout: layout of tables published with SharedTables, mapped instead of loading and
+            compiling the grammar
+        cache_dir: directory of a ResultCache to answer unchanged files from
+        cache_bytes: size bound of the ResultCache
+        collect_stats: record a Stats for every file checked
+    """
+    global _grammar, _parse_table, _transition_table, _shared_tables, _result_cache, _cache_reported, _collect_stats
+
+    _collect_stats = collect_stats
+
+    if cache_dir is not None:
+        _result_cache = ResultCache(cache_dir, cache_bytes, grammar_file)
+        _cache_reported = {"hits": 0, "misses": 0, "evictions": 0}
+
+    if shared_layout is None:
+        grammar, non_terminals, terminals, productions, parse_table = gram.load_grammar_tables(
+            grammar_file)
+        _grammar = grammar
+        _parse_table = gram.compile_parse_table(grammar, parse_table, TOKENS)
+    else:
+        # everything LL1 needs is in the shared tables, the grammar dict is never loaded
+        _grammar = None
+        _shared_tables = SharedTables.attach(shared_layout)
+        _parse_table = _shared_tables.parse_table
+        _transition_table = _shared_tables.transition_table
+
+
+def release_worker():
+    """
+    Unmaps the shared tables of the current process, if any, so their block can be freed.
+    """
+    global _parse_table, _transition_table, _shared_tables
+
+    if _shared_tables is not None:
+        # views into the block must go before it is closed
+        _parse_table = None
+        _transition_table = None
+        _shared_tables.close()
+        _shared_tables = None
+
+
+def collect_files(paths: list, extension: str = ".txt") -> list:
+    """
+    Expands directories into the source files they contain.
+
+    args
+        paths: files and directories
+        extension: extension of source files looked for in directories
+
+    returns
+        sorted list of source files
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                files.extend(os.path.join(root, name)
+                             for name in names if name.endswith(extension))
+        else:
+            files.append(path)
+    return sorted(files)
+
+
+def check_file(code_file: str) -> dict:
+    """
+    Scans and parses a single file.
+
+    returns
+        result: dict with the file, whether it passed, its first error, whether it was answered
+            from the result cache and timings in seconds, plus its Stats as a dict if collected and
+            the hits, misses and evictions of the result cache since the last file if there is one
+    """
+    if _parse_table is None:
+        init_worker()
+
+    result = _check_file(code_file)
+
+    if _result_cache is not None:
+        # only what changed since the last result, so run_batch can add them up across workers
+        counters = _result_cache.stats()
+        result["cache"] = {counter: counters[counter] - n for counter, n in _cache_reported.items()}
+        for counter in _cache_reported:
+            _cache_reported[counter] = counters[counter]
+
+    return result
+
+
+def _check_file(code_file: str) -> dict:
+    """
+    check_file without the result cache counters.
+    """
+    result = {"file": code_file, "passed": False, "error": None, "cached": False,
+              "tokens": 0, "scan_seconds": 0.0, "parse_seconds": 0.0}
+
+    key = None
+    if _result_cache is not None:
+        try:
+            key = _result_cache.key(code_file)
+        except OSError as e:
+            result["error"] = str(e)
+            return result
+        cached = _result_cache.get(key)
+        if cached is not None:
+            result["passed"] = cached["passed"]
+            result["error"] = cached["error"]
+            result["cached"] = True
+            result["tokens"] = len(cached["tokens"])
+            return result
+
+    stats = Stats() if _collect_stats else None
+
+    start = time.perf_counter()
+    scanned = None  # time scanning ended
+    scanner_output = TokenBuffer()
+    number_symbol_table = SymbolTable()
+    identifier_symbol_table = SymbolTable()
+    try:
+        with stats.phase("scanner") if stats is not None else nullcontext():
+            scanner_output.extend(iter_tokens(code_file, number_symbol_table, identifier_symbol_table,
+                                              transition_table=_transition_table, stats=stats))
+        scanned = time.perf_counter()
+        result["tokens"] = len(scanner_output)
+
+        # parser error context goes to stderr so stdout only carries the report
+        with redirect_stdout(sys.stderr):
+            LL1(_grammar, _parse_table, scanner_output,
+                identifier_symbol_table.to_list(), stats=stats)
+        result["passed"] = True
+    except Exception as e:
+        result["error"] = str(e)
+    end = time.perf_counter()
+
+    if stats is not None:
+        stats.count("files")
+        stats.count("tokens", len(scanner_output))
+        result["stats"] = stats.to_dict()
+
+    if scanned is None:  # failed while scanning
+        result["scan_seconds"] = end - start
+    else:
+        result["scan_seconds"] = scanned - start
+        result["parse_seconds"] = end - scanned
+
+    if key is not None:
+        if scanned is None:  # tokens before a lexical error are not a scanner output
+            scanner_output = TokenBuffer()
+        _result_cache.put(key, scanner_output, number_symbol_table, identifier_symbol_table,
+                          result["passed"], result["error"])
+
+    return result
+
+
+def run_batch(paths: list, workers: int = None, grammar_file: str = GRAMMAR_TXT, shared_tables: bool = False,
+              cache_dir: str = None, cache_bytes: int = MAX_BYTES, collect_stats: bool = False) -> dict:
+    """
+    Checks every source file in paths, spread across a pool of worker processes.
+
+    args
+        paths: files and directories to check
+        workers: number of worker processes, os.cpu_count() if None. 1 checks in this process.
+        grammar_file: location of the grammar .txt
+        shared_tables: compile the tables once and share them with the workers through shared memory
+        cache_dir: answer unchanged files from a ResultCache in this directory, None checks every file
+        cache_bytes: size bound of the ResultCache
+        collect_stats: add the Stats of all checked files, merged, to the report as "stats"
+
+    returns
+        report: dict with totals, throughput and the result of every file. tokens_per_second only
+            counts the tokens of files that were scanned, not answered from the cache.
+    """
+    files = collect_files(paths)
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    published = None
+    shared_layout = None
+    if shared_tables:
+        grammar, non_terminals, terminals, productions, parse_table = gram.load_grammar_tables(
+            grammar_file)
+        published = SharedTables.publish(get_compiled_transition_table(),
+                                         gram.compile_parse_table(grammar, parse_table, TOKENS))
+        shared_layout = published.layout
+    initargs = (grammar_file, shared_layout,
+                cache_dir, cache_bytes, collect_stats)
+
+    try:
+        if workers == 1:
+            init_worker(*initargs)
+            results = [check_file(code_file) for code_file in files]
+        else:
+            # several files per task so small files do not pay one round trip each
+            chunksize = max(1, len(files) // (workers * 8))
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                     initargs=initargs) as executor:
+                results = list(executor.map(
+                    check_file, files, chunksize=chunksize))
+    finally:
+        if published is not None:
+            release_worker()
+            published.unlink()
+    seconds = time.perf_counter() - start
+
+    stats = Stats()
+    cache = {"hits": 0, "misses": 0, "evictions": 0}
+    for result in results:
+        if "stats" in result:
+            stats.merge(result.pop("stats"))
+        for counter, n in result.pop("cache", {}).items():
+            cache[counter] += n
+
+    passed = sum(result["passed"] for result in results)
+    # cached files were not scanned, their tokens would inflate the throughput
+    scanned_tokens = sum(result["tokens"] for result in results if not result["cached"])
+    return {
+        "files": len(results),
+        "passed": passed,
+        "failed": len(results) - passed,
+        "workers": workers,
+        "cache_hits": cache["hits"],
+        "cache_misses": cache["misses"],
+        "cache_evictions": cache["evictions"],
+        "seconds": seconds,
+        "files_per_second": len(results) / seconds if seconds else 0.0,
+        "tokens_per_second": scanned_tokens / seconds if seconds else 0.0,
+        "results": results,
+        "stats": stats.to_dict() if collect_stats else None,
+    }
+
+
+def show_report(report: dict) -> str:
+    """
+    Formats a batch report as one line per file plus a summary.
+    """
+    s = ""
+    for result in report["results"]:
+        status = "PASS" if result["passed"] else "FAIL"
+        seconds = result["scan_seconds"] + result["parse_seconds"]
+        s += f"{status}\t{seconds * 1000:.1f}ms\t{result['file']}"
+        if result["error"]:
+            s += f"\t{result['error']}"
+        s += "\n"
+    s += (f"{report['passed']}/{report['files']} passed in {report['seconds']:.2f}s "
+          f"with {report['workers']} workers ({report['files_per_second']:.1f} files/s, "
+          f"{report['tokens_per_second']:.0f} tokens/s)\n")
+    if report["cache_hits"] or report["cache_misses"]:
+        s += (f"result cache: {report['cache_hits']} hits, {report['cache_misses']} misses, "
+              f"{report['cache_evictions']} evictions\n")
+    return s
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Scan and parse many C- files in parallel.")
+    arg_parser.add_argument("paths", nargs="+",
+                            help="source files or directories")
+    arg_parser.add_argument("-j", "--workers", type=int, default=None,
+                            help="worker processes (default: number of cores)")
+    arg_parser.add_argument("--grammar", default=GRAMMAR_TXT,
+                            help="grammar .txt file")
+    arg_parser.add_argument("--shared-tables", action="store_true",
+                            help="share the compiled tables with workers through shared memory")
+    arg_parser.add_argument("--cache", nargs="?", const=RESULTS_DIR, default=None, metavar="DIR",
+                            help=f"answer unchanged files from a result cache (default dir: {RESULTS_DIR})")
+    arg_parser.add_argument("--cache-size", type=int, default=MAX_BYTES // 2**20, metavar="MB",
+                            help="size bound of the result cache in MB")
+    arg_parser.add_argument("--stats", default=None, metavar="FILE",
+                            help="write per-phase stats to FILE, in Prometheus text format if it ends in .prom, JSON otherwise")
+    arg_parser.add_argument("--json", action="store_true",
+                            help="print the report as JSON")
+    args = arg_parser.parse_args()
+
+    report = run_batch(args.paths, args.workers, args.grammar, args.shared_tables,
+                       args.cache, args.cache_size * 2**20, args.stats is not None)
+
+    if args.stats is not None:
+        stats = Stats()
+        stats.merge(report["stats"])
+        with open(args.stats, "w") as f:
+            f.write(stats.to_prometheus() if args.stats.endswith(
+                ".prom") else stats.to_json(indent=2))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(show_report(report), end="")
+
+    sys.exit(0 if report["failed"] == 0 else 1)
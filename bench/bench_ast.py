@@ -0,0 +1,70 @@
+"""
+Benchmark for building the parse tree in LL1.
+
+Parses programs with thousands of small functions with and without build_tree, and reports the
+parse time overhead and the memory held by the tree, per node.
+
+Run from the repository root:
+    python -m bench.bench_ast
+"""
+import contextlib
+import os
+import tempfile
+import time
+import tracemalloc
+
+import util.grammar as gram
+from bench.generate import make_name
+from parser import LL1
+from scanner import run_scanner
+from util.syntax_tree import tree_memory
+from util.token_dict import TOKENS
+
+SIZES = [500, 2000, 4000]
+
+
+def functions_program(n: int) -> str:
+    functions = "".join(
+        f"int {make_name('g', i)}(int x) {{\n    int y;\n    y = x * 2 + 1;\n"
+        f"    while (y > 10) {{ y = y - 1; }}\n    return y;\n}}\n" for i in range(n))
+    return f"{functions}void main(void){{ int z; z = {make_name('g', n - 1)}(3); }}\n"
+
+
+if __name__ == "__main__":
+    grammar, non_terminals, terminals, productions, parse_table = gram.load_grammar_tables(
+        "util/grammar.txt")
+    compiled = gram.compile_parse_table(grammar, parse_table, TOKENS)
+
+    print(f"{'functions':>9}  {'tokens':>8}  {'plain':>8}  {'tree':>8}  {'nodes':>8}  "
+          f"{'tree MB':>8}  {'B/node':>6}  {'peak MB':>8}")
+    for n in SIZES:
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            f.write(functions_program(n))
+        try:
+            with contextlib.redirect_stdout(open(os.devnull, "w")):
+                scanner_output, numbers, identifiers = run_scanner(f.name)
+        finally:
+            os.unlink(f.name)
+
+        start = time.perf_counter()
+        LL1(grammar, compiled, scanner_output, list(identifiers))
+        plain = time.perf_counter() - start
+
+        start = time.perf_counter()
+        root = LL1(grammar, compiled, scanner_output,
+                   list(identifiers), build_tree=True)
+        tree = time.perf_counter() - start
+
+        memory = tree_memory(root)
+        del root
+
+        # peak traced memory of a whole tree-building parse, symbol table included
+        tracemalloc.start()
+        root = LL1(grammar, compiled, scanner_output,
+                   list(identifiers), build_tree=True)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del root
+
+        print(f"{n:>9}  {len(scanner_output):>8}  {plain:>7.3f}s  {tree:>7.3f}s  {memory['nodes']:>8}  "
+              f"{memory['bytes'] / 2**20:>8.1f}  {memory['bytes_per_node']:>6.1f}  {peak / 2**20:>8.1f}")
@@ -0,0 +1,70 @@
+"""
+Benchmark for the generated recursive-descent parser against the table-driven LL1.
+
+Parses synthetic programs with both and checks they agree, and that descent_parser.py is up to
+date with util/grammar.txt.
+
+Run from the repository root:
+    python -m bench.bench_descent
+"""
+import contextlib
+import os
+import tempfile
+import time
+
+import descent_parser
+import util.grammar as gram
+from bench.generate import generate_program
+from parser import LL1
+from scanner import run_scanner
+from util.token_dict import TOKENS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = [10, 50, 200]
+REPEAT = 5
+
+
+def best_time(function) -> float:
+    best = None
+    for i in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+if __name__ == "__main__":
+    grammar, non_terminals, terminals = gram.get_grammar_from_txt(
+        os.path.join(ROOT, "util", "grammar.txt"))
+    first_sets = gram.get_first_sets(grammar, non_terminals)
+    follow_sets = gram.get_follow_sets(grammar, non_terminals, first_sets)
+    first_plus_sets = gram.get_first_plus_sets(
+        grammar, non_terminals, first_sets, follow_sets)
+    with open(os.path.join(ROOT, "descent_parser.py")) as f:
+        if f.read() != gram.generate_parser(grammar, first_plus_sets):
+            print("descent_parser.py is out of date, regenerate with: python util/grammar.py")
+
+    parse_table = gram.compile_parse_table(
+        grammar, gram.create_parse_table(grammar, terminals, first_plus_sets), TOKENS)
+
+    print(f"{'functions':>9}  {'tokens':>8}  {'LL1':>9}  {'descent':>9}  {'speedup':>7}")
+    for n in SIZES:
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            f.write(generate_program(n, identifiers=50))
+        try:
+            with contextlib.redirect_stdout(open(os.devnull, "w")):
+                scanner_output, numbers, identifiers = run_scanner(f.name)
+        finally:
+            os.unlink(f.name)
+
+        assert LL1(grammar, parse_table, scanner_output, list(identifiers))
+        assert descent_parser.parse(scanner_output, list(identifiers))
+
+        table_driven = best_time(lambda: LL1(
+            grammar, parse_table, scanner_output, list(identifiers)))
+        descent = best_time(lambda: descent_parser.parse(
+            scanner_output, list(identifiers)))
+
+        print(f"{n:>9}  {len(scanner_output):>8}  {table_driven:>8.4f}s  {descent:>8.4f}s  "
+              f"{table_driven / descent:>6.1f}x")
@@ -0,0 +1,65 @@
+"""
+Micro-benchmark for production expansion in LL1.
+
+Compares slicing the RHS of each production and scanning it for ε on every expansion against
+extending the stack with the precomputed expansions of CompiledParseTable.
+
+Run from the repository root:
+    python -m bench.bench_expansions
+"""
+import time
+
+import util.grammar as gram
+from util.token_dict import TOKENS
+
+REPEATS = 5
+EXPANSIONS = 1_000_000
+
+
+def expand_sliced(productions: dict, sequence: list, epsilon: int):
+    stack = []
+    for production_number in sequence:
+        production_symbols = productions[production_number]
+        if epsilon not in production_symbols:
+            stack.extend(production_symbols[:0:-1])
+        stack.clear()
+
+
+def expand_precomputed(expansions: list, sequence: list):
+    stack = []
+    for production_number in sequence:
+        stack.extend(expansions[production_number])
+        stack.clear()
+
+
+def best_time(fun, *args) -> float:
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fun(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    grammar, non_terminals, terminals = gram.get_grammar_from_txt(
+        "util/grammar.txt")
+    first_sets = gram.get_first_sets(grammar, non_terminals)
+    follow_sets = gram.get_follow_sets(grammar, non_terminals, first_sets)
+    first_plus_sets = gram.get_first_plus_sets(
+        grammar, non_terminals, first_sets, follow_sets)
+    parse_table = gram.compile_parse_table(grammar, gram.create_parse_table(
+        grammar, terminals, first_plus_sets), TOKENS)
+
+    # every production, in turn, until EXPANSIONS are reached
+    production_numbers = list(parse_table.productions)
+    sequence = (production_numbers * (EXPANSIONS //
+                len(production_numbers) + 1))[:EXPANSIONS]
+
+    before = best_time(expand_sliced, parse_table.productions,
+                       sequence, parse_table.EPSILON)
+    after = best_time(expand_precomputed, parse_table.expansions, sequence)
+
+    print(f"sliced RHS:      {EXPANSIONS / before:,.0f} expansions/s")
+    print(f"precomputed RHS: {EXPANSIONS / after:,.0f} expansions/s")
+    print(f"speedup:         {before / after:.2f}x")
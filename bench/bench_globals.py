@@ -0,0 +1,49 @@
+"""
+Benchmark for declaring many globals in LL1.
+
+Parses programs with thousands of global variables followed by main(). With the live global index
+each global costs the same, so time per global should stay flat as the count grows.
+
+Run from the repository root:
+    python -m bench.bench_globals
+"""
+import contextlib
+import os
+import tempfile
+import time
+
+import util.grammar as gram
+from bench.generate import make_name
+from parser import LL1
+from scanner import run_scanner
+from util.token_dict import TOKENS
+
+SIZES = [1000, 2000, 4000, 8000]
+
+
+def globals_program(n: int) -> str:
+    declarations = "".join(f"int {make_name('g', i)};\n" for i in range(n))
+    return f"{declarations}void main(void){{ {make_name('g', n - 1)} = 1; }}\n"
+
+
+if __name__ == "__main__":
+    grammar, non_terminals, terminals, productions, parse_table = gram.load_grammar_tables(
+        "util/grammar.txt")
+    parse_table = gram.compile_parse_table(grammar, parse_table, TOKENS)
+
+    print(f"{'globals':>8} {'parse':>9} {'per global':>11}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n in SIZES:
+            code_file = os.path.join(tmp_dir, f"globals{n}.txt")
+            with open(code_file, "w") as f:
+                f.write(globals_program(n))
+
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                scanner_output, number_symbol_table, identifier_symbol_table = run_scanner(
+                    code_file)
+                start = time.perf_counter()
+                LL1(grammar, parse_table, scanner_output,
+                    identifier_symbol_table)
+                elapsed = time.perf_counter() - start
+
+            print(f"{n:>8} {elapsed:>8.3f}s {elapsed / n * 1e6:>9.1f}us")
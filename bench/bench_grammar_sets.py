@@ -0,0 +1,137 @@
+"""
+Checks and benchmarks the worklist FIRST/FOLLOW computation in util/grammar.py.
+
+First confirms that FIRST, FOLLOW and FIRST+ for util/grammar.txt match util/sets/*.txt, then times
+the worklist algorithms against repeating full passes until nothing changes, over synthetic grammars
+with hundreds of non-terminals.
+
+Run from the repository root:
+    python -m bench.bench_grammar_sets
+"""
+import copy
+import re
+import time
+
+import util.grammar as gram
+
+SIZES = [100, 200, 400, 800]
+
+
+def read_sets(txt_name: str) -> dict:
+    """
+    Reads sets in the format "TYPE(key) = {a, b}" written by util/grammar.py, or "key    {a, b}".
+    """
+    sets = {}
+    with open(txt_name, encoding="utf-8") as f:
+        for entry in f.read().split("\n"):
+            if entry == "":
+                continue
+            if ") = {" in entry:
+                key, values = entry.rsplit(") = {", 1)
+                key = key.split("(", 1)[1]
+            else:
+                key, values = re.split(r"\s{2,}", entry, 1)
+                values = values[1:]
+            values = values[:-1]
+            sets[key] = set(values.split(", ")) if values else set()
+    return sets
+
+
+def check_sets():
+    grammar, non_terminals, terminals = gram.get_grammar_from_txt(
+        "util/grammar.txt")
+    first_sets = gram.get_first_sets(grammar, non_terminals)
+    follow_sets = gram.get_follow_sets(grammar, non_terminals, first_sets)
+    first_plus_sets = gram.get_first_plus_sets(
+        grammar, non_terminals, copy.deepcopy(first_sets), follow_sets)
+
+    assert first_sets == read_sets("util/sets/FIRST.txt")
+    assert follow_sets == read_sets("util/sets/FOLLOW.txt")
+    assert first_plus_sets == read_sets("util/sets/FIRST+.txt")
+    print("FIRST, FOLLOW and FIRST+ match util/sets/")
+
+
+def synthetic_grammar(n: int) -> tuple:
+    """
+    Grammar with n non-terminals, a cycle of nullable productions that makes first sets flow
+    through every non-terminal, and cross references that make follow sets do the same.
+    """
+    grammar = {}
+    for i in range(n):
+        grammar[f"A{i}"] = [[f"A{(i + 1) % n}", f"a{i}"],
+                            [f"b{i}", f"A{(i * 7 + 3) % n}", f"A{(i + 5) % n}"],
+                            ["ε"]]
+    non_terminals = set(grammar)
+    return grammar, non_terminals
+
+
+def passes_first_sets(grammar: dict, non_terminals: set) -> dict:
+    """
+    Reference: recompute every first set in full passes until a pass changes nothing.
+    """
+    first_sets = {symbol: set() for symbol in grammar}
+    changed = True
+    while changed:
+        changed = False
+        for symbol in grammar:
+            current_set = set()
+            for production in grammar[symbol]:
+                current_set.update(gram.first_of_sequence(
+                    production, non_terminals, first_sets))
+            if current_set != first_sets[symbol]:
+                first_sets[symbol] = current_set
+                changed = True
+    return first_sets
+
+
+def passes_follow_sets(grammar: dict, non_terminals: set, first_sets: dict) -> dict:
+    """
+    Reference: apply every follow rule in full passes until a pass changes nothing.
+    """
+    follow = {symbol: set() for symbol in grammar}
+    follow[next(iter(grammar))].add("$")
+    changed = True
+    while changed:
+        changed = False
+        for key in grammar:
+            for production in grammar[key]:
+                for j, symbol in enumerate(production):
+                    if symbol not in non_terminals:
+                        continue
+                    rest_first = gram.first_of_sequence(
+                        production[j+1:], non_terminals, first_sets)
+                    if "ε" in rest_first:
+                        rest_first.remove("ε")
+                        rest_first.update(follow[key])
+                    if not rest_first <= follow[symbol]:
+                        follow[symbol].update(rest_first)
+                        changed = True
+    return follow
+
+
+def timed(fun, *args) -> tuple:
+    start = time.perf_counter()
+    result = fun(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    check_sets()
+
+    print(f"{'nts':>5} {'worklist FIRST':>15} {'passes FIRST':>13} {'worklist FOLLOW':>16} {'passes FOLLOW':>14}")
+    for n in SIZES:
+        grammar, non_terminals = synthetic_grammar(n)
+
+        first_sets, worklist_first = timed(
+            gram.get_first_sets, grammar, non_terminals)
+        reference_first, passes_first = timed(
+            passes_first_sets, grammar, non_terminals)
+        assert first_sets == reference_first
+
+        follow_sets, worklist_follow = timed(
+            gram.get_follow_sets, grammar, non_terminals, first_sets)
+        reference_follow, passes_follow = timed(
+            passes_follow_sets, grammar, non_terminals, first_sets)
+        assert follow_sets == reference_follow
+
+        print(f"{n:>5} {worklist_first:>14.3f}s {passes_first:>12.3f}s {worklist_follow:>15.3f}s {passes_follow:>13.3f}s")
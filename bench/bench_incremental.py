@@ -0,0 +1,123 @@
+"""
+Check and benchmark for the incremental scanner against scanning the whole source again.
+
+Replays a session of editor edits on synthetic programs: typing and deleting at a cursor that
+sometimes jumps, plus edits opening and closing comments. Every few edits the incremental output
+is compared with a full scan by the dfa scanner, which must yield the same tokens, symbol tables
+and lexical errors. Then the time per edit is compared with a full scan: the median
+is a typical keystroke, the mean includes edits opening a comment that hides the rest of the source.
+
+Run from the repository root:
+    python -m bench.bench_incremental --sizes 50 500
+"""
+import argparse
+import io
+import random
+import statistics
+import sys
+import time
+
+from bench.generate import generate_program
+from incremental_scanner import IncrementalScanner
+from scanner import get_backend
+from util.stats import Stats
+from util.symbol_table import SymbolTable
+
+# text typed or pasted by the session, the comment markers open and close comments
+SNIPPETS = ["x", "i", "1", " ", "\n", ";", "(", ")", "=", "==", "<", "/", "*", "/*", "*/",
+            "int y;\n", "if (x < 10) {\n", "}\n", "return x + 1;\n", "/* note */"]
+
+
+def full_scan(source: str, backend: str = "dfa"):
+    """
+    returns
+        tokens, numbers and identifiers as run_scanner returns them, or the lexical error
+    """
+    numbers = SymbolTable()
+    identifiers = SymbolTable()
+    try:
+        tokens = list(get_backend(backend)(io.StringIO(source), numbers, identifiers))
+    except Exception as e:
+        return str(e)
+    return tokens, numbers.to_list(), identifiers.to_list()
+
+
+def incremental_output(incremental: IncrementalScanner):
+    try:
+        return incremental.output()
+    except Exception as e:
+        return str(e)
+
+
+def edits(source: str, n: int, seed: int):
+    """
+    Generates n edits (start, end, text) of an editing session on source, each one applying to
+    the source left by the ones before.
+
+    yields
+        start, end and text of each edit
+    """
+    rnd = random.Random(seed)
+    length = len(source)
+    cursor = rnd.randint(0, length)
+    for i in range(n):
+        if rnd.random() < 0.05:  # jump somewhere else
+            cursor = rnd.randint(0, length)
+        if rnd.random() < 0.3 and cursor > 0:  # backspace
+            deleted = min(cursor, rnd.choice([1, 1, 1, 5]))
+            yield cursor - deleted, cursor, ""
+            cursor -= deleted
+            length -= deleted
+        else:
+            text = rnd.choice(SNIPPETS)
+            yield cursor, cursor, text
+            cursor += len(text)
+            length += len(text)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Check and time the incremental scanner on simulated editing sessions.")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500],
+                            help="number of functions of each edited program")
+    arg_parser.add_argument("--edits", type=int, default=500,
+                            help="edits per session")
+    arg_parser.add_argument("--check-every", type=int, default=25,
+                            help="compare with a full scan every this many edits")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    failed = False
+    print(f"{'functions':>9}  {'chars':>8}  {'full scan':>10}  {'median edit':>11}  {'mean edit':>10}  "
+          f"{'chars/edit':>10}  {'speedup':>7}")
+    for size in args.sizes:
+        source = generate_program(size, identifiers=50, comment_density=0.2, seed=args.seed)
+        incremental = IncrementalScanner(source)
+
+        session = list(edits(source, args.edits, args.seed))
+        stats = Stats()
+        incremental.stats = stats
+        seconds = []
+        for i, (start, end, text) in enumerate(session):
+            begin = time.perf_counter()
+            incremental.edit(start, end, text)
+            seconds.append(time.perf_counter() - begin)
+            source = source[:start] + text + source[end:]
+
+            if (i + 1) % args.check_every == 0 or i + 1 == len(session):
+                expected = full_scan(source)
+                if incremental_output(incremental) != expected:
+                    failed = True
+                    print(f"{size} functions, edit {i} {(start, end, text)!r}: "
+                          f"incremental scanner differs from a full scan")
+                    break
+
+        begin = time.perf_counter()
+        full_scan(source, "regex")
+        full = time.perf_counter() - begin
+        median = statistics.median(seconds)
+        print(f"{size:>9}  {len(source):>8}  {full * 1000:>8.2f}ms  {median * 1000:>9.3f}ms  "
+              f"{statistics.mean(seconds) * 1000:>8.3f}ms  "
+              f"{stats.counters.get('chars', 0) / len(session):>10.0f}  {full / median:>6.0f}x")
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,137 @@
+"""
+Check and benchmark for the incremental parser against scanning and parsing the whole source again.
+
+Replays a session of typing on synthetic programs: assignments are typed one char at a time
+before a statement of some function and sometimes deleted again with backspace, so most edits
+leave the program with a syntax error until the statement is complete. Every few edits the
+incremental result is compared with run_scanner and LL1 on the whole source, which must accept
+or raise the same error. Then the time per edit is compared with the full pipeline.
+
+Run from the repository root:
+    python -m bench.bench_incremental_parser --sizes 50 500
+"""
+import argparse
+import contextlib
+import io
+import random
+import re
+import statistics
+import sys
+import time
+
+import util.grammar as gram
+from bench.generate import generate_program
+from incremental_parser import IncrementalParser
+from parser import LL1
+from scanner import run_scanner
+from util.stats import Stats
+from util.token_dict import TOKENS
+
+# assignment statements, the assigned variable is in scope there
+ASSIGNMENT = re.compile(r"^( +)([a-z]+) = ", re.MULTILINE)
+
+
+def full_parse(source: str, grammar: dict, parse_table) -> str:
+    """
+    returns
+        repr of LL1's result on the whole source, or its error
+    """
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):  # syntax errors print the production
+            scanner_output, number_symbol_table, identifier_symbol_table = run_scanner(io.StringIO(source))
+            return repr(LL1(grammar, parse_table, scanner_output, identifier_symbol_table))
+    except Exception as e:
+        return str(e)
+
+
+def incremental_edit(parser: IncrementalParser, start: int, end: int, text: str) -> str:
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return repr(parser.edit(start, end, text))
+    except Exception as e:
+        return str(e)
+
+
+def edits(source: str, n: int, seed: int):
+    """
+    Generates n edits (start, end, text) of a typing session on source, each one applying to the
+    source left by the ones before.
+
+    yields
+        start, end and text of each edit
+    """
+    rnd = random.Random(seed)
+    i = 0
+    while i < n:
+        statements = list(ASSIGNMENT.finditer(source))
+        if not statements:
+            return
+        statement = rnd.choice(statements)
+        indent, name = statement.groups()
+        typed = f"{indent}{name} = {name} + 1;\n"
+        cursor = statement.start()
+        for char in typed:
+            yield cursor, cursor, char
+            cursor += 1
+        source = source[:statement.start()] + typed + source[statement.start():]
+        i += len(typed)
+        if rnd.random() < 0.5:  # delete it again
+            for _ in typed:
+                yield cursor - 1, cursor, ""
+                cursor -= 1
+            source = source[:statement.start()] + source[statement.start() + len(typed):]
+            i += len(typed)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Check and time the incremental parser on simulated typing sessions.")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500],
+                            help="number of functions of each edited program")
+    arg_parser.add_argument("--edits", type=int, default=500,
+                            help="edits per session")
+    arg_parser.add_argument("--check-every", type=int, default=25,
+                            help="compare with a full parse every this many edits")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    grammar, non_terminals, terminals, productions, parse_table = gram.load_grammar_tables(
+        "util/grammar.txt")
+    parse_table = gram.compile_parse_table(grammar, parse_table, TOKENS)
+
+    failed = False
+    print(f"{'functions':>9}  {'tokens':>8}  {'full parse':>10}  {'median edit':>11}  {'mean edit':>10}  "
+          f"{'decls/edit':>10}  {'speedup':>7}")
+    for size in args.sizes:
+        source = generate_program(size, identifiers=50, comment_density=0.2, seed=args.seed)
+        parser = IncrementalParser(source, grammar, parse_table)
+        parser.parse()
+
+        session = list(edits(source, args.edits, args.seed))
+        stats = Stats()
+        parser.stats = stats
+        parser.scanner.stats = stats
+        seconds = []
+        for i, (start, end, text) in enumerate(session):
+            begin = time.perf_counter()
+            result = incremental_edit(parser, start, end, text)
+            seconds.append(time.perf_counter() - begin)
+            source = source[:start] + text + source[end:]
+
+            if (i + 1) % args.check_every == 0 or i + 1 == len(session):
+                expected = full_parse(source, grammar, parse_table)
+                if result != expected:
+                    failed = True
+                    print(f"{size} functions, edit {i} {(start, end, text)!r}: incremental parser "
+                          f"gives {result!r}, a full parse {expected!r}")
+                    break
+
+        begin = time.perf_counter()
+        full_parse(source, grammar, parse_table)
+        full = time.perf_counter() - begin
+        median = statistics.median(seconds)
+        print(f"{size:>9}  {len(parser.scanner):>8}  {full * 1000:>8.1f}ms  {median * 1000:>9.3f}ms  "
+              f"{statistics.mean(seconds) * 1000:>8.3f}ms  "
+              f"{stats.counters.get('declarations', 0) / len(session):>10.2f}  {full / median:>6.0f}x")
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,91 @@
+"""
+Check and benchmark for the generated lexer against the table-driven scanner.
+
+Scans every program in test/ and a few synthetic ones with both, checking they yield the same
+tokens, symbol tables and lexical errors, and that lexer.py is up to date with
+util/transitions.csv. Then times both on the synthetic programs.
+
+Run from the repository root:
+    python -m bench.bench_lexer
+"""
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import lexer
+import scanner
+from bench.generate import generate_program
+from util.create_transition_table import generate_lexer
+from util.symbol_table import SymbolTable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = [10, 50, 200]
+REPEAT = 5
+
+
+def scan(iter_tokens, code_file: str) -> tuple:
+    """
+    returns
+        tokens, numbers and identifiers, or the lexical error instead of the tokens
+    """
+    numbers = SymbolTable()
+    identifiers = SymbolTable()
+    try:
+        tokens = list(iter_tokens(code_file, numbers, identifiers))
+    except Exception as e:
+        tokens = str(e)
+    return tokens, numbers.to_list(), identifiers.to_list()
+
+
+def best_time(function) -> float:
+    best = None
+    for i in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+if __name__ == "__main__":
+    with open(os.path.join(ROOT, "lexer.py")) as f:
+        if f.read() != generate_lexer():
+            print("lexer.py is out of date, regenerate with: python util/create_transition_table.py")
+
+    programs = {os.path.relpath(path, ROOT): path
+                for path in sorted(glob.glob(os.path.join(ROOT, "test", "*.txt")))}
+    for n in SIZES:
+        programs[f"generated {n}"] = generate_program(n, identifiers=50)
+    for error in ["lexical", "syntax"]:
+        programs[f"generated {error}"] = generate_program(50, error=error)
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, program in programs.items():
+            if name.startswith("generated"):
+                code_file = os.path.join(tmp_dir, f"{name.replace(' ', '_')}.txt")
+                with open(code_file, "w") as f:
+                    f.write(program)
+                programs[name] = code_file
+
+            expected = scan(scanner.iter_tokens, programs[name])
+            got = scan(lexer.iter_tokens, programs[name])
+            if got != expected:
+                failed = True
+                print(f"{name}: lexer differs from scanner")
+            else:
+                tokens = expected[0]
+                print(f"{name}: {len(tokens) if isinstance(tokens, list) else tokens}")
+
+        print(f"\n{'functions':>9}  {'tokens':>8}  {'scanner':>9}  {'lexer':>9}  {'speedup':>7}")
+        for n in SIZES:
+            code_file = programs[f"generated {n}"]
+            tokens = scan(lexer.iter_tokens, code_file)[0]
+            table_driven = best_time(lambda: scan(scanner.iter_tokens, code_file))
+            generated = best_time(lambda: scan(lexer.iter_tokens, code_file))
+            print(f"{n:>9}  {len(tokens):>8}  {table_driven:>8.4f}s  {generated:>8.4f}s  "
+                  f"{table_driven / generated:>6.1f}x")
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,99 @@
+"""
+Benchmark of the scanner backends on inputs of tens of megabytes, where the numpy backend is meant
+to pay off.
+
+A synthetic program of the requested size is scanned once with every backend in
+scanner.BACKENDS, checking the numpy backend yields the same tokens as the dfa one, then each
+backend is timed. Tokens are counted as they are yielded rather than collected, so the timings
+are the scanners' and not the garbage collector's. Last, the numpy backend is timed on programs
+with one comment spanning several of its blocks, whose time per MB must stay flat as it grows.
+
+Run from the repository root:
+    python -m bench.bench_numpy --mb 10 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from bench.generate import generate_program, long_comment_program
+from scanner import BACKENDS, diff_backends, get_backend
+from util.symbol_table import SymbolTable
+
+# functions of the program measured to size the large ones
+SAMPLE_FUNCTIONS = 100
+
+# slowest growth of the time per MB of a long comment, from the smallest to the largest, still linear
+MAX_COMMENT_SLOWDOWN = 2
+
+
+def scan(backend: str, code_file: str) -> int:
+    return sum(1 for token in get_backend(backend)(code_file, SymbolTable(), SymbolTable()))
+
+
+def timed_scan(backend: str, code_file: str) -> tuple:
+    start = time.perf_counter()
+    tokens = scan(backend, code_file)
+    return tokens, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Time the scanner backends on very large synthetic programs.")
+    arg_parser.add_argument("--mb", type=float, nargs="+", default=[10],
+                            help="size of each timed program in megabytes")
+    arg_parser.add_argument("--comments", type=float, default=0.1,
+                            help="comment density, 0 to 1")
+    arg_parser.add_argument("--comment-mb", type=float, nargs="+", default=[8, 32],
+                            help="size in megabytes of each program with one long comment")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    if "numpy" not in BACKENDS:
+        print("NumPy is not installed, the numpy backend is not available")
+
+    sample = generate_program(SAMPLE_FUNCTIONS, identifiers=50, comment_density=args.comments,
+                              seed=args.seed)
+    chars_per_function = len(sample) / SAMPLE_FUNCTIONS
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mb in args.mb:
+            code_file = os.path.join(tmp_dir, f"timed{mb}.txt")
+            with open(code_file, "w") as f:
+                f.write(generate_program(int(mb * 2**20 / chars_per_function) + 1, identifiers=50,
+                                         comment_density=args.comments, seed=args.seed))
+            size = os.path.getsize(code_file) / 2**20
+
+            if "numpy" in BACKENDS:
+                difference = diff_backends(code_file, ["dfa", "numpy"])
+                if difference is not None:
+                    failed = True
+                    print(f"{size:.1f} MB: {difference}")
+
+            print(f"{size:.1f} MB")
+            print(f"{'backend':>8}  {'tokens':>9}  {'seconds':>8}  {'MB/s':>6}  {'tok/s':>9}")
+            for backend in BACKENDS:
+                tokens, seconds = timed_scan(backend, code_file)
+                print(f"{backend:>8}  {tokens:>9}  {seconds:>8.2f}  {size / seconds:>6.2f}  "
+                      f"{tokens / seconds:>9.0f}")
+            print()
+
+        if "numpy" in BACKENDS:
+            print(f"{'comment MB':>10}  {'seconds':>8}  {'s/MB':>7}")
+            per_mb = []
+            for mb in args.comment_mb:
+                code_file = os.path.join(tmp_dir, f"comment{mb}.txt")
+                with open(code_file, "w") as f:
+                    f.write(long_comment_program(int(mb * 2**20), seed=args.seed))
+                size = os.path.getsize(code_file) / 2**20
+                tokens, seconds = timed_scan("numpy", code_file)
+                per_mb.append(seconds / size)
+                print(f"{size:>10.1f}  {seconds:>8.2f}  {per_mb[-1]:>7.4f}")
+            if per_mb[-1] > per_mb[0] * MAX_COMMENT_SLOWDOWN:
+                failed = True
+                print(f"numpy: time per MB of a long comment grows {per_mb[-1] / per_mb[0]:.1f}x, "
+                      f"scanning it is not linear")
+
+    sys.exit(1 if failed else 0)
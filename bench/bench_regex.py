@@ -0,0 +1,109 @@
+"""
+Differential check and benchmark of the scanner backends.
+
+Every program in test/ and a few synthetic ones, valid and invalid, are scanned with each
+backend and compared against the dfa scanner with scanner.diff_backends. Then every backend is
+timed on synthetic programs, the largest ones meant for bulk throughput, and on programs with one
+comment spanning many blocks, whose time per MB must stay flat as the comment grows.
+
+Run from the repository root:
+    python -m bench.bench_regex --sizes 50 200 1000
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+from bench.generate import ERRORS, generate_program, long_comment_program
+from scanner import BACKENDS, diff_backends, get_backend
+from util.symbol_table import SymbolTable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# slowest growth of the time per MB of a long comment, from the smallest to the largest, still linear
+MAX_COMMENT_SLOWDOWN = 2
+
+
+def best_time(function, repeat: int) -> float:
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def scan(backend: str, code_file: str) -> int:
+    return len(list(get_backend(backend)(code_file, SymbolTable(), SymbolTable())))
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Compare and time the scanner backends.")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000],
+                            help="number of functions of each timed program")
+    arg_parser.add_argument("--comments", type=float, default=0.1,
+                            help="comment density, 0 to 1")
+    arg_parser.add_argument("--repeat", type=int, default=3,
+                            help="runs per backend, the best is kept")
+    arg_parser.add_argument("--comment-mb", type=float, nargs="+", default=[0.75, 1.5, 3],
+                            help="size in megabytes of each timed program with one long comment")
+    args = arg_parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        programs = sorted(glob.glob(os.path.join(ROOT, "test", "*.txt")))
+        for error in [None] + ERRORS:
+            for seed in range(3):
+                code_file = os.path.join(tmp_dir, f"{error or 'valid'}{seed}.txt")
+                with open(code_file, "w") as f:
+                    f.write(generate_program(20, comment_density=0.5, error=error, seed=seed))
+                programs.append(code_file)
+        for closed in (True, False):
+            # a comment over several blocks of the scanners reading the least per block
+            code_file = os.path.join(tmp_dir, f"long_comment_{'closed' if closed else 'open'}.txt")
+            with open(code_file, "w") as f:
+                f.write(long_comment_program(200000, closed))
+            programs.append(code_file)
+
+        for code_file in programs:
+            difference = diff_backends(code_file, ["dfa"] + [backend for backend in BACKENDS
+                                                            if backend != "dfa"])
+            if difference is not None:
+                failed = True
+                print(f"{os.path.basename(code_file)}: {difference}")
+        print(f"{len(programs)} programs compared, "
+              f"{'backends differ' if failed else 'all backends agree'}\n")
+
+        print(f"{'functions':>9}  {'MB':>6}  {'tokens':>8}  " +
+              "  ".join(f"{backend + ' tok/s':>12}" for backend in BACKENDS))
+        for size in args.sizes:
+            code_file = os.path.join(tmp_dir, f"timed{size}.txt")
+            with open(code_file, "w") as f:
+                f.write(generate_program(size, identifiers=50, comment_density=args.comments))
+            tokens = scan("dfa", code_file)
+            seconds = [best_time(lambda: scan(backend, code_file), args.repeat)
+                       for backend in BACKENDS]
+            print(f"{size:>9}  {os.path.getsize(code_file) / 2**20:>6.2f}  {tokens:>8}  " +
+                  "  ".join(f"{tokens / s:>12.0f}" for s in seconds))
+
+        print(f"\n{'comment MB':>10}  " + "  ".join(f"{backend + ' s/MB':>12}" for backend in BACKENDS))
+        per_mb = []
+        for mb in args.comment_mb:
+            code_file = os.path.join(tmp_dir, f"comment{mb}.txt")
+            with open(code_file, "w") as f:
+                f.write(long_comment_program(int(mb * 2**20)))
+            size = os.path.getsize(code_file) / 2**20
+            per_mb.append([best_time(lambda: scan(backend, code_file), args.repeat) / size
+                           for backend in BACKENDS])
+            print(f"{size:>10.2f}  " + "  ".join(f"{s:>12.4f}" for s in per_mb[-1]))
+        for backend, first, last in zip(BACKENDS, per_mb[0], per_mb[-1]):
+            if last > first * MAX_COMMENT_SLOWDOWN:
+                failed = True
+                print(f"{backend}: time per MB of a long comment grows {last / first:.1f}x, "
+                      f"scanning it is not linear")
+
+    sys.exit(1 if failed else 0)
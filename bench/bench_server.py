@@ -0,0 +1,68 @@
+"""
+Latency benchmark for server.py against cold command line runs.
+
+A cold run starts a new interpreter per file (python batch.py -j 1 FILE), paying startup, imports
+and grammar table loading every time. A warm request goes to a server.py process over stdin/stdout
+that loaded everything once.
+
+Run from the repository root:
+    python -m bench.bench_server
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FILES = [os.path.join(ROOT, "test", name)
+         for name in ("test1.txt", "test2.txt", "using.txt")]
+RUNS = 20
+
+
+def cold_latencies(files: list, runs: int) -> list:
+    latencies = []
+    for i in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(ROOT, "batch.py"), "-j", "1", files[i % len(files)]],
+                       cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def warm_latencies(files: list, runs: int) -> list:
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "server.py")], cwd=ROOT, text=True,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def request(code_file: str) -> dict:
+        server.stdin.write(json.dumps({"path": code_file}) + "\n")
+        server.stdin.flush()
+        return json.loads(server.stdout.readline())
+
+    request(files[0])  # wait until the server is up and the tables are loaded
+
+    latencies = []
+    for i in range(runs):
+        start = time.perf_counter()
+        request(files[i % len(files)])
+        latencies.append(time.perf_counter() - start)
+
+    server.stdin.close()
+    server.wait()
+    return latencies
+
+
+def show(name: str, latencies: list):
+    print(f"{name}: median {statistics.median(latencies) * 1000:8.2f}ms   "
+          f"mean {statistics.mean(latencies) * 1000:8.2f}ms   "
+          f"max {max(latencies) * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    cold = cold_latencies(FILES, RUNS)
+    warm = warm_latencies(FILES, RUNS)
+
+    show("cold CLI    ", cold)
+    show("warm server ", warm)
+    print(f"speedup (median): {statistics.median(cold) / statistics.median(warm):.0f}x")
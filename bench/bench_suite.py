@@ -0,0 +1,222 @@
+"""
+Benchmark suite over synthetic programs from bench.generate.
+
+Times every phase separately: building the transition table, building the grammar tables,
+scanning and parsing, and reports tokens per second and the peak memory of a scan plus parse.
+Invalid programs are checked to fail with the expected kind of error.
+
+Every run is appended to a JSON-lines results file together with the commit it ran on, so
+regressions can be compared across commits with --compare.
+
+Run from the repository root:
+    python -m bench.bench_suite --sizes 10 50 200
+    python -m bench.bench_suite --compare
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import util.grammar as gram
+from bench.generate import ERRORS, generate_program
+from parser import LL1
+from scanner import iter_tokens
+from util.create_transition_table import TRANSITIONS_CSV, compile_transition_table
+from util.symbol_table import SymbolTable
+from util.token_dict import TOKENS
+from util.token_stream import TokenBuffer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GRAMMAR_TXT = os.path.join(ROOT, "util", "grammar.txt")
+RESULTS = os.path.join(ROOT, "bench", "results.jsonl")
+
+
+def best_time(function, repeat: int) -> tuple:
+    """
+    Runs function repeat times.
+
+    returns
+        best time in seconds and the result of the last run
+    """
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def scan(code_file: str, transition_table) -> tuple:
+    identifier_symbol_table = SymbolTable()
+    tokens = TokenBuffer(iter_tokens(code_file, SymbolTable(), identifier_symbol_table,
+                                     transition_table=transition_table))
+    return tokens, identifier_symbol_table
+
+
+def parse(grammar: dict, parse_table, tokens: TokenBuffer, identifier_symbol_table: SymbolTable) -> bool:
+    # LL1 prints some errors before raising, keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        return LL1(grammar, parse_table, tokens, identifier_symbol_table.to_list())
+
+
+def error_kind(code_file: str, grammar: dict, parse_table, transition_table) -> str:
+    """
+    Scans and parses an invalid program, returning the kind of its error (LEXICAL, SYNTAX...).
+    """
+    try:
+        tokens, identifier_symbol_table = scan(code_file, transition_table)
+        parse(grammar, parse_table, tokens, identifier_symbol_table)
+    except Exception as e:
+        return str(e).split(":")[0].split(" ")[0]
+    return None
+
+
+def run_suite(sizes: list, depth: int, identifiers: int, comment_density: float, repeat: int, seed: int) -> dict:
+    """
+    Runs the whole suite.
+
+    returns
+        record: dict with the setup phases, one entry per program size and the invalid program checks
+    """
+    record = {"commit": current_commit(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "python": platform.python_version(),
+              "config": {"sizes": sizes, "depth": depth, "identifiers": identifiers,
+                         "comment_density": comment_density, "repeat": repeat, "seed": seed}}
+
+    transition_seconds, transition_table = best_time(
+        lambda: compile_transition_table(TRANSITIONS_CSV), repeat)
+
+    def build_parse_table():
+        grammar, non_terminals, terminals, productions, parse_table = gram.build_grammar_tables(
+            GRAMMAR_TXT)
+        return grammar, gram.compile_parse_table(grammar, parse_table, TOKENS)
+    grammar_seconds, (grammar, parse_table) = best_time(
+        build_parse_table, repeat)
+
+    record["setup"] = {"transition_table_seconds": transition_seconds,
+                       "grammar_tables_seconds": grammar_seconds}
+
+    record["programs"] = []
+    record["invalid"] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            code_file = os.path.join(tmp_dir, f"valid{size}.txt")
+            with open(code_file, "w") as f:
+                f.write(generate_program(size, depth=depth, identifiers=identifiers,
+                                         comment_density=comment_density, seed=seed))
+
+            scan_seconds, (tokens, identifier_symbol_table) = best_time(
+                lambda: scan(code_file, transition_table), repeat)
+            parse_seconds, passed = best_time(
+                lambda: parse(grammar, parse_table, tokens, identifier_symbol_table), repeat)
+
+            tracemalloc.start()
+            tokens, identifier_symbol_table = scan(code_file, transition_table)
+            parse(grammar, parse_table, tokens, identifier_symbol_table)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            record["programs"].append({
+                "functions": size,
+                "chars": os.path.getsize(code_file),
+                "tokens": len(tokens),
+                "passed": bool(passed),
+                "scan_seconds": scan_seconds,
+                "parse_seconds": parse_seconds,
+                "scan_tokens_per_second": len(tokens) / scan_seconds,
+                "parse_tokens_per_second": len(tokens) / parse_seconds,
+                "peak_bytes": peak,
+            })
+
+        for error in ERRORS:
+            code_file = os.path.join(tmp_dir, f"{error}.txt")
+            with open(code_file, "w") as f:
+                f.write(generate_program(sizes[-1], depth=depth, identifiers=identifiers,
+                                         comment_density=comment_density, error=error, seed=seed))
+            seconds, kind = best_time(lambda: error_kind(
+                code_file, grammar, parse_table, transition_table), repeat)
+            record["invalid"].append({"error": error, "got": kind, "ok": kind == error.upper(),
+                                      "seconds": seconds})
+
+    return record
+
+
+def show_record(record: dict) -> str:
+    setup = record["setup"]
+    s = (f"commit {record['commit']}  python {record['python']}\n"
+         f"transition table build: {setup['transition_table_seconds'] * 1000:.2f}ms   "
+         f"grammar tables build: {setup['grammar_tables_seconds'] * 1000:.2f}ms\n")
+    s += (f"{'functions':>9}  {'tokens':>8}  {'scan':>9}  {'scan tok/s':>11}  "
+          f"{'parse':>9}  {'parse tok/s':>11}  {'peak MB':>8}  passed\n")
+    for program in record["programs"]:
+        s += (f"{program['functions']:>9}  {program['tokens']:>8}  {program['scan_seconds']:>8.4f}s  "
+              f"{program['scan_tokens_per_second']:>11.0f}  {program['parse_seconds']:>8.4f}s  "
+              f"{program['parse_tokens_per_second']:>11.0f}  {program['peak_bytes'] / 2**20:>8.2f}  "
+              f"{program['passed']}\n")
+    for invalid in record["invalid"]:
+        s += (f"invalid {invalid['error']:<8} -> {invalid['got']} "
+              f"({'ok' if invalid['ok'] else 'UNEXPECTED'}) in {invalid['seconds'] * 1000:.2f}ms\n")
+    return s
+
+
+def compare(results_file: str) -> str:
+    """
+    One line per stored run and program size, oldest first, to spot regressions between commits.
+    """
+    s = f"{'commit':>9}  {'time':>19}  {'functions':>9}  {'scan tok/s':>11}  {'parse tok/s':>11}  {'peak MB':>8}\n"
+    with open(results_file) as f:
+        for line in f:
+            record = json.loads(line)
+            for program in record["programs"]:
+                s += (f"{record['commit'] or '?':>9}  {record['time']:>19}  {program['functions']:>9}  "
+                      f"{program['scan_tokens_per_second']:>11.0f}  {program['parse_tokens_per_second']:>11.0f}  "
+                      f"{program['peak_bytes'] / 2**20:>8.2f}\n")
+    return s
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Benchmark scanner and parser phases on synthetic C- programs.")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200],
+                            help="number of functions of each program")
+    arg_parser.add_argument("--depth", type=int, default=2,
+                            help="maximum nesting of blocks")
+    arg_parser.add_argument("--identifiers", type=int, default=50,
+                            help="distinct local names")
+    arg_parser.add_argument("--comments", type=float, default=0.1,
+                            help="comment density, 0 to 1")
+    arg_parser.add_argument("--repeat", type=int, default=3,
+                            help="runs per phase, the best is kept")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--results", default=RESULTS,
+                            help="JSON-lines file runs are appended to")
+    arg_parser.add_argument("--no-save", action="store_true",
+                            help="do not append this run to the results file")
+    arg_parser.add_argument("--compare", action="store_true",
+                            help="show the stored runs instead of running the suite")
+    args = arg_parser.parse_args()
+
+    if args.compare:
+        print(compare(args.results), end="")
+    else:
+        record = run_suite(args.sizes, args.depth, args.identifiers,
+                           args.comments, args.repeat, args.seed)
+        print(show_record(record), end="")
+        if not args.no_save:
+            with open(args.results, "a") as f:
+                f.write(json.dumps(record) + "\n")
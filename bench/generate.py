@@ -0,0 +1,283 @@
+"""
+Synthetic C- program generator following util/grammar.txt.
+
+Valid programs also pass the semantic checks of LL1: every name is declared before it is assigned
+or called, assignments only target variables in scope, void functions are never used as factors and
+main is the last function. Invalid programs are valid programs with one faulty statement.
+
+Run from the repository root to write programs to disk:
+    python -m bench.generate OUT_DIR --count 10 --functions 50 --depth 3
+"""
+import argparse
+import os
+import random
+
+# kinds of deliberate errors, named after the error message they raise
+ERRORS = ["lexical", "syntax", "semantic"]
+
+RELOPS = ["<=", "<", ">", ">=", "==", "!="]
+ADDOPS = ["+", "-"]
+MULOPS = ["*", "/"]
+
+COMMENT_WORDS = ["loop", "index", "sum", "check", "bound",
+                 "update", "value", "temp", "result", "todo"]
+
+
+def make_name(prefix: str, i: int) -> str:
+    """
+    Identifier for i made of letters only, C- identifiers cannot have numbers.
+
+    Prefixes must not start a keyword (i, e, v, r, w, o), so no name is ever a keyword.
+    """
+    name = ""
+    while True:
+        name = chr(ord("a") + i % 26) + name
+        i = i // 26 - 1
+        if i < 0:
+            return f"{prefix}{name}"
+
+
+class ProgramGenerator:
+    """
+    Generates one program. Kept as a class to thread the random state, the declared names and the
+    scopes through the recursive statement and expression builders.
+    """
+
+    def __init__(self, functions: int = 10, statements: int = 6, depth: int = 2, identifiers: int = 20,
+                 comment_density: float = 0.1, error: str = None, seed: int = 0):
+        """
+        args
+            functions: number of functions before main
+            statements: statements per block
+            depth: maximum nesting of if/while blocks
+            identifiers: number of distinct local and parameter names, globals are a fifth of it
+            comment_density: probability of a comment before each declaration and statement
+            error: None for a valid program, or one of ERRORS
+            seed: random seed, the same arguments always generate the same program
+        """
+        if error is not None and error not in ERRORS:
+            raise ValueError(f"error must be one of {ERRORS}")
+
+        self.random = random.Random(seed)
+        self.functions = functions
+        self.statements = statements
+        self.depth = depth
+        self.comment_density = comment_density
+        self.error = error
+
+        self.local_names = [make_name("l", i) for i in range(max(2, identifiers))]
+        n_globals = max(1, identifiers // 5)
+        self.global_vars = [make_name("g", i) for i in range(n_globals)]
+        self.global_arrays = [make_name("a", i)
+                              for i in range(max(1, n_globals // 4))]
+
+        self.int_functions = []  # declared int functions and their number of params
+        self.void_functions = []
+        self.scopes = []  # variables in scope, one list per block
+
+        self.lines = []
+        self.indent = 0
+
+    def write(self, line: str):
+        if self.comment_density and self.random.random() < self.comment_density:
+            self.lines.append(f"{'    ' * self.indent}{self.comment()}")
+        self.lines.append(f"{'    ' * self.indent}{line}")
+
+    def comment(self) -> str:
+        words = self.random.choices(COMMENT_WORDS, k=self.random.randint(2, 8))
+        return f"/* {' '.join(words)} */"
+
+    def variables(self) -> list:
+        return [name for scope in self.scopes for name in scope]
+
+    # expressions
+
+    def factor(self, depth: int) -> str:
+        choice = self.random.random()
+        if depth > 0 and choice < 0.1:
+            return f"({self.arithmetic_expression(depth - 1)})"
+        if depth > 0 and choice < 0.2 and self.int_functions:
+            name, n_params = self.random.choice(self.int_functions)
+            return f"{name}({self.arguments(n_params, depth - 1)})"
+        if depth > 0 and choice < 0.3:
+            return f"{self.random.choice(self.global_arrays)}[{self.arithmetic_expression(depth - 1)}]"
+        if choice < 0.7:
+            return self.random.choice(self.variables())
+        return str(self.random.randint(0, 100))
+
+    def term(self, depth: int) -> str:
+        factors = [self.factor(depth)
+                   for i in range(self.random.choice([1, 1, 2]))]
+        term = factors[0]
+        for factor in factors[1:]:
+            term += f" {self.random.choice(MULOPS)} {factor}"
+        return term
+
+    def arithmetic_expression(self, depth: int = 2) -> str:
+        terms = [self.term(depth) for i in range(self.random.choice([1, 2, 3]))]
+        expression = terms[0]
+        for term in terms[1:]:
+            expression += f" {self.random.choice(ADDOPS)} {term}"
+        return expression
+
+    def expression(self) -> str:
+        expression = self.arithmetic_expression()
+        if self.random.random() < 0.5:
+            expression += f" {self.random.choice(RELOPS)} {self.arithmetic_expression()}"
+        return expression
+
+    def arguments(self, n: int, depth: int = 1) -> str:
+        return ", ".join(self.arithmetic_expression(depth) for i in range(n))
+
+    # statements
+
+    def statement(self, depth: int, returns: str):
+        choice = self.random.random()
+        if depth > 0 and choice < 0.15:
+            self.write(f"if ({self.expression()})")
+            self.block(depth - 1, returns)
+            if self.random.random() < 0.5:
+                self.write("else")
+                self.block(depth - 1, returns)
+        elif depth > 0 and choice < 0.3:
+            self.write(f"while ({self.expression()})")
+            self.block(depth - 1, returns)
+        elif choice < 0.4 and (self.int_functions or self.void_functions):
+            name, n_params = self.random.choice(
+                self.int_functions + self.void_functions)
+            self.write(f"{name}({self.arguments(n_params)});")
+        elif choice < 0.45:
+            self.write(f"input {self.random.choice(self.variables())};")
+        elif choice < 0.5:
+            self.write(f"output {self.expression()};")
+        elif choice < 0.6:
+            self.write(f"{self.random.choice(self.global_arrays)}[{self.arithmetic_expression(1)}] = "
+                       f"{self.arithmetic_expression()};")
+        else:
+            self.write(
+                f"{self.random.choice(self.variables())} = {self.arithmetic_expression()};")
+
+    def faulty_statement(self):
+        if self.error == "lexical":
+            self.write(f"{self.random.choice(self.variables())} = 9z;")
+        elif self.error == "syntax":
+            self.write(f"{self.random.choice(self.variables())} = ;")
+        else:  # assigning a variable declared nowhere
+            self.write("zundeclared = 1;")
+
+    def local_declarations(self, names: list):
+        for name in names:
+            self.write(f"int {name};")
+
+    def block(self, depth: int, returns: str, declared: list = ()):
+        """
+        Writes a compound statement, declaring a few new locals if there are names left.
+        """
+        self.write("{")
+        self.indent += 1
+
+        in_scope = set(self.variables()) | set(declared)
+        free = [name for name in self.local_names if name not in in_scope]
+        names = self.random.sample(free, min(len(free), self.random.randint(0, 2)))
+        self.local_declarations(names)
+        self.scopes.append(list(declared) + names)
+
+        for i in range(self.statements):
+            self.statement(depth, returns)
+        if returns == "int":
+            self.write(f"return {self.arithmetic_expression()};")
+
+        self.scopes.pop()
+        self.indent -= 1
+        self.write("}")
+
+    def function(self, i: int):
+        returns = self.random.choice(["int", "int", "void"])
+        name = make_name("f", i)
+        params = self.random.sample(self.local_names, min(len(self.local_names), self.random.randint(0, 3)))
+
+        self.write(f"{returns} {name}({', '.join(f'int {param}' for param in params) or 'void'})")
+        self.block(self.depth, returns, params)
+
+        # declared once the whole function is written, so bodies never call themselves
+        if returns == "int":
+            self.int_functions.append((name, len(params)))
+        else:
+            self.void_functions.append((name, len(params)))
+
+    def generate(self) -> str:
+        for name in self.global_vars:
+            self.write(f"int {name};")
+        for name in self.global_arrays:
+            self.write(f"int {name}[100];")
+        self.scopes.append(self.global_vars)
+
+        faulty = self.random.randrange(self.functions + 1)
+        for i in range(self.functions):
+            if self.error is not None and i == faulty:
+                self.write("void fzfaulty(void)")
+                self.write("{")
+                self.scopes.append([])
+                self.faulty_statement()
+                self.scopes.pop()
+                self.write("}")
+            self.function(i)
+
+        self.write("void main(void)")
+        self.scopes.append([])
+        if self.error is not None and faulty == self.functions:
+            self.write("{")
+            self.faulty_statement()
+            self.write("}")
+        else:
+            self.block(self.depth, "void")
+        self.scopes.pop()
+        return "\n".join(self.lines) + "\n"
+
+
+def generate_program(functions: int = 10, statements: int = 6, depth: int = 2, identifiers: int = 20,
+                     comment_density: float = 0.1, error: str = None, seed: int = 0) -> str:
+    """
+    Generates a C- program, see ProgramGenerator for the arguments.
+    """
+    return ProgramGenerator(functions, statements, depth, identifiers, comment_density, error, seed).generate()
+
+
+def long_comment_program(chars: int, closed: bool = True, seed: int = 0) -> str:
+    """
+    Generates a small valid C- program around one comment of about chars characters, full of the
+    '*' and '/' that cannot close it, left open at EOF unless closed.
+    """
+    rnd = random.Random(seed)
+    words = COMMENT_WORDS + ["*", "/", "**", "/*", "***", "**/", "/**/", "a ** / b"]
+    lines = []
+    length = 0
+    while length < chars:
+        lines.append(" ".join(rnd.choice(words) for _ in range(10)))
+        length += len(lines[-1]) + 1
+    comment = "/*\n" + "\n".join(lines) + ("\n*/\n" if closed else "\n")
+    return f"int x;\n{comment}void main(void){{ x = 1; }}\n"
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Write synthetic C- programs to a directory.")
+    arg_parser.add_argument("out_dir", help="directory for the programs")
+    arg_parser.add_argument("--count", type=int, default=10)
+    arg_parser.add_argument("--functions", type=int, default=10)
+    arg_parser.add_argument("--statements", type=int, default=6)
+    arg_parser.add_argument("--depth", type=int, default=2)
+    arg_parser.add_argument("--identifiers", type=int, default=20)
+    arg_parser.add_argument("--comments", type=float, default=0.1,
+                            help="comment density, 0 to 1")
+    arg_parser.add_argument("--error", choices=ERRORS, default=None,
+                            help="write invalid programs with this kind of error")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for i in range(args.count):
+        program = generate_program(args.functions, args.statements, args.depth, args.identifiers,
+                                   args.comments, args.error, args.seed + i)
+        with open(os.path.join(args.out_dir, f"program{make_name('', i)}.txt"), "w") as f:
+            f.write(program)
@@ -0,0 +1,1181 @@
+"""
+Recursive-descent parser for C-, generated from util/grammar.txt by util/grammar.py.
+
+Do not edit, regenerate with:
+    python util/grammar.py
+"""
+from parser import (check_identifier, handle_error_stack, handle_error_table,
+                    initialize_symbol_table, last_fun_main)
+from util.symbol_table import ScopedSymbolTable
+from util.token_dict import TOKENS
+
+# scanner token IDs
+T_NE = TOKENS.index('!=') + 1
+T_EOF = TOKENS.index('$') + 1
+T_LPAREN = TOKENS.index('(') + 1
+T_RPAREN = TOKENS.index(')') + 1
+T_TIMES = TOKENS.index('*') + 1
+T_PLUS = TOKENS.index('+') + 1
+T_COMMA = TOKENS.index(',') + 1
+T_MINUS = TOKENS.index('-') + 1
+T_DIVIDE = TOKENS.index('/') + 1
+T_SEMI = TOKENS.index(';') + 1
+T_LT = TOKENS.index('<') + 1
+T_LE = TOKENS.index('<=') + 1
+T_ASSIGN = TOKENS.index('=') + 1
+T_EQ = TOKENS.index('==') + 1
+T_GT = TOKENS.index('>') + 1
+T_GE = TOKENS.index('>=') + 1
+T_ID = TOKENS.index('ID') + 1
+T_NUM = TOKENS.index('NUM') + 1
+T_LBRACKET = TOKENS.index('[') + 1
+T_RBRACKET = TOKENS.index(']') + 1
+T_ELSE = TOKENS.index('else') + 1
+T_IF = TOKENS.index('if') + 1
+T_INPUT = TOKENS.index('input') + 1
+T_INT = TOKENS.index('int') + 1
+T_OUTPUT = TOKENS.index('output') + 1
+T_RETURN = TOKENS.index('return') + 1
+T_VOID = TOKENS.index('void') + 1
+T_WHILE = TOKENS.index('while') + 1
+T_LBRACE = TOKENS.index('{') + 1
+T_RBRACE = TOKENS.index('}') + 1
+
+# non-terminal IDs, numbered after the tokens like in CompiledParseTable
+NT_BASE = len(TOKENS) + 1
+N_PROGRAM = NT_BASE + 0
+N_DECLARATION_LIST = NT_BASE + 1
+N_DECLARATION = NT_BASE + 2
+N_DECLARATION_PRIME = NT_BASE + 3
+N_VAR_DECLARATION = NT_BASE + 4
+N_VAR_DECLARATION_PRIME = NT_BASE + 5
+N_PARAMS = NT_BASE + 6
+N_PARAM_LIST = NT_BASE + 7
+N_PARAM = NT_BASE + 8
+N_PARAM_PRIME = NT_BASE + 9
+N_COMPOUND_STMT = NT_BASE + 10
+N_LOCAL_DECLARATIONS = NT_BASE + 11
+N_STATEMENT_LIST = NT_BASE + 12
+N_STATEMENT = NT_BASE + 13
+N_STATEMENT_PRIME = NT_BASE + 14
+N_SELECTION_STMT = NT_BASE + 15
+N_RETURN_STMT = NT_BASE + 16
+N_VAR = NT_BASE + 17
+N_VAR_PRIME = NT_BASE + 18
+N_EXPRESSION = NT_BASE + 19
+N_EXPRESSION_PRIME = NT_BASE + 20
+N_RELOP = NT_BASE + 21
+N_ARITHMETIC_EXPRESSION = NT_BASE + 22
+N_ARITHMETIC_EXPRESSION_PRIME = NT_BASE + 23
+N_ADDOP = NT_BASE + 24
+N_TERM = NT_BASE + 25
+N_TERM_PRIME = NT_BASE + 26
+N_MULOP = NT_BASE + 27
+N_FACTOR = NT_BASE + 28
+N_FACTOR_PRIME = NT_BASE + 29
+N_CALL = NT_BASE + 30
+N_ARGS = NT_BASE + 31
+N_ARGS_LIST = NT_BASE + 32
+
+# name of every symbol ID
+SYMBOLS = ['ε'] + TOKENS + ['program', 'declaration_list', 'declaration', "declaration'", 'var_declaration', "var_declaration'", 'params', 'param_list', 'param', "param'", 'compound_stmt', 'local_declarations', 'statement_list', 'statement', "statement'", 'selection_stmt', 'return_stmt', 'var', "var'", 'expression', "expression'", 'relop', 'arithmetic_expression', "arithmetic_expression'", 'addop', 'term', "term'", 'mulop', 'factor', "factor'", 'call', 'args', 'args_list']
+
+# productions in {n: [production]} format, for error messages and tracers
+PRODUCTIONS = {
+    1: ['program', 'declaration', 'declaration_list'],
+    2: ['program', 'ε'],
+    3: ['declaration_list', 'declaration', 'declaration_list'],
+    4: ['declaration_list', 'ε'],
+    5: ['declaration', 'int', 'ID', "declaration'"],
+    6: ['declaration', 'void', 'ID', '(', 'params', ')', 'compound_stmt'],
+    7: ["declaration'", ';'],
+    8: ["declaration'", '[', 'NUM', ']', ';'],
+    9: ["declaration'", '(', 'params', ')', 'compound_stmt'],
+    10: ['var_declaration', 'int', 'ID', "var_declaration'"],
+    11: ["var_declaration'", ';'],
+    12: ["var_declaration'", '[', 'NUM', ']', ';'],
+    13: ['params', 'param', 'param_list'],
+    14: ['params', 'void'],
+    15: ['param_list', ',', 'param', 'param_list'],
+    16: ['param_list', 'ε'],
+    17: ['param', 'int', 'ID', "param'"],
+    18: ["param'", '[', ']'],
+    19: ["param'", 'ε'],
+    20: ['compound_stmt', '{', 'local_declarations', 'statement_list', '}'],
+    21: ['local_declarations', 'var_declaration', 'local_declarations'],
+    22: ['local_declarations', 'ε'],
+    23: ['statement_list', 'statement', 'statement_list'],
+    24: ['statement_list', 'ε'],
+    25: ['statement', 'ID', "statement'"],
+    26: ['statement', '{', 'local_declarations', 'statement_list', '}'],
+    27: ['statement', 'if', '(', 'expression', ')', 'statement', 'selection_stmt'],
+    28: ['statement', 'while', '(', 'expression', ')', 'statement'],
+    29: ['statement', 'return', 'return_stmt'],
+    30: ['statement', 'input', 'var', ';'],
+    31: ['statement', 'output', 'expression', ';'],
+    32: ["statement'", "var'", '=', 'expression', ';'],
+    33: ["statement'", '(', 'call', ';'],
+    34: ['selection_stmt', 'else', 'statement'],
+    35: ['selection_stmt', 'ε'],
+    36: ['return_stmt', ';'],
+    37: ['return_stmt', 'expression', ';'],
+    38: ['var', 'ID', "var'"],
+    39: ["var'", '[', 'arithmetic_expression', ']'],
+    40: ["var'", 'ε'],
+    41: ['expression', 'arithmetic_expression', "expression'"],
+    42: ["expression'", 'relop', 'arithmetic_expression', "expression'"],
+    43: ["expression'", 'ε'],
+    44: ['relop', '<='],
+    45: ['relop', '<'],
+    46: ['relop', '>'],
+    47: ['relop', '>='],
+    48: ['relop', '=='],
+    49: ['relop', '!='],
+    50: ['arithmetic_expression', 'term', "arithmetic_expression'"],
+    51: ["arithmetic_expression'", 'addop', 'term', "arithmetic_expression'"],
+    52: ["arithmetic_expression'", 'ε'],
+    53: ['addop', '+'],
+    54: ['addop', '-'],
+    55: ['term', 'factor', "term'"],
+    56: ["term'", 'mulop', 'factor', "term'"],
+    57: ["term'", 'ε'],
+    58: ['mulop', '*'],
+    59: ['mulop', '/'],
+    60: ['factor', '(', 'arithmetic_expression', ')'],
+    61: ['factor', 'ID', "factor'"],
+    62: ['factor', 'NUM'],
+    63: ["factor'", '[', 'arithmetic_expression', ']'],
+    64: ["factor'", 'ε'],
+    65: ["factor'", '(', 'call'],
+    66: ['call', 'args', ')'],
+    67: ['call', ')'],
+    68: ['args', 'arithmetic_expression', 'args_list'],
+    69: ['args_list', ',', 'arithmetic_expression', 'args_list'],
+    70: ['args_list', 'ε'],
+}
+
+# FIRST+ sets of the productions chosen by set lookup
+FIRST_PLUS_22 = frozenset((T_ID, T_IF, T_INPUT, T_OUTPUT, T_RETURN, T_WHILE, T_LBRACE, T_RBRACE))
+FIRST_PLUS_23 = frozenset((T_ID, T_IF, T_INPUT, T_OUTPUT, T_RETURN, T_WHILE, T_LBRACE))
+FIRST_PLUS_35 = frozenset((T_ID, T_IF, T_INPUT, T_OUTPUT, T_RETURN, T_WHILE, T_LBRACE, T_RBRACE))
+FIRST_PLUS_37 = frozenset((T_LPAREN, T_ID, T_NUM))
+FIRST_PLUS_41 = frozenset((T_LPAREN, T_ID, T_NUM))
+FIRST_PLUS_42 = frozenset((T_NE, T_LT, T_LE, T_EQ, T_GT, T_GE))
+FIRST_PLUS_50 = frozenset((T_LPAREN, T_ID, T_NUM))
+FIRST_PLUS_52 = frozenset((T_NE, T_RPAREN, T_COMMA, T_SEMI, T_LT, T_LE, T_EQ, T_GT, T_GE, T_RBRACKET))
+FIRST_PLUS_55 = frozenset((T_LPAREN, T_ID, T_NUM))
+FIRST_PLUS_57 = frozenset((T_NE, T_RPAREN, T_PLUS, T_COMMA, T_MINUS, T_SEMI, T_LT, T_LE, T_EQ, T_GT, T_GE, T_RBRACKET))
+FIRST_PLUS_64 = frozenset((T_NE, T_RPAREN, T_TIMES, T_PLUS, T_COMMA, T_MINUS, T_DIVIDE, T_SEMI, T_LT, T_LE, T_EQ, T_GT, T_GE, T_RBRACKET))
+FIRST_PLUS_66 = frozenset((T_LPAREN, T_ID, T_NUM))
+FIRST_PLUS_68 = frozenset((T_LPAREN, T_ID, T_NUM))
+
+
+def parse(input, symbol_table: list, trace=None):
+    """
+    Parses input like parser.LL1 does, with the same semantic checks and errors.
+    Nesting in the source is bounded by the Python recursion limit.
+
+    args
+        input: list of lists from scanner output, or any indexable token sequence. Must not be empty.
+        symbol_table: list of identifiers from scanner output
+        trace: optional util.trace.Tracer. There is no parse stack, so step is never called.
+
+    returns
+        bool indicating success.
+    """
+    symbol_table = initialize_symbol_table(symbol_table)
+
+    # Validate input, '$' is only ever the last token
+    if input[0][1] == T_EOF:
+        raise Exception("INPUT: code file cannot be empty")
+
+    current_scope = ScopedSymbolTable()  # accessible variables, one scope per block
+
+    pos = 0  # pointer to traverse input
+    token = input[0][1]
+    current_nt = 0  # non-terminal of the last production expanded
+    production_number = 0
+
+    if trace is not None:
+        trace.begin(SYMBOLS, PRODUCTIONS)
+
+    def program():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_INT or token == T_VOID:
+            production_number = 1
+            current_nt = N_PROGRAM
+            if trace is not None:
+                trace.production(1)
+            declaration()
+            declaration_list()
+        elif token == T_EOF:
+            production_number = 2
+            current_nt = N_PROGRAM
+            if trace is not None:
+                trace.production(2)
+        else:
+            handle_error_table('program', SYMBOLS[token], input[pos][0])
+
+    def declaration_list():
+        nonlocal pos, token, current_nt, production_number
+        while True:
+            if token == T_INT or token == T_VOID:
+                production_number = 3
+                current_nt = N_DECLARATION_LIST
+                if trace is not None:
+                    trace.production(3)
+                declaration()
+                continue
+            elif token == T_EOF:
+                production_number = 4
+                current_nt = N_DECLARATION_LIST
+                if trace is not None:
+                    trace.production(4)
+                return
+            else:
+                handle_error_table('declaration_list', SYMBOLS[token], input[pos][0])
+
+    def declaration():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_INT:
+            production_number = 5
+            current_nt = N_DECLARATION
+            if trace is not None:
+                trace.production(5)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            if token != T_ID:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            check_identifier(input, pos, SYMBOLS[current_nt],
+                             symbol_table, current_scope, trace)
+            pos += 1
+            token = input[pos][1]
+            declaration_prime()
+        elif token == T_VOID:
+            production_number = 6
+            current_nt = N_DECLARATION
+            if trace is not None:
+                trace.production(6)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            if token != T_ID:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            check_identifier(input, pos, SYMBOLS[current_nt],
+                             symbol_table, current_scope, trace)
+            pos += 1
+            token = input[pos][1]
+            if token != T_LPAREN:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            params()
+            if token != T_RPAREN:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            compound_stmt()
+        else:
+            handle_error_table('declaration', SYMBOLS[token], input[pos][0])
+
+    def declaration_prime():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_SEMI:
+            production_number = 7
+            current_nt = N_DECLARATION_PRIME
+            if trace is not None:
+                trace.production(7)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_LBRACKET:
+            production_number = 8
+            current_nt = N_DECLARATION_PRIME
+            if trace is not None:
+                trace.production(8)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            if token != T_NUM:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            if token != T_RBRACKET:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            if token != T_SEMI:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_LPAREN:
+            production_number = 9
+            current_nt = N_DECLARATION_PRIME
+            if trace is not None:
+                trace.production(9)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            params()
+            if token != T_RPAREN:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            compound_stmt()
+        else:
+            handle_error_table("declaration'", SYMBOLS[token], input[pos][0])
+
+    def var_declaration():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_INT:
+            production_number = 10
+            current_nt = N_VAR_DECLARATION
+            if trace is not None:
+                trace.production(10)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            if token != T_ID:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            check_identifier(input, pos, SYMBOLS[current_nt],
+                             symbol_table, current_scope, trace)
+            pos += 1
+            token = input[pos][1]
+            var_declaration_prime()
+        else:
+            handle_error_table('var_declaration', SYMBOLS[token], input[pos][0])
+
+    def var_declaration_prime():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_SEMI:
+            production_number = 11
+            current_nt = N_VAR_DECLARATION_PRIME
+            if trace is not None:
+                trace.production(11)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_LBRACKET:
+            production_number = 12
+            current_nt = N_VAR_DECLARATION_PRIME
+            if trace is not None:
+                trace.production(12)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            if token != T_NUM:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            if token != T_RBRACKET:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            if token != T_SEMI:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        else:
+            handle_error_table("var_declaration'", SYMBOLS[token], input[pos][0])
+
+    def params():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_INT:
+            production_number = 13
+            current_nt = N_PARAMS
+            if trace is not None:
+                trace.production(13)
+            param()
+            param_list()
+        elif token == T_VOID:
+            production_number = 14
+            current_nt = N_PARAMS
+            if trace is not None:
+                trace.production(14)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        else:
+            handle_error_table('params', SYMBOLS[token], input[pos][0])
+
+    def param_list():
+        nonlocal pos, token, current_nt, production_number
+        while True:
+            if token == T_COMMA:
+                production_number = 15
+                current_nt = N_PARAM_LIST
+                if trace is not None:
+                    trace.production(15)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                pos += 1
+                token = input[pos][1]
+                param()
+                continue
+            elif token == T_RPAREN:
+                production_number = 16
+                current_nt = N_PARAM_LIST
+                if trace is not None:
+                    trace.production(16)
+                return
+            else:
+                handle_error_table('param_list', SYMBOLS[token], input[pos][0])
+
+    def param():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_INT:
+            production_number = 17
+            current_nt = N_PARAM
+            if trace is not None:
+                trace.production(17)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            if token != T_ID:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            check_identifier(input, pos, SYMBOLS[current_nt],
+                             symbol_table, current_scope, trace)
+            pos += 1
+            token = input[pos][1]
+            param_prime()
+        else:
+            handle_error_table('param', SYMBOLS[token], input[pos][0])
+
+    def param_prime():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_LBRACKET:
+            production_number = 18
+            current_nt = N_PARAM_PRIME
+            if trace is not None:
+                trace.production(18)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            if token != T_RBRACKET:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_RPAREN or token == T_COMMA:
+            production_number = 19
+            current_nt = N_PARAM_PRIME
+            if trace is not None:
+                trace.production(19)
+        else:
+            handle_error_table("param'", SYMBOLS[token], input[pos][0])
+
+    def compound_stmt():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_LBRACE:
+            production_number = 20
+            current_nt = N_COMPOUND_STMT
+            if trace is not None:
+                trace.production(20)
+            if trace is not None:
+                trace.match(token, current_nt)
+            current_scope.push()
+            pos += 1
+            token = input[pos][1]
+            local_declarations()
+            statement_list()
+            if token != T_RBRACE:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            current_scope.pop()
+            pos += 1
+            token = input[pos][1]
+        else:
+            handle_error_table('compound_stmt', SYMBOLS[token], input[pos][0])
+
+    def local_declarations():
+        nonlocal pos, token, current_nt, production_number
+        while True:
+            if token == T_INT:
+                production_number = 21
+                current_nt = N_LOCAL_DECLARATIONS
+                if trace is not None:
+                    trace.production(21)
+                var_declaration()
+                continue
+            elif token in FIRST_PLUS_22:
+                production_number = 22
+                current_nt = N_LOCAL_DECLARATIONS
+                if trace is not None:
+                    trace.production(22)
+                return
+            else:
+                handle_error_table('local_declarations', SYMBOLS[token], input[pos][0])
+
+    def statement_list():
+        nonlocal pos, token, current_nt, production_number
+        while True:
+            if token in FIRST_PLUS_23:
+                production_number = 23
+                current_nt = N_STATEMENT_LIST
+                if trace is not None:
+                    trace.production(23)
+                statement()
+                continue
+            elif token == T_RBRACE:
+                production_number = 24
+                current_nt = N_STATEMENT_LIST
+                if trace is not None:
+                    trace.production(24)
+                return
+            else:
+                handle_error_table('statement_list', SYMBOLS[token], input[pos][0])
+
+    def statement():
+        nonlocal pos, token, current_nt, production_number
+        while True:
+            if token == T_ID:
+                production_number = 25
+                current_nt = N_STATEMENT
+                if trace is not None:
+                    trace.production(25)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                check_identifier(input, pos, SYMBOLS[current_nt],
+                                 symbol_table, current_scope, trace)
+                pos += 1
+                token = input[pos][1]
+                statement_prime()
+                return
+            elif token == T_LBRACE:
+                production_number = 26
+                current_nt = N_STATEMENT
+                if trace is not None:
+                    trace.production(26)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                current_scope.push()
+                pos += 1
+                token = input[pos][1]
+                local_declarations()
+                statement_list()
+                if token != T_RBRACE:
+                    handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                current_scope.pop()
+                pos += 1
+                token = input[pos][1]
+                return
+            elif token == T_IF:
+                production_number = 27
+                current_nt = N_STATEMENT
+                if trace is not None:
+                    trace.production(27)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                pos += 1
+                token = input[pos][1]
+                if token != T_LPAREN:
+                    handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                pos += 1
+                token = input[pos][1]
+                expression()
+                if token != T_RPAREN:
+                    handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                pos += 1
+                token = input[pos][1]
+                statement()
+                selection_stmt()
+                return
+            elif token == T_WHILE:
+                production_number = 28
+                current_nt = N_STATEMENT
+                if trace is not None:
+                    trace.production(28)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                pos += 1
+                token = input[pos][1]
+                if token != T_LPAREN:
+                    handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                pos += 1
+                token = input[pos][1]
+                expression()
+                if token != T_RPAREN:
+                    handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                pos += 1
+                token = input[pos][1]
+                continue
+            elif token == T_RETURN:
+                production_number = 29
+                current_nt = N_STATEMENT
+                if trace is not None:
+                    trace.production(29)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                pos += 1
+                token = input[pos][1]
+                return_stmt()
+                return
+            elif token == T_INPUT:
+                production_number = 30
+                current_nt = N_STATEMENT
+                if trace is not None:
+                    trace.production(30)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                pos += 1
+                token = input[pos][1]
+                var()
+                if token != T_SEMI:
+                    handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                pos += 1
+                token = input[pos][1]
+                return
+            elif token == T_OUTPUT:
+                production_number = 31
+                current_nt = N_STATEMENT
+                if trace is not None:
+                    trace.production(31)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                pos += 1
+                token = input[pos][1]
+                expression()
+                if token != T_SEMI:
+                    handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                pos += 1
+                token = input[pos][1]
+                return
+            else:
+                handle_error_table('statement', SYMBOLS[token], input[pos][0])
+
+    def statement_prime():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_ASSIGN or token == T_LBRACKET:
+            production_number = 32
+            current_nt = N_STATEMENT_PRIME
+            if trace is not None:
+                trace.production(32)
+            var_prime()
+            if token != T_ASSIGN:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            expression()
+            if token != T_SEMI:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_LPAREN:
+            production_number = 33
+            current_nt = N_STATEMENT_PRIME
+            if trace is not None:
+                trace.production(33)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            call()
+            if token != T_SEMI:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        else:
+            handle_error_table("statement'", SYMBOLS[token], input[pos][0])
+
+    def selection_stmt():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_ELSE:
+            production_number = 34
+            current_nt = N_SELECTION_STMT
+            if trace is not None:
+                trace.production(34)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            statement()
+        elif token in FIRST_PLUS_35:
+            production_number = 35
+            current_nt = N_SELECTION_STMT
+            if trace is not None:
+                trace.production(35)
+        else:
+            handle_error_table('selection_stmt', SYMBOLS[token], input[pos][0])
+
+    def return_stmt():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_SEMI:
+            production_number = 36
+            current_nt = N_RETURN_STMT
+            if trace is not None:
+                trace.production(36)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token in FIRST_PLUS_37:
+            production_number = 37
+            current_nt = N_RETURN_STMT
+            if trace is not None:
+                trace.production(37)
+            expression()
+            if token != T_SEMI:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        else:
+            handle_error_table('return_stmt', SYMBOLS[token], input[pos][0])
+
+    def var():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_ID:
+            production_number = 38
+            current_nt = N_VAR
+            if trace is not None:
+                trace.production(38)
+            if trace is not None:
+                trace.match(token, current_nt)
+            check_identifier(input, pos, SYMBOLS[current_nt],
+                             symbol_table, current_scope, trace)
+            pos += 1
+            token = input[pos][1]
+            var_prime()
+        else:
+            handle_error_table('var', SYMBOLS[token], input[pos][0])
+
+    def var_prime():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_LBRACKET:
+            production_number = 39
+            current_nt = N_VAR_PRIME
+            if trace is not None:
+                trace.production(39)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            arithmetic_expression()
+            if token != T_RBRACKET:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_SEMI or token == T_ASSIGN:
+            production_number = 40
+            current_nt = N_VAR_PRIME
+            if trace is not None:
+                trace.production(40)
+        else:
+            handle_error_table("var'", SYMBOLS[token], input[pos][0])
+
+    def expression():
+        nonlocal pos, token, current_nt, production_number
+        if token in FIRST_PLUS_41:
+            production_number = 41
+            current_nt = N_EXPRESSION
+            if trace is not None:
+                trace.production(41)
+            arithmetic_expression()
+            expression_prime()
+        else:
+            handle_error_table('expression', SYMBOLS[token], input[pos][0])
+
+    def expression_prime():
+        nonlocal pos, token, current_nt, production_number
+        while True:
+            if token in FIRST_PLUS_42:
+                production_number = 42
+                current_nt = N_EXPRESSION_PRIME
+                if trace is not None:
+                    trace.production(42)
+                relop()
+                arithmetic_expression()
+                continue
+            elif token == T_RPAREN or token == T_SEMI:
+                production_number = 43
+                current_nt = N_EXPRESSION_PRIME
+                if trace is not None:
+                    trace.production(43)
+                return
+            else:
+                handle_error_table("expression'", SYMBOLS[token], input[pos][0])
+
+    def relop():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_LE:
+            production_number = 44
+            current_nt = N_RELOP
+            if trace is not None:
+                trace.production(44)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_LT:
+            production_number = 45
+            current_nt = N_RELOP
+            if trace is not None:
+                trace.production(45)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_GT:
+            production_number = 46
+            current_nt = N_RELOP
+            if trace is not None:
+                trace.production(46)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_GE:
+            production_number = 47
+            current_nt = N_RELOP
+            if trace is not None:
+                trace.production(47)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_EQ:
+            production_number = 48
+            current_nt = N_RELOP
+            if trace is not None:
+                trace.production(48)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_NE:
+            production_number = 49
+            current_nt = N_RELOP
+            if trace is not None:
+                trace.production(49)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        else:
+            handle_error_table('relop', SYMBOLS[token], input[pos][0])
+
+    def arithmetic_expression():
+        nonlocal pos, token, current_nt, production_number
+        if token in FIRST_PLUS_50:
+            production_number = 50
+            current_nt = N_ARITHMETIC_EXPRESSION
+            if trace is not None:
+                trace.production(50)
+            term()
+            arithmetic_expression_prime()
+        else:
+            handle_error_table('arithmetic_expression', SYMBOLS[token], input[pos][0])
+
+    def arithmetic_expression_prime():
+        nonlocal pos, token, current_nt, production_number
+        while True:
+            if token == T_PLUS or token == T_MINUS:
+                production_number = 51
+                current_nt = N_ARITHMETIC_EXPRESSION_PRIME
+                if trace is not None:
+                    trace.production(51)
+                addop()
+                term()
+                continue
+            elif token in FIRST_PLUS_52:
+                production_number = 52
+                current_nt = N_ARITHMETIC_EXPRESSION_PRIME
+                if trace is not None:
+                    trace.production(52)
+                return
+            else:
+                handle_error_table("arithmetic_expression'", SYMBOLS[token], input[pos][0])
+
+    def addop():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_PLUS:
+            production_number = 53
+            current_nt = N_ADDOP
+            if trace is not None:
+                trace.production(53)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_MINUS:
+            production_number = 54
+            current_nt = N_ADDOP
+            if trace is not None:
+                trace.production(54)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        else:
+            handle_error_table('addop', SYMBOLS[token], input[pos][0])
+
+    def term():
+        nonlocal pos, token, current_nt, production_number
+        if token in FIRST_PLUS_55:
+            production_number = 55
+            current_nt = N_TERM
+            if trace is not None:
+                trace.production(55)
+            factor()
+            term_prime()
+        else:
+            handle_error_table('term', SYMBOLS[token], input[pos][0])
+
+    def term_prime():
+        nonlocal pos, token, current_nt, production_number
+        while True:
+            if token == T_TIMES or token == T_DIVIDE:
+                production_number = 56
+                current_nt = N_TERM_PRIME
+                if trace is not None:
+                    trace.production(56)
+                mulop()
+                factor()
+                continue
+            elif token in FIRST_PLUS_57:
+                production_number = 57
+                current_nt = N_TERM_PRIME
+                if trace is not None:
+                    trace.production(57)
+                return
+            else:
+                handle_error_table("term'", SYMBOLS[token], input[pos][0])
+
+    def mulop():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_TIMES:
+            production_number = 58
+            current_nt = N_MULOP
+            if trace is not None:
+                trace.production(58)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_DIVIDE:
+            production_number = 59
+            current_nt = N_MULOP
+            if trace is not None:
+                trace.production(59)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        else:
+            handle_error_table('mulop', SYMBOLS[token], input[pos][0])
+
+    def factor():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_LPAREN:
+            production_number = 60
+            current_nt = N_FACTOR
+            if trace is not None:
+                trace.production(60)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            arithmetic_expression()
+            if token != T_RPAREN:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_ID:
+            production_number = 61
+            current_nt = N_FACTOR
+            if trace is not None:
+                trace.production(61)
+            if trace is not None:
+                trace.match(token, current_nt)
+            check_identifier(input, pos, SYMBOLS[current_nt],
+                             symbol_table, current_scope, trace)
+            pos += 1
+            token = input[pos][1]
+            factor_prime()
+        elif token == T_NUM:
+            production_number = 62
+            current_nt = N_FACTOR
+            if trace is not None:
+                trace.production(62)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        else:
+            handle_error_table('factor', SYMBOLS[token], input[pos][0])
+
+    def factor_prime():
+        nonlocal pos, token, current_nt, production_number
+        if token == T_LBRACKET:
+            production_number = 63
+            current_nt = N_FACTOR_PRIME
+            if trace is not None:
+                trace.production(63)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            arithmetic_expression()
+            if token != T_RBRACKET:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token in FIRST_PLUS_64:
+            production_number = 64
+            current_nt = N_FACTOR_PRIME
+            if trace is not None:
+                trace.production(64)
+        elif token == T_LPAREN:
+            production_number = 65
+            current_nt = N_FACTOR_PRIME
+            if trace is not None:
+                trace.production(65)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+            call()
+        else:
+            handle_error_table("factor'", SYMBOLS[token], input[pos][0])
+
+    def call():
+        nonlocal pos, token, current_nt, production_number
+        if token in FIRST_PLUS_66:
+            production_number = 66
+            current_nt = N_CALL
+            if trace is not None:
+                trace.production(66)
+            args()
+            if token != T_RPAREN:
+                handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        elif token == T_RPAREN:
+            production_number = 67
+            current_nt = N_CALL
+            if trace is not None:
+                trace.production(67)
+            if trace is not None:
+                trace.match(token, current_nt)
+            pos += 1
+            token = input[pos][1]
+        else:
+            handle_error_table('call', SYMBOLS[token], input[pos][0])
+
+    def args():
+        nonlocal pos, token, current_nt, production_number
+        if token in FIRST_PLUS_68:
+            production_number = 68
+            current_nt = N_ARGS
+            if trace is not None:
+                trace.production(68)
+            arithmetic_expression()
+            args_list()
+        else:
+            handle_error_table('args', SYMBOLS[token], input[pos][0])
+
+    def args_list():
+        nonlocal pos, token, current_nt, production_number
+        while True:
+            if token == T_COMMA:
+                production_number = 69
+                current_nt = N_ARGS_LIST
+                if trace is not None:
+                    trace.production(69)
+                if trace is not None:
+                    trace.match(token, current_nt)
+                pos += 1
+                token = input[pos][1]
+                arithmetic_expression()
+                continue
+            elif token == T_RPAREN:
+                production_number = 70
+                current_nt = N_ARGS_LIST
+                if trace is not None:
+                    trace.production(70)
+                return
+            else:
+                handle_error_table('args_list', SYMBOLS[token], input[pos][0])
+
+    program()
+
+    if token == T_EOF:  # program ended correctly
+        if trace is not None:
+            trace.accept(symbol_table)
+        if last_fun_main(symbol_table):
+            return True
+        else:
+            raise Exception(
+                "SEMANTIC: Last function declaration must be void main(void){}")
+    else:
+        # did not end correctly
+        raise Exception(f'TOP: Did not end on $, got {SYMBOLS[token]}')
@@ -0,0 +1,405 @@
+"""
+Incremental parser for editors, re-parsing only the top-level declarations an edit can change.
+
+Between two top-level declarations the parser state is small: the stack is always
+[$, declaration_list], the scopes hold nothing but the globals, and the rest is the symbol table
+rows the semantic checks read and write. Each declaration of the last parse records the rows it
+changed, the globals it declared and the identifiers it names, so the state before any
+declaration is found in per row histories instead of being copied at every one.
+
+An edit is re-parsed from the declaration holding the token before the first one it changed,
+the parser is LL(1) and never looks further back. At every declaration boundary past the edit the
+state is compared with the state the last parse had at the same boundary, and parsing stops as
+soon as they agree on every row and global named by the declarations after it: from there on the
+old declarations are parsed the same. A typical edit costs the declarations it touches plus one
+pass over the declaration list to renumber them, however large the program.
+
+Results and errors are the same as run_scanner followed by LL1 on the whole source.
+"""
+import os
+from bisect import bisect_left, bisect_right, insort
+from itertools import accumulate
+
+import util.grammar as gram
+from incremental_scanner import IncrementalScanner
+from parser import LL1_resume
+from util.symbol_table import ScopedSymbolTable
+from util.token_dict import TOKENS
+
+GRAMMAR_TXT = os.path.join(os.path.dirname(__file__), "util", "grammar.txt")
+
+# scanner token ID of identifiers
+ID = TOKENS.index('ID') + 1
+
+# tokens pulled from the scanner at a time while re-parsing
+FETCH_SIZE = 64
+
+# row of an identifier no declaration has given a type yet
+UNDECLARED = (None, None)
+
+
+def declaration_index(declaration) -> int:
+    return declaration.index
+
+
+class Declaration:
+    """
+    Top-level declaration of the last parse and what it did to the parser state.
+    """
+
+    def __init__(self, length: int, writes: dict, globals: dict, names: list):
+        """
+        args
+            length: number of tokens of the declaration.
+            writes: row -> (type(fun/var), return type or var scope) of the rows it changed, after it.
+            globals: name -> (type(fun/var), return type or var scope) of the global entries it
+                declared, functions included.
+            names: rows of the identifiers in it, in order of first appearance.
+        """
+        self.length = length
+        self.writes = writes
+        self.globals = globals
+        self.names = names
+        self.index = 0  # position in the declaration list
+
+
+class Row(list):
+    """
+    Symbol table row in parser format that logs its value before the first write of each
+    declaration in its table.
+    """
+
+    def __init__(self, entry: list, table, row: int):
+        super().__init__(entry)
+        self.table = table
+        self.row = row
+
+    def __setitem__(self, i: int, value):
+        if self.row not in self.table.before:
+            self.table.before[self.row] = (self[1], self[2])
+        super().__setitem__(i, value)
+
+
+class RowTable(dict):
+    """
+    Symbol table in parser format for re-parsing from a declaration boundary, indexed by row like
+    the list LL1 takes. Rows are built from the histories on first use.
+    """
+
+    def __init__(self, parser, boundary: int):
+        super().__init__()
+        self.parser = parser
+        self.boundary = boundary
+        self.before = {}  # row -> value before its first write in the current declaration
+
+    def __missing__(self, row: int) -> Row:
+        self[row] = Row([self.parser.scanner.identifiers[row], *self.parser.row_at(row, self.boundary)],
+                        self, row)
+        return self[row]
+
+
+class GlobalScope(dict):
+    """
+    Global scope for re-parsing from a declaration boundary. Globals declared before it are found
+    in the histories, the ones declared since are stored in the dict and logged per declaration.
+    """
+
+    def __init__(self, parser, boundary: int):
+        super().__init__()
+        self.parser = parser
+        self.boundary = boundary
+        self.declared = {}  # name -> entry declared in the current declaration
+
+    def __setitem__(self, name: str, entry: list):
+        self.declared[name] = entry
+        super().__setitem__(name, entry)
+
+    def get(self, name: str, default=None):
+        entry = super().get(name)
+        if entry is None:
+            value = self.parser.global_at(name, self.boundary)
+            if value is not None:
+                return [name, *value]
+        return entry if entry is not None else default
+
+
+class ScannedTokens:
+    """
+    Tokens of the scanner from a position on, pulled a few at a time as the parser reads them.
+    """
+
+    def __init__(self, scanner: IncrementalScanner, start: int):
+        self.scanner = scanner
+        self.start = start
+        self.tokens = []
+
+    def __getitem__(self, i: int) -> list:
+        j = i - self.start
+        while j >= len(self.tokens):
+            end = self.start + len(self.tokens)
+            if end >= len(self.scanner):
+                raise IndexError('list index out of range')
+            chunk, k = self.scanner.locate(end)
+            line_shift = chunk.line_shift
+            if line_shift:
+                self.tokens.extend([token[0] + line_shift] + token[1:]
+                                   for token in chunk.tokens[k:k + FETCH_SIZE])
+            else:
+                self.tokens.extend(chunk.tokens[k:k + FETCH_SIZE])
+        if j < 0:
+            return self.scanner[i]
+        return self.tokens[j]
+
+    def end(self) -> int:
+        """
+        Position of the first token not read yet.
+        """
+        return self.start + len(self.tokens)
+
+
+class IncrementalParser:
+    """
+    Source code and whether it parses, kept up to date through edits.
+    """
+
+    def __init__(self, source: str = "", grammar: dict = None, parse_table=None, stats=None):
+        """
+        args
+            source: initial source code.
+            grammar: dict representing grammar derived from .txt, util/grammar.txt by default.
+            parse_table: parse table of grammar, or its CompiledParseTable.
+            stats: optional util.stats.Stats tokens and declarations re-parsed are counted in, as
+                well as what the scanner re-lexes.
+        """
+        if grammar is None:
+            grammar, non_terminals, terminals, productions, parse_table = gram.load_grammar_tables(
+                GRAMMAR_TXT)
+        if not isinstance(parse_table, gram.CompiledParseTable):
+            parse_table = gram.compile_parse_table(grammar, parse_table, TOKENS)
+        self.parse_table = parse_table
+        self.productions = gram.enumerate_productions(grammar)
+        self.stats = stats
+        self.scanner = IncrementalScanner(source, stats)
+
+        self.declarations = []
+        self.starts = [0]  # first token of each declaration, and the end of the last one
+        self.complete = False  # whether the declarations reach '$' and were accepted
+        self.history = {}  # row -> declarations that changed it, in order
+        self.global_history = {}  # name -> declarations that declared it in the global scope, in order
+        self.occurrences = {}  # row -> declarations naming it, in order
+
+        # the tokens are the declarations' ones but for [dirty_start, dirty_end), and the tokens
+        # after it are shifted by dirty_shift. The declarations start out with no tokens.
+        self.dirty_start = 0
+        self.dirty_end = len(self.scanner)
+        self.dirty_shift = len(self.scanner)
+        self.error = None  # message of the syntax or semantic error of the source, if known
+        self.error_end = 0  # first token the parse raising it did not read
+
+    def edit(self, start: int, end: int, text: str) -> bool:
+        """
+        Replaces source[start:end] with text and parses it again.
+
+        returns
+            True if the source parses, else raises the scanner's or parser's error.
+        """
+        first, removed, inserted = self.scanner.edit(start, end, text)
+        shift = inserted - removed
+        if self.dirty_start is None:
+            self.dirty_start, self.dirty_end, self.dirty_shift = first, first + inserted, shift
+        else:
+            self.dirty_start = min(self.dirty_start, first)
+            self.dirty_end = max(self.dirty_end, first + removed) + shift
+            self.dirty_shift += shift
+
+        if first < self.error_end:
+            self.error = None  # else the tokens read up to the error did not change
+        return self.parse()
+
+    def parse(self) -> bool:
+        """
+        Parses what changed since the last parse, or raises the error found last if the edits since
+        are after the tokens it read.
+
+        returns
+            True if the source parses, else raises the scanner's or parser's error.
+        """
+        if self.scanner.error is not None:
+            raise Exception(self.scanner.error_message())
+        if self.error is not None:
+            raise Exception(self.error)
+        if self.scanner[0][1] == 30:
+            raise Exception("INPUT: code file cannot be empty")
+
+        if self.dirty_start is not None:
+            self.reparse()
+        if self.last_fun_main():
+            return True
+        raise Exception("SEMANTIC: Last function declaration must be void main(void){}")
+
+    def reparse(self):
+        """
+        Parses the declarations from the one before the dirty tokens until the state converges
+        with the last parse, and splices them into the declaration list.
+        """
+        parse_table = self.parse_table
+        symbols = parse_table.symbols
+        DOLLAR = parse_table.ids['$']
+        first = bisect_right(self.starts, max(self.dirty_start - 1, 0)) - 1
+        start = self.starts[first]
+        stack = [DOLLAR, parse_table.nt_base if first == 0 else parse_table.ids['declaration_list']]
+
+        tokens = ScannedTokens(self.scanner, start)
+        rows = RowTable(self, first)
+        global_scope = GlobalScope(self, first)
+        current_scope = ScopedSymbolTable(global_scope)
+
+        new = []
+        changed_rows = set()  # rows the new declarations changed
+        old_rows = set()  # rows the replaced declarations changed
+        old_globals = set()  # names the replaced declarations declared in the global scope
+        replaced = first  # end of the old declarations walked so far
+        declaration_start = start
+
+        def on_declaration(input_pointer: int) -> bool:
+            nonlocal declaration_start, replaced
+            if input_pointer == declaration_start:
+                return False
+
+            # record the declaration just parsed
+            writes = {}
+            for row, before in rows.before.items():
+                after = (rows[row][1], rows[row][2])
+                if after != before:
+                    writes[row] = after
+            rows.before.clear()
+            changed_rows.update(writes)
+            names = dict.fromkeys(token[2] - 1 for token in tokens.tokens[declaration_start - start:input_pointer - start]
+                                  if token[1] == ID)
+            new.append(Declaration(input_pointer - declaration_start, writes,
+                                   {name: (entry[1], entry[2]) for name, entry in global_scope.declared.items()},
+                                   list(names)))
+            global_scope.declared.clear()
+            declaration_start = input_pointer
+
+            if input_pointer < self.dirty_end or not self.complete:
+                return False
+            # old declaration starting here, if any
+            old = input_pointer - self.dirty_shift
+            boundary = bisect_left(self.starts, old)
+            if boundary >= len(self.declarations) or self.starts[boundary] != old:
+                return False
+            for declaration in self.declarations[replaced:boundary]:
+                old_rows.update(declaration.writes)
+                old_globals.update(declaration.globals)
+            replaced = boundary
+
+            # the state may only differ in rows and globals the old declarations left never name
+            for row in changed_rows | old_rows:
+                now = (rows[row][1], rows[row][2]) if row in rows else self.row_at(row, first)
+                if now != self.row_at(row, boundary) and self.named_from(row, boundary):
+                    return False
+            for name in set(global_scope) | old_globals:
+                now = (global_scope[name][1], global_scope[name][2]) if name in global_scope else \
+                    self.global_at(name, first)
+                if now != self.global_at(name, boundary) and self.named_from(
+                        self.scanner.identifiers.positions[name] - 1, boundary):
+                    return False
+            return True
+
+        try:
+            stack, input_pointer, token = LL1_resume(parse_table, self.productions, tokens, rows,
+                                                     current_scope, stack, start,
+                                                     on_declaration=on_declaration)
+        except Exception as e:
+            self.error = str(e)
+            self.error_end = tokens.end()
+            raise
+        finally:
+            if self.stats is not None:
+                self.stats.count("declarations", len(new))
+                self.stats.count("parsed_tokens", tokens.end() - start)
+
+        if stack[-1] != DOLLAR:  # converged
+            self.splice(first, replaced, new)
+        elif token == DOLLAR:  # parsed until the end
+            self.splice(first, len(self.declarations), new)
+            self.complete = True
+        else:
+            self.error = f'TOP: Did not end on $, got {symbols[token]}'
+            self.error_end = tokens.end()
+            raise Exception(self.error)
+
+    def splice(self, first: int, end: int, new: list):
+        """
+        Replaces declarations[first:end] with new, updating the histories.
+        """
+        for declaration in self.declarations[first:end]:
+            for row in declaration.writes:
+                self.history[row].remove(declaration)
+            for name in declaration.globals:
+                self.global_history[name].remove(declaration)
+            for row in declaration.names:
+                self.occurrences[row].remove(declaration)
+
+        self.declarations[first:end] = new
+        if len(new) != end - first:
+            for i in range(first + len(new), len(self.declarations)):
+                self.declarations[i].index = i
+
+        for i, declaration in enumerate(new, first):
+            declaration.index = i
+            for row in declaration.writes:
+                insort(self.history.setdefault(row, []), declaration, key=declaration_index)
+            for name in declaration.globals:
+                insort(self.global_history.setdefault(name, []), declaration, key=declaration_index)
+            for row in declaration.names:
+                insort(self.occurrences.setdefault(row, []), declaration, key=declaration_index)
+
+        self.starts = list(accumulate((declaration.length for declaration in self.declarations), initial=0))
+        self.dirty_start = None
+
+    def row_at(self, row: int, boundary: int) -> tuple:
+        """
+        returns
+            type(fun/var) and return type or var scope of row before declaration boundary
+        """
+        history = self.history.get(row)
+        if not history:
+            return UNDECLARED
+        i = bisect_left(history, boundary, key=declaration_index)
+        return history[i - 1].writes[row] if i > 0 else UNDECLARED
+
+    def global_at(self, name: str, boundary: int) -> tuple:
+        """
+        returns
+            type(fun/var) and return type or var scope of the global entry for name before
+            declaration boundary, None if there is none
+        """
+        history = self.global_history.get(name)
+        if not history:
+            return None
+        i = bisect_left(history, boundary, key=declaration_index)
+        return history[i - 1].globals[name] if i > 0 else None
+
+    def named_from(self, row: int, boundary: int) -> bool:
+        """
+        returns
+            whether a declaration from boundary on names the identifier of row
+        """
+        occurrences = self.occurrences.get(row)
+        return bool(occurrences) and occurrences[-1].index >= boundary
+
+    def last_fun_main(self) -> bool:
+        """
+        Same as parser.last_fun_main on the symbol table run_scanner and LL1 would build: the function
+        appearing last for the first time must be void main.
+        """
+        for declaration in reversed(self.declarations):
+            for row in reversed(declaration.names):
+                if self.occurrences[row][0] is not declaration:
+                    continue  # appeared before
+                type, return_type = self.row_at(row, len(self.declarations))
+                if type == 'function':
+                    return self.scanner.identifiers[row] == 'main' and return_type == 'void'
+        return False
@@ -0,0 +1,367 @@
+"""
+Incremental scanner for editors, re-lexing only around each edit instead of the whole source.
+
+Every token records a checkpoint: the offset it starts at and the line there. The DFA is in its
+start state at every token boundary, never inside a comment, because the scanner only leaves a
+comment at its closing '*/'. An edit is re-lexed from the last checkpoint whose token cannot
+depend on the edited text, and scanning stops as soon as a new token starts where an old token
+started past the edit. The DFA only depends on the text ahead of it, so from there on the old
+tokens are still valid, shifted by the change in length and newlines. An edit that opens or
+closes a comment therefore re-lexes until the first token after the comment lines up again.
+
+Tokens are kept in chunks with a shift each, so the tokens after an edit are shifted one chunk
+at a time. An edit costs the text it re-lexes, a chunk of tokens and one step per chunk, plus
+copying the source around it.
+
+Tokens are found with the master pattern of the regex backend, so tokens, line numbers and
+lexical errors are the same as scanner.iter_tokens on the whole source.
+"""
+import re
+from bisect import bisect_left, bisect_right
+
+from regex_scanner import ALPHABET_MAP, ID, KEYWORD_IDS, MASTER_PATTERN, NUM, TOKEN_IDS
+from util.create_transition_table import lexical_error
+from util.symbol_table import SymbolTable
+
+# tokens per chunk, chunks are split again past twice this
+CHUNK_SIZE = 1024
+
+# char classes are kept in a bytearray edited in place, matched with a bytes master pattern
+MASTER_PATTERN_BYTES = re.compile(MASTER_PATTERN.pattern.encode(), re.VERBOSE)
+
+# identifier or number run, a lexical error is found at most one char after it
+RUN_PATTERN = re.compile(rb"[a0]*")
+
+
+class TokenChunk:
+    """
+    Consecutive tokens with their checkpoints, in parallel lists. Offsets and lines, token lines
+    included, are stored without the chunk's shift.
+    """
+
+    def __init__(self, tokens: list, offsets: list, lengths: list, lines: list):
+        self.tokens = tokens
+        self.offsets = offsets  # offset each token starts at
+        self.lengths = lengths
+        self.lines = lines  # line at the start of each token, not always the token's line
+        self.offset_shift = 0
+        self.line_shift = 0
+
+    def flush(self):
+        """
+        Adds the shift to every stored offset and line.
+        """
+        if self.offset_shift:
+            self.offsets = [offset + self.offset_shift for offset in self.offsets]
+        if self.line_shift:
+            line_shift = self.line_shift
+            self.lines = [line + line_shift for line in self.lines]
+            for token in self.tokens:
+                token[0] += line_shift
+        self.offset_shift = 0
+        self.line_shift = 0
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+
+class IncrementalScanner:
+    """
+    Source code and its tokens, kept up to date through edits.
+
+    Indexing returns tokens in the scanner output format like TokenBuffer, so LL1 can use the
+    scanner as its input directly with identifiers.to_list() as its symbol table. Positions in
+    the number and identifier tables stay stable across edits, entries are never removed even
+    if the source no longer has them. output() renumbers them as run_scanner would.
+    """
+
+    def __init__(self, source: str = "", stats=None):
+        """
+        args
+            source: initial source code.
+            stats: optional util.stats.Stats characters and tokens re-lexed are counted in.
+        """
+        self.stats = stats
+        self.source = source
+        self.scan_all()
+
+    def edit(self, start: int, end: int, text: str) -> tuple:
+        """
+        Replaces source[start:end] with text and re-lexes what it changed.
+
+        returns
+            first: index of the first token replaced
+            removed: number of tokens removed from there
+            inserted: number of new tokens in their place, the tokens after them keep their order
+        """
+        if not 0 <= start <= end <= len(self.source):
+            raise ValueError(f"edit {start}:{end} is out of the source, of length {len(self.source)}")
+
+        line_shift = text.count("\n") - self.source.count("\n", start, end)
+        lowered = text.lower()
+        aligned = len(lowered) == len(text) and self.text is self.source
+        self.source = self.source[:start] + text + self.source[end:]
+        if not aligned:
+            # lowercasing changes the length of some char (e.g. 'İ'), offsets no longer match
+            removed = len(self)
+            self.scan_all()
+            return 0, removed, len(self)
+
+        offset_shift = len(text) - (end - start)
+        self.text = self.source
+        self.classes[start:end] = lowered.translate(ALPHABET_MAP).encode("ascii")
+
+        # first token decided by a char in the edit, tokens are decided by the char after them
+        n = len(self)
+        first = bisect_left(range(n), start, key=lambda i: self.offset(i) + self.length(i))
+        if first < n and self.offset(first) <= start:
+            offset, line = self.offset(first), self.line(first)
+        elif first > 0:  # the edit is between tokens, start right after the one before
+            offset, line = self.offset(first - 1) + self.length(first - 1), self.line(first - 1)
+        else:
+            offset, line = 0, 1
+
+        tokens, offsets, lengths, lines, resync, error = self.relex(
+            offset, line, start + len(text), first, offset_shift)
+
+        if resync < n:
+            # the old tokens from resync on are kept, shifted, and so is a lexical error after them
+            if self.error is not None:
+                error_offset, error_line = self.error
+                self.error = (error_offset + offset_shift, error_line + line_shift)
+        else:
+            self.error = error
+        self.splice(first, resync, TokenChunk(tokens, offsets, lengths, lines),
+                    offset_shift, line_shift)
+        return first, resync - first, len(tokens)
+
+    def scan_all(self):
+        """
+        Scans the whole source again, with empty number and identifier tables.
+        """
+        # tokens are lowercased one at a time, unless that would change offsets
+        lowered = self.source.lower()
+        self.text = self.source if len(lowered) == len(self.source) else lowered
+        self.classes = bytearray(lowered.translate(ALPHABET_MAP), "ascii")
+        self.numbers = SymbolTable()
+        self.identifiers = SymbolTable()
+        self.chunks = [TokenChunk([], [], [], [])]
+        self.chunk_starts = [0]  # index of the first token of each chunk
+        self.error = None
+
+        tokens, offsets, lengths, lines, _, self.error = self.relex(0, 1, 0, 0, 0)
+        self.splice(0, 0, TokenChunk(tokens, offsets, lengths, lines), 0, 0)
+
+    def relex(self, offset: int, line: int, edit_end: int, old: int, offset_shift: int) -> tuple:
+        """
+        Scans from a checkpoint until the token stream lines up with the old one again.
+
+        args
+            offset: checkpoint to scan from, a token boundary.
+            line: line number at offset.
+            edit_end: offset the edited text ends at, old tokens can only be kept from there on.
+            old: index of the first old token not before offset.
+            offset_shift: change in length of the source, old offsets plus it are new offsets.
+
+        returns
+            new tokens with their offsets, lengths and lines, index of the old token they end
+            before (the number of old tokens if scanning reached the end of the source), and
+            (offset, line) of the lexical error ending the source, None if there is none
+        """
+        text = self.text
+        classes = self.classes
+        intern_number = self.numbers.intern
+        intern_identifier = self.identifiers.intern
+        n = len(self)
+
+        tokens = []
+        offsets = []
+        lengths = []
+        lines = []
+        scanned = offset
+        error = None
+        while True:
+            match = MASTER_PATTERN_BYTES.match(classes, offset)
+            kind = match.lastgroup
+            start, end = match.span(kind) if kind is not None else (len(text), len(text))
+            offset = end
+
+            if kind == "newline":
+                line += 1
+                continue
+            if kind == "comment":
+                line += text.count("\n", start, end)
+                continue
+
+            if start >= edit_end:
+                # past the edit, an old token starting here is scanned the same again
+                while old < n and self.offset(old) + offset_shift < start:
+                    old += 1
+                if old < n and self.offset(old) + offset_shift == start:
+                    break
+
+            if kind is None:  # end of the source
+                token = [line, 30]  # '$' token ID
+            elif kind == "id":
+                identifier = text[start:end].lower()
+                # the char ending the token is counted, even if it is a newline
+                token_line = line + (classes[end:end + 1] == b"\n")
+                token = KEYWORD_IDS.get(identifier)
+                if token is None:
+                    token = [token_line, ID, intern_identifier(identifier)]
+                else:
+                    token = [token_line, token]
+            elif kind == "punctuation" or kind == "double":
+                token = [line, TOKEN_IDS[text[start:end]]]
+            elif kind == "num":
+                token = [line + (classes[end:end + 1] == b"\n"), NUM, intern_number(int(text[start:end]))]
+            elif kind == "single":
+                token = [line + (classes[end:end + 1] == b"\n"), TOKEN_IDS[text[start:end]]]
+            else:  # lexical error or unterminated comment, the rest of the source is not scanned
+                error = (start, line)
+                old = n
+                break
+
+            tokens.append(token)
+            offsets.append(start)
+            lengths.append(end - start)
+            lines.append(line)
+            if kind is None:
+                old = n
+                break
+
+        if self.stats is not None:
+            self.stats.count("chars", offset - scanned)
+            self.stats.count("tokens", len(tokens))
+        return tokens, offsets, lengths, lines, old, error
+
+    def splice(self, first: int, resync: int, new: TokenChunk, offset_shift: int, line_shift: int):
+        """
+        Replaces tokens[first:resync] with the tokens of new, shifting the tokens after them.
+        """
+        # the chunks holding the replaced tokens are rebuilt, those after them only shifted
+        chunks = self.chunks
+        first_chunk = bisect_right(self.chunk_starts, first) - 1
+        last_chunk = bisect_right(self.chunk_starts, resync) - 1
+        head = chunks[first_chunk]
+        tail = chunks[last_chunk]
+        head.flush()
+        tail.flush()
+        cut = first - self.chunk_starts[first_chunk]
+        kept = resync - self.chunk_starts[last_chunk]
+        if line_shift:
+            for token in tail.tokens[kept:]:
+                token[0] += line_shift
+        new = TokenChunk(head.tokens[:cut] + new.tokens + tail.tokens[kept:],
+                         head.offsets[:cut] + new.offsets +
+                         [offset + offset_shift for offset in tail.offsets[kept:]],
+                         head.lengths[:cut] + new.lengths + tail.lengths[kept:],
+                         head.lines[:cut] + new.lines +
+                         [line + line_shift for line in tail.lines[kept:]])
+        for chunk in chunks[last_chunk + 1:]:
+            chunk.offset_shift += offset_shift
+            chunk.line_shift += line_shift
+
+        # split the rebuilt tokens into chunks, keeping at least one chunk
+        n = len(new)
+        if n > 2 * CHUNK_SIZE:
+            rebuilt = [TokenChunk(new.tokens[i:i + CHUNK_SIZE], new.offsets[i:i + CHUNK_SIZE],
+                                  new.lengths[i:i + CHUNK_SIZE], new.lines[i:i + CHUNK_SIZE])
+                       for i in range(0, n, CHUNK_SIZE)]
+        elif n or last_chunk - first_chunk + 1 == len(chunks):
+            rebuilt = [new]
+        else:
+            rebuilt = []
+        chunks[first_chunk:last_chunk + 1] = rebuilt
+
+        self.chunk_starts = []
+        start = 0
+        for chunk in chunks:
+            self.chunk_starts.append(start)
+            start += len(chunk)
+
+    def locate(self, i: int) -> tuple:
+        """
+        returns
+            the chunk holding token i and the index of the token in it
+        """
+        c = bisect_right(self.chunk_starts, i) - 1
+        return self.chunks[c], i - self.chunk_starts[c]
+
+    def offset(self, i: int) -> int:
+        """
+        Offset token i starts at, its checkpoint.
+        """
+        chunk, j = self.locate(i)
+        return chunk.offsets[j] + chunk.offset_shift
+
+    def length(self, i: int) -> int:
+        chunk, j = self.locate(i)
+        return chunk.lengths[j]
+
+    def line(self, i: int) -> int:
+        """
+        Line number at the start of token i.
+        """
+        chunk, j = self.locate(i)
+        return chunk.lines[j] + chunk.line_shift
+
+    def error_message(self) -> str:
+        """
+        returns
+            the lexical error the scanner raises on the source, None if it has none
+        """
+        if self.error is None:
+            return None
+        offset, line = self.error
+        if self.classes.startswith(b"/*", offset):
+            line += self.classes.count(b"\n", offset)
+            return f"LEXICAL ERROR: Unexpected end of file in line {line}"
+        end = RUN_PATTERN.match(self.classes, offset).end() + 2
+        return lexical_error(self.text[offset:end].lower(), 0, line)
+
+    def output(self) -> tuple:
+        """
+        Exports the tokens as run_scanner does for the current source, raising its lexical error.
+
+        returns
+            scanner_output: list of lists with tokenIDs in format [line, ID, (position in symbol table)]
+            number_symbol_table: list of numbers
+            identifier_symbol_table: list of identifiers
+        """
+        if self.error is not None:
+            raise Exception(self.error_message())
+
+        # renumber the tables in order of first appearance
+        number_symbol_table = SymbolTable()
+        identifier_symbol_table = SymbolTable()
+        numbers = self.numbers.entries
+        identifiers = self.identifiers.entries
+        scanner_output = []
+        for chunk in self.chunks:
+            line_shift = chunk.line_shift
+            for token in chunk.tokens:
+                if token[1] == ID:
+                    token = [token[0] + line_shift, ID,
+                             identifier_symbol_table.intern(identifiers[token[2] - 1])]
+                elif token[1] == NUM:
+                    token = [token[0] + line_shift, NUM,
+                             number_symbol_table.intern(numbers[token[2] - 1])]
+                else:
+                    token = [token[0] + line_shift, token[1]]
+                scanner_output.append(token)
+        return scanner_output, number_symbol_table.to_list(), identifier_symbol_table.to_list()
+
+    def __getitem__(self, i: int) -> list:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"token {i} is past the end of input")
+        chunk, j = self.locate(i)
+        token = chunk.tokens[j]
+        if chunk.line_shift:
+            return [token[0] + chunk.line_shift] + token[1:]
+        return token
+
+    def __len__(self) -> int:
+        return self.chunk_starts[-1] + len(self.chunks[-1])
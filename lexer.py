@@ -0,0 +1,538 @@
+"""
+C- lexer generated from util/transitions.csv by util/create_transition_table.py.
+
+Do not edit, regenerate with:
+    python util/create_transition_table.py
+"""
+import re
+
+from util.create_transition_table import CharClassMap
+from util.symbol_table import SymbolTable
+from util.token_dict import create_token_dict
+
+# number of characters pulled from the source file per read, as in the scanner
+BLOCK_SIZE = 1 << 16
+
+# transition table columns, a char class is the index of its column
+KEYS = ['letter', 'digit', '!', '<', '>', '=', '+', '-', '*', '/', ',', ';', '(', ')', '[', ']', '{', '}', 'delim', 'bad_char']
+CLASS_MAP = CharClassMap(KEYS)
+
+TOKEN_IDS = create_token_dict()
+ID = TOKEN_IDS['ID']
+NUM = TOKEN_IDS['NUM']
+KEYWORDS = {keyword: TOKEN_IDS[keyword] for keyword in ['if', 'else', 'void', 'return', 'int', 'while', 'input', 'output']}
+
+# single char tokens by char class, accepted straight from state 0
+SINGLE_CHAR_TOKENS = {
+    6: TOKEN_IDS['+'],
+    7: TOKEN_IDS['-'],
+    8: TOKEN_IDS['*'],
+    10: TOKEN_IDS[','],
+    11: TOKEN_IDS[';'],
+    12: TOKEN_IDS['('],
+    13: TOKEN_IDS[')'],
+    14: TOKEN_IDS['['],
+    15: TOKEN_IDS[']'],
+    16: TOKEN_IDS['{'],
+    17: TOKEN_IDS['}'],
+}
+
+# runs of the char classes each state loops on
+RUN_0 = re.compile(b'[\x12]*').match  # delim
+RUN_1 = re.compile(b'[\x00]*').match  # letter
+RUN_2 = re.compile(b'[\x01]*').match  # digit
+RUN_8 = re.compile(b'[^\x08]*').match  # all but *
+
+
+def iter_tokens(code_file: str, number_symbol_table: SymbolTable = None, identifier_symbol_table: SymbolTable = None, verbose: bool = False, stats=None):
+    """
+    Runs the lexer lazily, yielding the same tokens and errors as scanner.iter_tokens.
+
+    args
+        code_file: a str with the file location and name of the source code, or an open text file.
+        number_symbol_table: SymbolTable numbers are interned into while scanning.
+        identifier_symbol_table: SymbolTable identifiers are interned into while scanning.
+        stats: optional util.stats.Stats characters read are counted in.
+
+    yields
+        tokenIDs in format [line, ID, (position in symbol table)], ending with the '$' token.
+    """
+    if number_symbol_table is None:
+        number_symbol_table = SymbolTable()
+    if identifier_symbol_table is None:
+        identifier_symbol_table = SymbolTable()
+
+    intern_number = number_symbol_table.intern
+    intern_identifier = identifier_symbol_table.intern
+
+    opened = isinstance(code_file, str)
+    code = open(code_file) if opened else code_file
+
+    if verbose:
+        print("RUNNING SCANNER")
+
+    buffer = ""
+    classes = b""  # char class of every char in buffer
+    pos = end = 0
+    identifier = ""
+    state = 0
+    line = 1
+
+    while True:
+        if pos == end:
+            buffer = code.read(BLOCK_SIZE).lower()
+            if stats is not None:
+                stats.count("chars", len(buffer))
+            if not buffer:
+                break
+            classes = buffer.translate(CLASS_MAP).encode('latin-1')
+            pos = 0
+            end = len(buffer)
+
+        if state == 0:
+            if classes[pos] == 18:
+                start = pos
+                pos += 1
+                if pos < end and classes[pos] == 18:
+                    pos = RUN_0(classes, pos).end()
+                    line += buffer.count("\n", start, pos)
+                else:
+                    line += buffer[start] == "\n"
+                if pos == end:
+                    continue
+            char_class = classes[pos]
+            if char_class == 0:  # letter
+                start = pos
+                pos = RUN_1(classes, pos + 1).end()
+                identifier = buffer[start:pos]
+                if pos == end:
+                    state = 1
+                    continue
+                char_class = classes[pos]
+                if char_class == 1:  # digit
+                    identifier += buffer[pos]
+                    if opened:
+                        code.close()
+                    raise Exception(f"LEXICAL ERROR: Identifiers cannot have numbers: '{identifier}' in line {line}")
+                elif char_class == 19:  # bad_char
+                    identifier += buffer[pos]
+                    if opened:
+                        code.close()
+                    raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+                else:  # !, <, >, =, +, -, *, /, ,, ;, (, ), [, ], {, }, delim
+                    if verbose:
+                        print(identifier)
+                    token = KEYWORDS.get(identifier)
+                    if token is None:
+                        yield [line + (buffer[pos] == "\n"), ID, intern_identifier(identifier)]
+                    else:
+                        yield [line + (buffer[pos] == "\n"), token]
+                    identifier = ""
+            elif char_class == 1:  # digit
+                start = pos
+                pos = RUN_2(classes, pos + 1).end()
+                identifier = buffer[start:pos]
+                if pos == end:
+                    state = 2
+                    continue
+                char_class = classes[pos]
+                if char_class == 0:  # letter
+                    identifier += buffer[pos]
+                    if opened:
+                        code.close()
+                    raise Exception(f"LEXICAL ERROR: Numbers cannot have letters: '{identifier}' in line {line}")
+                elif char_class == 19:  # bad_char
+                    identifier += buffer[pos]
+                    if opened:
+                        code.close()
+                    raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+                else:  # !, <, >, =, +, -, *, /, ,, ;, (, ), [, ], {, }, delim
+                    if verbose:
+                        print(identifier)
+                    yield [line + (buffer[pos] == "\n"), NUM, intern_number(int(identifier))]
+                    identifier = ""
+            elif char_class == 2:  # !
+                identifier += buffer[pos]
+                pos += 1
+                if pos == end:
+                    state = 3
+                    continue
+                char_class = classes[pos]
+                if char_class == 5:  # =
+                    identifier += buffer[pos]
+                    pos += 1
+                    if verbose:
+                        print(identifier)
+                    yield [line, TOKEN_IDS[identifier]]
+                    identifier = ""
+                elif char_class == 19:  # bad_char
+                    identifier += buffer[pos]
+                    if opened:
+                        code.close()
+                    raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+                else:  # letter, digit, !, <, >, +, -, *, /, ,, ;, (, ), [, ], {, }, delim
+                    identifier += buffer[pos]
+                    line += buffer[pos] == "\n"
+                    if opened:
+                        code.close()
+                    raise Exception(f"LEXICAL ERROR: expected '=': '{identifier}' in line {line}")
+            elif char_class == 3:  # <
+                identifier += buffer[pos]
+                pos += 1
+                if pos == end:
+                    state = 4
+                    continue
+                char_class = classes[pos]
+                if char_class == 5:  # =
+                    identifier += buffer[pos]
+                    pos += 1
+                    if verbose:
+                        print(identifier)
+                    yield [line, TOKEN_IDS[identifier]]
+                    identifier = ""
+                elif char_class == 19:  # bad_char
+                    identifier += buffer[pos]
+                    if opened:
+                        code.close()
+                    raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+                else:  # letter, digit, !, <, >, +, -, *, /, ,, ;, (, ), [, ], {, }, delim
+                    if verbose:
+                        print(identifier)
+                    yield [line + (buffer[pos] == "\n"), TOKEN_IDS[identifier]]
+                    identifier = ""
+            elif char_class == 4:  # >
+                identifier += buffer[pos]
+                pos += 1
+                if pos == end:
+                    state = 5
+                    continue
+                char_class = classes[pos]
+                if char_class == 5:  # =
+                    identifier += buffer[pos]
+                    pos += 1
+                    if verbose:
+                        print(identifier)
+                    yield [line, TOKEN_IDS[identifier]]
+                    identifier = ""
+                elif char_class == 19:  # bad_char
+                    identifier += buffer[pos]
+                    if opened:
+                        code.close()
+                    raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+                else:  # letter, digit, !, <, >, +, -, *, /, ,, ;, (, ), [, ], {, }, delim
+                    if verbose:
+                        print(identifier)
+                    yield [line + (buffer[pos] == "\n"), TOKEN_IDS[identifier]]
+                    identifier = ""
+            elif char_class == 5:  # =
+                identifier += buffer[pos]
+                pos += 1
+                if pos == end:
+                    state = 6
+                    continue
+                char_class = classes[pos]
+                if char_class == 5:  # =
+                    identifier += buffer[pos]
+                    pos += 1
+                    if verbose:
+                        print(identifier)
+                    yield [line, TOKEN_IDS[identifier]]
+                    identifier = ""
+                elif char_class == 19:  # bad_char
+                    identifier += buffer[pos]
+                    if opened:
+                        code.close()
+                    raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+                else:  # letter, digit, !, <, >, +, -, *, /, ,, ;, (, ), [, ], {, }, delim
+                    if verbose:
+                        print(identifier)
+                    yield [line + (buffer[pos] == "\n"), TOKEN_IDS[identifier]]
+                    identifier = ""
+            elif char_class == 9:  # /
+                identifier += buffer[pos]
+                pos += 1
+                if pos == end:
+                    state = 7
+                    continue
+                char_class = classes[pos]
+                if char_class == 8:  # *
+                    identifier += buffer[pos]
+                    pos += 1
+                    state = 8
+                elif char_class == 19:  # bad_char
+                    identifier += buffer[pos]
+                    if opened:
+                        code.close()
+                    raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+                else:  # letter, digit, !, <, >, =, +, -, /, ,, ;, (, ), [, ], {, }, delim
+                    if verbose:
+                        print(identifier)
+                    yield [line + (buffer[pos] == "\n"), TOKEN_IDS[identifier]]
+                    identifier = ""
+            elif char_class == 19:  # bad_char
+                identifier += buffer[pos]
+                if opened:
+                    code.close()
+                raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+            else:  # +, -, *, ,, ;, (, ), [, ], {, }
+                pos += 1
+                if verbose:
+                    print(buffer[pos - 1])
+                yield [line, SINGLE_CHAR_TOKENS[char_class]]
+
+        elif state == 1:
+            if classes[pos] == 0:
+                start = pos
+                pos = RUN_1(classes, pos + 1).end()
+                identifier += buffer[start:pos]
+                if pos == end:
+                    continue
+            char_class = classes[pos]
+            if char_class == 1:  # digit
+                identifier += buffer[pos]
+                if opened:
+                    code.close()
+                raise Exception(f"LEXICAL ERROR: Identifiers cannot have numbers: '{identifier}' in line {line}")
+            elif char_class == 19:  # bad_char
+                identifier += buffer[pos]
+                if opened:
+                    code.close()
+                raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+            else:  # !, <, >, =, +, -, *, /, ,, ;, (, ), [, ], {, }, delim
+                if verbose:
+                    print(identifier)
+                token = KEYWORDS.get(identifier)
+                if token is None:
+                    yield [line + (buffer[pos] == "\n"), ID, intern_identifier(identifier)]
+                else:
+                    yield [line + (buffer[pos] == "\n"), token]
+                identifier = ""
+                state = 0
+
+        elif state == 2:
+            if classes[pos] == 1:
+                start = pos
+                pos = RUN_2(classes, pos + 1).end()
+                identifier += buffer[start:pos]
+                if pos == end:
+                    continue
+            char_class = classes[pos]
+            if char_class == 0:  # letter
+                identifier += buffer[pos]
+                if opened:
+                    code.close()
+                raise Exception(f"LEXICAL ERROR: Numbers cannot have letters: '{identifier}' in line {line}")
+            elif char_class == 19:  # bad_char
+                identifier += buffer[pos]
+                if opened:
+                    code.close()
+                raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+            else:  # !, <, >, =, +, -, *, /, ,, ;, (, ), [, ], {, }, delim
+                if verbose:
+                    print(identifier)
+                yield [line + (buffer[pos] == "\n"), NUM, intern_number(int(identifier))]
+                identifier = ""
+                state = 0
+
+        elif state == 3:
+            char_class = classes[pos]
+            if char_class == 5:  # =
+                identifier += buffer[pos]
+                pos += 1
+                if verbose:
+                    print(identifier)
+                yield [line, TOKEN_IDS[identifier]]
+                identifier = ""
+                state = 0
+            elif char_class == 19:  # bad_char
+                identifier += buffer[pos]
+                if opened:
+                    code.close()
+                raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+            else:  # letter, digit, !, <, >, +, -, *, /, ,, ;, (, ), [, ], {, }, delim
+                identifier += buffer[pos]
+                line += buffer[pos] == "\n"
+                if opened:
+                    code.close()
+                raise Exception(f"LEXICAL ERROR: expected '=': '{identifier}' in line {line}")
+
+        elif state == 4:
+            char_class = classes[pos]
+            if char_class == 5:  # =
+                identifier += buffer[pos]
+                pos += 1
+                if verbose:
+                    print(identifier)
+                yield [line, TOKEN_IDS[identifier]]
+                identifier = ""
+                state = 0
+            elif char_class == 19:  # bad_char
+                identifier += buffer[pos]
+                if opened:
+                    code.close()
+                raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+            else:  # letter, digit, !, <, >, +, -, *, /, ,, ;, (, ), [, ], {, }, delim
+                if verbose:
+                    print(identifier)
+                yield [line + (buffer[pos] == "\n"), TOKEN_IDS[identifier]]
+                identifier = ""
+                state = 0
+
+        elif state == 5:
+            char_class = classes[pos]
+            if char_class == 5:  # =
+                identifier += buffer[pos]
+                pos += 1
+                if verbose:
+                    print(identifier)
+                yield [line, TOKEN_IDS[identifier]]
+                identifier = ""
+                state = 0
+            elif char_class == 19:  # bad_char
+                identifier += buffer[pos]
+                if opened:
+                    code.close()
+                raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+            else:  # letter, digit, !, <, >, +, -, *, /, ,, ;, (, ), [, ], {, }, delim
+                if verbose:
+                    print(identifier)
+                yield [line + (buffer[pos] == "\n"), TOKEN_IDS[identifier]]
+                identifier = ""
+                state = 0
+
+        elif state == 6:
+            char_class = classes[pos]
+            if char_class == 5:  # =
+                identifier += buffer[pos]
+                pos += 1
+                if verbose:
+                    print(identifier)
+                yield [line, TOKEN_IDS[identifier]]
+                identifier = ""
+                state = 0
+            elif char_class == 19:  # bad_char
+                identifier += buffer[pos]
+                if opened:
+                    code.close()
+                raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+            else:  # letter, digit, !, <, >, +, -, *, /, ,, ;, (, ), [, ], {, }, delim
+                if verbose:
+                    print(identifier)
+                yield [line + (buffer[pos] == "\n"), TOKEN_IDS[identifier]]
+                identifier = ""
+                state = 0
+
+        elif state == 7:
+            char_class = classes[pos]
+            if char_class == 8:  # *
+                start = pos
+                pos = RUN_8(classes, pos + 1).end()
+                line += buffer.count("\n", start, pos)
+                if pos == end:
+                    state = 8
+                    continue
+                # *
+                pos += 1
+                state = 9
+            elif char_class == 19:  # bad_char
+                identifier += buffer[pos]
+                if opened:
+                    code.close()
+                raise Exception(f"LEXICAL ERROR: Invalid Char: '{identifier}' in line {line}")
+            else:  # letter, digit, !, <, >, =, +, -, /, ,, ;, (, ), [, ], {, }, delim
+                if verbose:
+                    print(identifier)
+                yield [line + (buffer[pos] == "\n"), TOKEN_IDS[identifier]]
+                identifier = ""
+                state = 0
+
+        elif state == 8:
+            if classes[pos] in (0, 1, 2, 3, 4, 5, 6, 7, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19):
+                start = pos
+                pos += 1
+                if pos < end and classes[pos] in (0, 1, 2, 3, 4, 5, 6, 7, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19):
+                    pos = RUN_8(classes, pos).end()
+                    line += buffer.count("\n", start, pos)
+                else:
+                    line += buffer[start] == "\n"
+                if pos == end:
+                    continue
+            # *
+            pos += 1
+            if pos == end:
+                state = 9
+                continue
+            char_class = classes[pos]
+            if char_class == 9:  # /
+                pos += 1
+                identifier = ""
+                state = 0
+            else:  # letter, digit, !, <, >, =, +, -, *, ,, ;, (, ), [, ], {, }, delim, bad_char
+                line += buffer[pos] == "\n"
+                pos += 1
+                state = 8
+
+        elif state == 9:
+            char_class = classes[pos]
+            if char_class == 9:  # /
+                pos += 1
+                identifier = ""
+                state = 0
+            else:  # letter, digit, !, <, >, =, +, -, *, ,, ;, (, ), [, ], {, }, delim, bad_char
+                start = pos
+                pos = RUN_8(classes, pos + 1).end()
+                line += buffer.count("\n", start, pos)
+                if pos == end:
+                    state = 8
+                    continue
+                # *
+                pos += 1
+                state = 9
+
+    # end of file, read as a delimiter
+    if state == 1:
+        if verbose:
+            print(identifier)
+        token = KEYWORDS.get(identifier)
+        if token is None:
+            yield [line, ID, intern_identifier(identifier)]
+        else:
+            yield [line, token]
+    elif state == 2:
+        if verbose:
+            print(identifier)
+        yield [line, NUM, intern_number(int(identifier))]
+    elif state == 3:
+        if opened:
+            code.close()
+        raise Exception(f"LEXICAL ERROR: expected '=': '{identifier}' in line {line}")
+    elif state == 4:
+        if verbose:
+            print(identifier)
+        yield [line, TOKEN_IDS[identifier]]
+    elif state == 5:
+        if verbose:
+            print(identifier)
+        yield [line, TOKEN_IDS[identifier]]
+    elif state == 6:
+        if verbose:
+            print(identifier)
+        yield [line, TOKEN_IDS[identifier]]
+    elif state == 7:
+        if verbose:
+            print(identifier)
+        yield [line, TOKEN_IDS[identifier]]
+    elif state == 8:
+        if opened:
+            code.close()
+        raise Exception(f"LEXICAL ERROR: Unexpected end of file in line {line}")
+    elif state == 9:
+        if opened:
+            code.close()
+        raise Exception(f"LEXICAL ERROR: Unexpected end of file in line {line}")
+
+    if verbose:
+        print("End of source code file.")
+    if opened:
+        code.close()
+    yield [line, 30]  # add '$' token ID
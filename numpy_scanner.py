@@ -0,0 +1,270 @@
+"""
+Scanner backend that classifies whole blocks of source code with NumPy, for very large inputs.
+
+Each block is mapped to char classes with one lookup table operation and identifier and number
+runs are delimited with np.diff. Every token is decided by at most two moves of the transition
+table, its first char and the char after its run, so those are looked up for all tokens of the
+block at once, and line numbers come from a cumulative count of newlines. Python code only runs
+once per token, plus a walk through the table inside comments that jumps from '*' to '*'. A comment
+cut by the end of a block carries its state over, the next block is walked from it.
+
+Tokens, line numbers and lexical errors are the same as scanner.iter_tokens.
+
+NumPy is optional, it is only imported by this backend.
+"""
+from bisect import bisect_left
+
+from util.create_transition_table import (COMMENT_END_STATE, DELIM_ENDED_STATES, FIRST_ERROR_STATE,
+                                          IDENTIFIER_STATE, KEYWORDS, LAST_ACCEPTOR_STATE,
+                                          NUMBER_STATE, get_compiled_transition_table,
+                                          lexical_error)
+from util.symbol_table import SymbolTable
+from util.token_dict import create_token_dict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# number of characters pulled from the source file per read, large enough to amortize NumPy calls
+BLOCK_SIZE = 1 << 22
+
+# pseudo state of tokens decided by a char in the next block
+MORE_TEXT = -1
+
+TOKEN_IDS = create_token_dict()
+ID = TOKEN_IDS["ID"]
+NUM = TOKEN_IDS["NUM"]
+KEYWORD_IDS = {keyword: TOKEN_IDS[keyword] for keyword in KEYWORDS}
+
+
+def classify(text: str, compiled_table) -> tuple:
+    """
+    Maps every char of text to its char class.
+
+    returns
+        code points (uint32 array) and char classes (uint8 array) of text
+    """
+    code_points = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    lookup_table = np.frombuffer(compiled_table.char_classes, dtype=np.uint8)
+    classes = lookup_table[np.minimum(code_points, 255)]
+
+    # chars past latin-1 are rare, each distinct one is classified once
+    high = np.flatnonzero(code_points > 255)
+    if len(high):
+        distinct, inverse = np.unique(code_points[high], return_inverse=True)
+        classes[high] = np.array([ord(compiled_table.class_map[int(code_point)])
+                                  for code_point in distinct], dtype=np.uint8)[inverse]
+    return code_points, classes
+
+
+def runs(mask) -> tuple:
+    """
+    returns
+        start and end (exclusive) positions of the runs of True in mask
+    """
+    edges = np.diff(mask.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def iter_tokens(code_file: str, number_symbol_table: SymbolTable = None, identifier_symbol_table: SymbolTable = None, verbose: bool = False, stats=None):
+    """
+    Runs the NumPy scanner lazily, yielding the same tokens and errors as scanner.iter_tokens.
+
+    args
+        code_file: a str with the file location and name of the source code, or an open text file.
+        number_symbol_table: SymbolTable numbers are interned into while scanning.
+        identifier_symbol_table: SymbolTable identifiers are interned into while scanning.
+        stats: optional util.stats.Stats characters read are counted in.
+
+    yields
+        tokenIDs in format [line, ID, (position in symbol table)], ending with the '$' token.
+    """
+    if np is None:
+        raise ImportError("the numpy scanner backend needs NumPy installed")
+
+    if number_symbol_table is None:
+        number_symbol_table = SymbolTable()
+    if identifier_symbol_table is None:
+        identifier_symbol_table = SymbolTable()
+    intern_number = number_symbol_table.intern
+    intern_identifier = identifier_symbol_table.intern
+
+    compiled_table = get_compiled_transition_table()
+    transitions = compiled_table.transitions
+    n_classes = compiled_table.n_classes
+    n_states = len(transitions) // n_classes
+    table = np.array(transitions, dtype=np.int64).reshape(n_states, n_classes)
+    letter = compiled_table.keys.index("letter")
+    digit = compiled_table.keys.index("digit")
+    delim = compiled_table.delim
+
+    # char classes that leave each state looping on the rest, to jump over comments
+    exit_classes = {}
+    for state in range(n_states):
+        row = transitions[state * n_classes:(state + 1) * n_classes]
+        if state not in (0, transitions[letter], transitions[digit]) and state in row:
+            exit_classes[state] = np.array([target != state for target in row])
+
+    opened = isinstance(code_file, str)
+    code = open(code_file) if opened else code_file
+
+    if verbose:
+        print("RUNNING SCANNER")
+
+    text = ""  # text not scanned yet, a token cut by the end of a block is carried over
+    line = 1  # line number at the start of text
+    eof = False
+    # state of a comment cut by the end of a block, the next block is walked from it
+    comment_state = None
+
+    while not eof:
+        block = code.read(BLOCK_SIZE).lower()
+        if stats is not None:
+            stats.count("chars", len(block))
+        eof = not block
+        text += block
+        n = len(text)
+        if n == 0:
+            if comment_state is not None:
+                if opened:
+                    code.close()
+                raise Exception(f"LEXICAL ERROR: Unexpected end of file in line {line}")
+            break
+
+        code_points, classes = classify(text, compiled_table)
+        class_bytes = classes.tobytes()
+
+        # tokens start at a letter run, a digit run or any other char but delimiters
+        is_letter = classes == letter
+        is_digit = classes == digit
+        letter_starts, letter_ends = runs(is_letter)
+        digit_starts, digit_ends = runs(is_digit)
+        others = np.flatnonzero(~(is_letter | is_digit | (classes == delim)))
+        starts = np.concatenate((letter_starts, digit_starts, others))
+        # where the first move out of the start state is decided: after the run, or the next char
+        decided = np.concatenate((letter_ends, digit_ends, others + 1))
+        order = np.argsort(starts, kind="stable")
+        starts = starts[order]
+        decided = decided[order]
+
+        # state after the first char, then after the char that decides it (EOF read as a delimiter)
+        first = table[0][classes[starts]]
+        second_classes = np.append(classes, np.uint8(delim))[decided]
+        second = np.where(first < IDENTIFIER_STATE, table[np.minimum(first, n_states - 1), second_classes],
+                          first)
+        delim_ended = np.isin(second, DELIM_ENDED_STATES)
+        # tokens end where they are decided, the rest of the accepted ones take that char too
+        ends = np.where(first >= IDENTIFIER_STATE, starts + 1,
+                        np.where(delim_ended, decided, decided + 1))
+        if not eof:
+            # decided by a char in the next block
+            second[(first < IDENTIFIER_STATE) & (decided == n)] = MORE_TEXT
+
+        # newlines[i] is the number of newlines in text[:i + 1], a token ended by the char after it
+        # counts that char even if it is a newline
+        newlines = np.cumsum(code_points == 10, dtype=np.int64)
+        # (ends past the text only belong to errors and tokens carried over, their lines are unused)
+        last = np.minimum(ends, n) - 1
+        token_lines = line + newlines[np.where(delim_ended, np.minimum(last + 1, n - 1), last)]
+
+        starts = starts.tolist()
+        ends = ends.tolist()
+        states = second.tolist()
+        token_lines = token_lines.tolist()
+
+        exits = {}  # positions of the exit chars of a looping state, computed on first use
+
+        def line_at(i: int) -> int:
+            # line number after reading text[:i]
+            return line + int(newlines[i - 1]) if i > 0 else line
+
+        def walk_comment(state: int, i: int) -> tuple:
+            # walks the table from state at text[i] until the comment ends or the text does
+            while True:
+                if state in exit_classes:
+                    # jump over the chars the state loops on
+                    if state not in exits:
+                        exits[state] = np.flatnonzero(exit_classes[state][classes]).tolist()
+                    j = bisect_left(exits[state], i)
+                    i = exits[state][j] if j < len(exits[state]) else n
+                if i == n:
+                    return state, i
+                state = transitions[state * n_classes + class_bytes[i]]
+                i += 1
+                if state == COMMENT_END_STATE:
+                    return state, i
+
+        scanned = n
+        pos = 0  # text before pos is scanned
+        if comment_state is not None:
+            # text starts inside the comment, only the rest of it is walked
+            comment_state, pos = walk_comment(comment_state, 0)
+            if comment_state != COMMENT_END_STATE:
+                line = line_at(n)
+                text = ""
+                continue
+            comment_state = None
+
+        for k in range(len(starts)):
+            start = starts[k]
+            if start < pos:  # inside a comment or an operator already read
+                continue
+            state = states[k]
+
+            if state == IDENTIFIER_STATE:
+                identifier = text[start:ends[k]]
+                if verbose:
+                    print(identifier)
+                token = KEYWORD_IDS.get(identifier)
+                if token is None:
+                    yield [token_lines[k], ID, intern_identifier(identifier)]
+                else:
+                    yield [token_lines[k], token]
+
+            elif IDENTIFIER_STATE < state <= LAST_ACCEPTOR_STATE:
+                identifier = text[start:ends[k]]
+                if verbose:
+                    print(identifier)
+                if state == NUMBER_STATE:
+                    yield [token_lines[k], NUM, intern_number(int(identifier))]
+                else:
+                    yield [token_lines[k], TOKEN_IDS[identifier]]
+
+            elif state >= FIRST_ERROR_STATE:
+                if opened:
+                    code.close()
+                raise Exception(lexical_error(text, start, line_at(start)))
+
+            elif state == MORE_TEXT:
+                scanned = start
+                break
+
+            elif state == COMMENT_END_STATE:
+                pos = start + 2
+                continue
+
+            else:
+                # a state that loops, inside a comment
+                state, i = walk_comment(state, int(decided[k]) + 1)
+                if state != COMMENT_END_STATE:
+                    if not eof:
+                        # the comment may end in the next block, which carries on from its state
+                        comment_state = state
+                        break
+                    if opened:
+                        code.close()
+                    raise Exception(f"LEXICAL ERROR: Unexpected end of file in line {line_at(n)}")
+                pos = i
+                continue
+
+            pos = ends[k]
+
+        line = line_at(scanned)
+        text = text[scanned:]
+
+    if verbose:
+        print("End of source code file.")
+    if opened:
+        code.close()
+    yield [line, 30]  # add '$' token ID
@@ -1,7 +1,18 @@
 import sys
 import util.grammar as gram
 from scanner import run_scanner
-from util.token_dict import id_to_token
+from util.symbol_table import ScopedSymbolTable
+from util.token_dict import TOKENS, id_to_token
+from util.syntax_tree import Node
+from util.token_stream import TokenWindow
+from util.stats import Stats
+from util.trace import PrintTracer, StatsTracer, Tracer
+
+# scanner token IDs the semantic checks peek at
+OPEN_PAREN = TOKENS.index('(') + 1
+CLOSE_PAREN = TOKENS.index(')') + 1
+ASSIGN = TOKENS.index('=') + 1
+VOID = TOKENS.index('void') + 1
 
 
 def last_fun_main(symbol_table: list) -> bool:
@@ -17,20 +28,6 @@ def last_fun_main(symbol_table: list) -> bool:
                 return False
 
 
-def show_symbol_table(symbol_table: list):
-    """
-    Show symbol table in a readable format
-
-    args
-        symbol_table: list of identifiers in format {identifier: [type(fun/var), return type or var scope]}
-    """
-
-    for entry in symbol_table:
-        entry = map(lambda x: 'None' if x is None else x, entry)
-        print('\t'.join(entry))
-    return
-
-
 def initialize_symbol_table(symbol_table: list) -> list:
     """
     Initialize symbol table to be in parser format. [identifier, type(fun/var), return type or var scope]
@@ -48,36 +45,6 @@ def initialize_symbol_table(symbol_table: list) -> list:
     return symbol_table
 
 
-def get_global_variables(symbol_table: list) -> set:
-    """
-    Gets set of global variables in format {('name', scope_lvl)}
-    """
-    globals = set()
-    for entry in symbol_table:
-        if entry[2] == 'global':
-            globals.add((entry[0], -1))
-    return globals
-
-
-def remove_level_of_scope(vars: set, scope_lvl: int) -> set:
-    """
-    Removes all vars lower that the specified level of scope, making them inaccessible
-    """
-    scoped_vars = set()
-    for var in vars:
-        if var[1] < scope_lvl:
-            scoped_vars.add(var)
-
-    return scoped_vars
-
-
-def in_scope(var_name: str, scoped_vars: set) -> bool:
-    for var in scoped_vars:
-        if var_name == var[0]:
-            return True
-    return False
-
-
 def handle_error_stack(token: str, line: int, productions: dict, n: int):
     print(
         f'\n\nTOKEN: {token}\tProduction {n}: {productions[n][0]} -> {productions[n][1:]}')
@@ -257,176 +224,348 @@ def handle_error_table(top: str, token: str, line: int):
         f'SYNTAX ERROR in line {line}: {error} Got {token}')
 
 
-def LL1(grammar: dict, parse_table: dict, input: list, symbol_table: list):
+def check_identifier(input, input_pointer: int, nt: str, symbol_table: list, current_scope: ScopedSymbolTable,
+                     trace: Tracer = None):
+    """
+    Semantic checks for the ID matched at input[input_pointer], declaring it in symbol_table and
+    current_scope when it is being declared.
+
+    args
+        input: scanner output, the tokens around the ID are peeked at
+        input_pointer: position of the ID in input
+        nt: name of the non-terminal of the last production expanded, which tells where the ID is
+        symbol_table: symbol table in parser format, see initialize_symbol_table
+        current_scope: ScopedSymbolTable of the variables accessible at the ID
+        trace: optional Tracer
+    """
+    identifier = input[input_pointer][2] - 1  # identifier position
+    identifier_name = symbol_table[identifier][0]
+    if trace is not None:
+        trace.identifier(identifier_name)
+    if nt == 'declaration':  # matched global fun or var
+
+        next_token = input[input_pointer + 1][1]
+
+        if next_token == OPEN_PAREN:   # matched fun
+            current_scope.enter_function()
+            if trace is not None:
+                trace.scope(current_scope)
+            fun_type = id_to_token(input[input_pointer - 1][1])
+            if identifier_name == 'main':   # matched main function
+                # if not equal, neither is None. Overwriting main
+                if symbol_table[identifier][1] != None:
+                    raise Exception(
+                        f'SEMANTIC ERROR in line {input[input_pointer][0]}: Function main can only be declared once')
+                if fun_type != 'void' or input[input_pointer + 2][1] != VOID or input[input_pointer + 3][1] != CLOSE_PAREN:
+                    raise Exception(
+                        f'SEMANTIC ERROR in line {input[input_pointer][0]}: Function main must be type void with single parameter void')
+
+            symbol_table[identifier][1] = 'function'
+            symbol_table[identifier][2] = fun_type
+            # functions are looked up through the global scope like global vars
+            current_scope.declare_global(identifier_name, 'function', fun_type)
+
+        else:   # matched global var
+            if identifier_name == 'main':
+                raise Exception(
+                    f'SEMANTIC ERROR in line {input[input_pointer][0]}: Variable cannot be named main')
+
+            symbol_table[identifier][1] = 'var'
+            symbol_table[identifier][2] = 'global'
+
+            entry = current_scope.declare_global(
+                identifier_name, 'var', 'global')
+            if trace is not None:
+                trace.declare(entry)
+
+    if nt == 'var_declaration':   # matched local var
+        if identifier_name == 'main':
+            raise Exception(
+                f'SEMANTIC ERROR in line {input[input_pointer][0]}: Variable cannot be named main')
+        symbol_table[identifier][1] = 'var'
+        symbol_table[identifier][2] = 'local'
+        entry = current_scope.declare(
+            identifier_name, 'var', 'local')
+        if trace is not None:
+            trace.declare(entry)
+
+    if nt == 'statement':   # assigning var or calling function
+        next_token = input[input_pointer + 1][1]
+        # the innermost declaration decides, a local or param shadows a function of the same name.
+        # The flat row only tells a name declared out of scope from an undeclared one.
+        entry = current_scope.lookup(identifier_name)
+        if next_token == OPEN_PAREN:  # calling function
+            if entry is None and symbol_table[identifier][1] == None:
+                raise Exception(
+                    f'SEMANTIC ERROR in line {input[input_pointer][0]}: Function {identifier_name} has not been declared')
+            elif entry is None or entry[1] != 'function':
+                raise Exception(
+                    f'SEMANTIC ERROR in line {input[input_pointer][0]}: {identifier_name} is not a function and cannot be called')
+            elif identifier_name == 'main':
+                raise Exception(
+                    f'SEMANTIC ERROR in line {input[input_pointer][0]}: main function cannot be called')
+        elif next_token == ASSIGN:  # assigning variable
+            if entry is None and symbol_table[identifier][1] == None:
+                raise Exception(
+                    f'SEMANTIC ERROR in line {input[input_pointer][0]}: Var {identifier_name} has not been declared')
+            elif entry is None:
+                raise Exception(
+                    f'SEMANTIC ERROR in line {input[input_pointer][0]}: {identifier_name} not in scope of statement')
+            elif entry[1] == 'function':
+                raise Exception(
+                    f'SEMANTIC ERROR in line {input[input_pointer][0]}: Cannot assign value to function {identifier_name}')
+
+    if nt == 'param':  # parameters in function declaration
+        # only exists in params
+        if symbol_table[identifier][1] == symbol_table[identifier][2]:
+            # both equal to allow overwriting in global or local variables
+            symbol_table[identifier][1] = 'param'
+            symbol_table[identifier][2] = 'param'
+        # params shadowing other names keep their own entry
+        entry = current_scope.declare(
+            identifier_name, 'param', 'param')
+        if trace is not None:
+            trace.declare(entry)
+
+    if nt == 'factor':  # doing math
+        # if function does not return value
+        entry = current_scope.lookup(identifier_name)
+        if entry is not None and entry[2] == 'void':
+            raise Exception(
+                f'SEMANTIC ERROR in line {input[input_pointer][0]}: {identifier_name} does not return a value. Cannot be factor')
+        # elif symbol_table[identifier][1] != 'function' and identifier_name not in current_scope:
+            # raise Exception(f'SEMANTIC ERROR in line {input[input_pointer][0]}: {identifier_name} not in scope of statement')
+
+    # if nt == 'var':  # var is only accessed in input
+
+
+def LL1(grammar: dict, parse_table, input: list, symbol_table: list, trace: Tracer = None, build_tree: bool = False,
+        stats: Stats = None):
     """
     Runs LL(1) Parsing Algorithm.
 
     args
-        grammar: dict representing grammar derived from .txt
-        parse_table: dict of dicts representing LL(1) parsing table
-        input: list of lists from scanner output. Must not be empty.
+        grammar: dict representing grammar derived from .txt, may be None with a CompiledParseTable
+        parse_table: dict of dicts representing LL(1) parsing table, or its CompiledParseTable
+        input: list of lists from scanner output, or any indexable token sequence. Must not be empty.
+        trace: optional Tracer called on every step, e.g. util.trace.PrintTracer. Nothing is traced by default.
+        build_tree: build the parse tree while parsing, see util.syntax_tree.
+        stats: optional Stats the parser phase, productions expanded, tokens matched, maximum stack
+            depth and symbol table size are recorded in.
 
     returns
-        bool indicating success.
+        bool indicating success, or the root Node of the parse tree if build_tree.
     """
-    # Validate input
-    if len(input) == 1 and input[0][1] == 30:
+    if stats is not None:
+        # counting is done by a tracer, so parsing without stats pays nothing for it
+        stats_tracer = StatsTracer(stats, trace)
+        try:
+            with stats.phase("parser"):
+                return LL1(grammar, parse_table, input, symbol_table, stats_tracer, build_tree)
+        finally:
+            stats.maximum("max_stack_depth", stats_tracer.max_stack_depth)
+            stats.maximum("symbol_table_size", len(symbol_table))
+
+    symbol_table = initialize_symbol_table(symbol_table)
+
+    # Validate input, '$' is only ever the last token
+    if input[0][1] == 30:
         raise Exception("INPUT: code file cannot be empty")
 
-    non_terminals = list(grammar.keys())
-    productions = gram.enumerate_productions(grammar)
+    if not isinstance(parse_table, gram.CompiledParseTable):
+        parse_table = gram.compile_parse_table(grammar, parse_table, TOKENS)
 
-    production_number = 0
+    symbols = parse_table.symbols
+    nt_base = parse_table.nt_base
+    DOLLAR = parse_table.ids['$']
 
-    stack = ['$', non_terminals[0]]  # stack with symbols to match
-    input_pointer = 0   # pointer to traverse input
-    symbol_table = initialize_symbol_table(symbol_table)
+    if grammar is None:
+        productions = parse_table.named_productions()
+    else:
+        productions = gram.enumerate_productions(grammar)
+
+    stack = [DOLLAR, nt_base]  # stack with symbols to match
 
-    current_nt = ''
+    root = None
+    nodes = None
+    if build_tree:
+        root = Node(nt_base, input[0][0])
+        nodes = [None, root]  # node of every symbol in stack, '$' has none
 
-    current_scope = set()  # set of accessible variables in scope
-    scope_lvl = 0   # lvl of scope for vars
+    if trace is not None:
+        trace.begin(symbols, productions)
 
-    while stack[-1] != '$':
+    stack, input_pointer, token = LL1_resume(parse_table, productions, input, symbol_table,
+                                             ScopedSymbolTable(), stack, 0, trace, nodes)
+
+    if stack[-1] == DOLLAR and token == DOLLAR:  # program ended correctly
+        if trace is not None:
+            trace.accept(symbol_table)
+        if last_fun_main(symbol_table):
+            return root if build_tree else True
+        else:
+            raise Exception(
+                "SEMANTIC: Last function declaration must be void main(void){}")
+    elif input_pointer >= len(input):   # input incomplete
+        if trace is not None:
+            trace.step(stack, token)
+        raise Exception(
+            f'INPUT: Input ended prematurely, top of stack: {symbols[stack[-1]]}')
+    else:
+        # did not end correctly
+        if trace is not None:
+            trace.step(stack, token)
+        raise Exception(f'TOP: Did not end on $, got {symbols[token]}')
+
+
+def LL1_resume(parse_table: gram.CompiledParseTable, productions: dict, input, symbol_table: list,
+               current_scope: ScopedSymbolTable, stack: list, input_pointer: int, trace: Tracer = None,
+               nodes: list = None, on_declaration=None) -> tuple:
+    """
+    Runs the LL(1) Parsing Algorithm from a given parser state until the stack is down to '$',
+    raising on the first error. LL1 runs it from the start of the input.
+
+    args
+        parse_table: CompiledParseTable
+        productions: productions numbered as in gram.enumerate_productions, for error messages
+        input: indexable token sequence, see LL1
+        symbol_table: symbol table in parser format, see initialize_symbol_table. Only rows of
+            identifiers found are read, by position.
+        current_scope: ScopedSymbolTable of the variables accessible at input_pointer
+        stack: parse stack to resume from, popped and pushed in place
+        input_pointer: position in input of the next token to match
+        trace: optional Tracer
+        nodes: parse tree node of every symbol in stack when building the tree, '$' has none
+        on_declaration: optional function called with input_pointer every time a top-level
+            declaration is about to be parsed, or the end of input is reached, with the stack
+            down to '$' and 'program' or 'declaration_list'. Parsing stops if it returns True.
+
+    returns
+        stack, input_pointer and token ID when parsing stopped
+    """
+    # parse table in int form, symbols are only turned back into strings for output
+    symbols = parse_table.symbols
+    nt_base = parse_table.nt_base   # IDs >= nt_base are non-terminals
+    n_columns = parse_table.n_columns
+    table = parse_table.table
+    int_productions = parse_table.productions
+    expansions = parse_table.expansions
+    EPSILON = parse_table.EPSILON
+
+    # symbol IDs with semantic actions
+    ids = parse_table.ids
+    DOLLAR = ids['$']
+    ID = ids['ID']
+    NUM = ids['NUM']
+    OPEN_BRACKET = ids['{']
+    CLOSE_BRACKET = ids['}']
+    # the stack is [$, program] or [$, declaration_list] before each top-level declaration,
+    # -1 never matches
+    PROGRAM = nt_base if on_declaration is not None else -1
+    DECLARATION_LIST = ids['declaration_list'] if on_declaration is not None else -1
+
+    build_tree = nodes is not None
+
+    production_number = 0
+
+    current_nt = EPSILON
+
+    token = input[input_pointer][1]
+
+    while stack[-1] != DOLLAR:
         top = stack[-1]  # assign top to variable for legibility
         # current token from input
-        token = id_to_token(input[input_pointer][1])
+        token = input[input_pointer][1]
 
-        print(f'stack: {stack}\ttoken: {token}')
+        if trace is not None:
+            trace.step(stack, token)
 
         if top == token:    # if match
-            print(f'matched {token}. nt: {current_nt}')
-
-            if token == 'ID':   # matched ID
-                identifier = input[input_pointer][2] - 1  # identifier position
-                identifier_name = symbol_table[identifier][0]
-                print(identifier_name)
-                if current_nt == 'declaration':  # matched global fun or var
-
-                    next_token = id_to_token(input[input_pointer + 1][1])
-
-                    if next_token == '(':   # matched fun
-                        current_scope = get_global_variables(symbol_table)
-                        print(f'current_scope: {current_scope}')
-                        fun_type = id_to_token(input[input_pointer - 1][1])
-                        if identifier_name == 'main':   # matched main function
-                            # if not equal, neither is None. Overwriting main
-                            if symbol_table[identifier][1] != None:
-                                raise Exception(
-                                    f'SEMANTIC ERROR in line {input[input_pointer][0]}: Function main can only be declared once')
-                            if fun_type != 'void' or id_to_token(input[input_pointer + 2][1]) != 'void' or id_to_token(input[input_pointer + 3][1]) != ')':
-                                raise Exception(
-                                    f'SEMANTIC ERROR in line {input[input_pointer][0]}: Function main must be type void with single parameter void')
-
-                        symbol_table[identifier][1] = 'function'
-                        symbol_table[identifier][2] = fun_type
-
-                    else:   # matched global var
-                        if identifier_name == 'main':
-                            raise Exception(
-                                f'SEMANTIC ERROR in line {input[input_pointer][0]}: Variable cannot be named main')
-
-                        symbol_table[identifier][1] = 'var'
-                        symbol_table[identifier][2] = 'global'
-
-                        current_scope = current_scope.union(
-                            get_global_variables(symbol_table))
-                        print(f'current_scope: {current_scope}')
-
-                if current_nt == 'var_declaration':   # matched local var
-                    if identifier_name == 'main':
-                        raise Exception(
-                            f'SEMANTIC ERROR in line {input[input_pointer][0]}: Variable cannot be named main')
-                    symbol_table[identifier][1] = 'var'
-                    symbol_table[identifier][2] = 'local'
-                    current_scope.add((identifier_name, scope_lvl))
-                    print(f'current_scope: {current_scope}')
-
-                if current_nt == 'statement':   # assigning var or calling function
-                    next_token = id_to_token(input[input_pointer + 1][1])
-                    if next_token == '(':  # calling function
-                        # if equal, function has not been declared.
-                        if symbol_table[identifier][1] == None:
-                            raise Exception(
-                                f'SEMANTIC ERROR in line {input[input_pointer][0]}: Function {identifier_name} has not been declared')
-                        elif symbol_table[identifier][1] != 'function':
-                            raise Exception(
-                                f'SEMANTIC ERROR in line {input[input_pointer][0]}: {identifier_name} is not a function and cannot be called')
-                        elif identifier_name == 'main':
-                            raise Exception(
-                                f'SEMANTIC ERROR in line {input[input_pointer][0]}: main function cannot be called')
-                    elif next_token == '=':  # assigning variable
-                        if symbol_table[identifier][1] == None:
-                            raise Exception(
-                                f'SEMANTIC ERROR in line {input[input_pointer][0]}: Var {identifier_name} has not been declared')
-                        elif symbol_table[identifier][1] == 'function':
-                            raise Exception(
-                                f'SEMANTIC ERROR in line {input[input_pointer][0]}: Cannot assign value to function {identifier_name}')
-                        elif not in_scope(identifier_name, current_scope):
-                            raise Exception(
-                                f'SEMANTIC ERROR in line {input[input_pointer][0]}: {identifier_name} not in scope of statement')
-
-                if current_nt == 'param':  # parameters in function declaration
-                    # only exists in params
-                    if symbol_table[identifier][1] == symbol_table[identifier][2]:
-                        # both equal to allow overwriting in global or local variables
-                        symbol_table[identifier][1] = 'param'
-                        symbol_table[identifier][2] = 'param'
-                        current_scope.add((identifier_name, scope_lvl))
-                        print(f'current_scope: {current_scope}')
-
-                if current_nt == 'factor':  # doing math
-                    # if function does not return value
-                    if symbol_table[identifier][2] == 'void':
-                        raise Exception(
-                            f'SEMANTIC ERROR in line {input[input_pointer][0]}: {identifier_name} does not return a value. Cannot be factor')
-                    # elif symbol_table[identifier][1] != 'function' and not in_scope(identifier_name, current_scope):
-                        # raise Exception(f'SEMANTIC ERROR in line {input[input_pointer][0]}: {identifier_name} not in scope of statement')
-
-                # if current_nt == 'var':  # var is only accessed in input
-
-            elif token == '{':
-                scope_lvl += 1
-            elif token == '}':
-                current_scope = remove_level_of_scope(current_scope, scope_lvl)
-                scope_lvl -= 1
+            if trace is not None:
+                trace.match(token, current_nt)
+
+            if token == ID:   # matched ID
+                check_identifier(input, input_pointer, symbols[current_nt],
+                                 symbol_table, current_scope, trace)
+            elif token == OPEN_BRACKET:
+                current_scope.push()
+            elif token == CLOSE_BRACKET:
+                current_scope.pop()
+
+            if build_tree:
+                node = nodes.pop()
+                node.line = input[input_pointer][0]
+                if token == ID or token == NUM:
+                    node.value = input[input_pointer][2]
+
             stack.pop()  # remove from stack
             input_pointer += 1  # traverse input
 
         # if TopStack is terminal without match
-        elif top not in non_terminals:
-            handle_error_stack(token, input[input_pointer]
+        elif top < nt_base:
+            handle_error_stack(symbols[token], input[input_pointer]
                                [0], productions, production_number)
-        elif parse_table[top][token] == "ERROR":
-            handle_error_table(top, token, input[input_pointer][0])
+        elif table[(top - nt_base) * n_columns + token] == 0:
+            handle_error_table(symbols[top], symbols[token],
+                               input[input_pointer][0])
         else:   # traverse Parse Table to new production
-            production_number = parse_table[top][token]  # production to go to
+            if (top == DECLARATION_LIST or top == PROGRAM) and len(stack) == 2 and on_declaration(input_pointer):
+                break
+
+            # production to go to
+            production_number = table[(top - nt_base) * n_columns + token]
             # symbols in RHS of production
-            production_symbols = productions[production_number]
-            print(f'{production_symbols[0]} -> {production_symbols[1:]}')
+            production_symbols = int_productions[production_number]
+            if trace is not None:
+                trace.production(production_number)
 
             current_nt = production_symbols[0]
 
             stack.pop()   # pop before inserting new symbols
-            if "ε" not in production_symbols:   # do not push epsilon
-                # insert symbols in reverse
-                stack.extend(production_symbols[:0:-1])
+            # insert symbols in reverse, epsilon is never pushed
+            stack.extend(expansions[production_number])
 
-    if stack[-1] == '$' and token == '$':  # program ended correctly
-        print('-----------SUCCESS-----------')
-        show_symbol_table(symbol_table)
-        if last_fun_main(symbol_table):
-            return True
-        else:
-            raise Exception(
-                "SEMANTIC: Last function declaration must be void main(void){}")
-    elif input_pointer >= len(input):   # input incomplete
-        print(f'stack: {stack}\ttoken: {token}')
-        raise Exception(
-            f'INPUT: Input ended prematurely, top of stack: {stack[-1]}')
-    else:
-        print(f'stack: {stack}\ttoken: {token}')    # did not end correctly
-        raise Exception(f'TOP: Did not end on $, got {token}')
+            if build_tree:
+                node = nodes.pop()
+                node.production = production_number
+                line = input[input_pointer][0]
+                node.children = tuple(Node(symbol, line)
+                                      for symbol in production_symbols[1:] if symbol != EPSILON)
+                nodes.extend(reversed(node.children))
+
+    return stack, input_pointer, token
+
+
+def LL1_stream(grammar: dict, parse_table: dict, tokens, identifier_symbol_table, trace: Tracer = None, build_tree: bool = False,
+               stats: Stats = None):
+    """
+    Runs LL(1) Parsing Algorithm pulling tokens lazily from the scanner.
+
+    Only the tokens the semantic checks peek at (one behind, three ahead) are kept in memory,
+    so errors are reported as soon as they are reached.
+
+    args
+        grammar: dict representing grammar derived from .txt
+        parse_table: dict of dicts representing LL(1) parsing table
+        tokens: iterator of tokens, e.g. from scanner.iter_tokens
+        identifier_symbol_table: SymbolTable the scanner interns identifiers into
+        trace: optional Tracer, see LL1
+        build_tree: build the parse tree while parsing, see LL1
+        stats: optional Stats, see LL1
+
+    returns
+        bool indicating success, or the root Node of the parse tree if build_tree.
+    """
+    symbol_table = []  # rows are added as the scanner finds new identifiers
+
+    def add_new_identifiers(token: list):
+        while len(symbol_table) < len(identifier_symbol_table):
+            symbol_table.append(
+                [identifier_symbol_table[len(symbol_table)], None, None])
+
+    input = TokenWindow(tokens, behind=1, ahead=3, on_token=add_new_identifiers)
+
+    return LL1(grammar, parse_table, input, symbol_table, trace, build_tree, stats)
 
 
 if __name__ == "__main__":
@@ -438,15 +577,9 @@ if __name__ == "__main__":
     scanner_output, number_symbol_table, identifier_symbol_table = run_scanner(
         code_file, verbose=True)
 
-    # Create Parser sets and table
-    grammar, non_terminals, terminals = gram.get_grammar_from_txt(
+    # Create Parser sets and table, cached until grammar.txt changes
+    grammar, non_terminals, terminals, productions, parse_table = gram.load_grammar_tables(
         "util/grammar.txt")
-    first_sets = gram.get_first_sets(grammar, non_terminals)
-    follow_sets = gram.get_follow_sets(grammar, non_terminals, first_sets)
-    first_plus_sets = gram.get_first_plus_sets(
-        grammar, non_terminals, first_sets, follow_sets)
-
-    parse_table = gram.create_parse_table(
-        grammar, terminals, first_plus_sets)
 
-    LL1(grammar, parse_table, scanner_output, identifier_symbol_table)
+    LL1(grammar, parse_table, scanner_output,
+        identifier_symbol_table, trace=PrintTracer())
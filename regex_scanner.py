@@ -0,0 +1,218 @@
+"""
+Scanner backend built on one regular expression instead of the transition table.
+
+Every char is first replaced by a representative of its transition table column (a for letters,
+0 for digits, a space for delimiters, ? for bad chars), so the master pattern below sees exactly
+the char classes the scanner sees, unicode letters and digits included. Newlines are kept to count
+lines. Tokens are then found by re.finditer over each block, and only the matches and newlines
+reach Python code. A comment left open at the end of a block is not matched again, the next
+blocks are only searched for its end.
+
+Tokens, line numbers and lexical errors are the same as scanner.iter_tokens. Errors are spelled
+out by walking the transition table over the offending text, so their messages are too.
+"""
+import re
+
+from util.create_transition_table import KEYWORDS, char_key, lexical_error
+from util.symbol_table import SymbolTable
+from util.token_dict import create_token_dict
+
+# number of characters pulled from the source file per read, as in the scanner
+BLOCK_SIZE = 1 << 16
+
+# representative of each char class, the accepted chars stand for themselves
+ALPHABET = {"letter": "a", "digit": "0", "delim": " ", "bad_char": "?"}
+
+# spaces before a token are part of its match, so finditer never searches, alternatives are
+# ordered by how common they are
+MASTER_PATTERN = re.compile(r"""[ ]*(?:
+    (?P<id>a+)(?![a0?])                 # identifier or keyword, not followed by a digit or bad char
+  | (?P<punctuation>[-+*,;()\[\]{}])
+  | (?P<newline>\n)
+  | (?P<num>0+)(?![a0?])
+  | (?P<double>[!<>=]=)
+  | (?P<comment>/\*(?:[^*]|\*[^/])*\*/)  # '*/' only closes when its '*' does not follow another
+  | (?P<open_comment>/\*)               # comment that does not end in the text read so far
+  | (?P<single>[<>=/])(?!\?)            # ended by the char after it, like identifiers and numbers
+  | (?P<error>[^ ])                     # anything else starts a lexical error
+  | \Z                                  # spaces at the end of the text, without backtracking
+)""", re.VERBOSE)
+
+TOKEN_IDS = create_token_dict()
+ID = TOKEN_IDS["ID"]
+NUM = TOKEN_IDS["NUM"]
+KEYWORD_IDS = {keyword: TOKEN_IDS[keyword] for keyword in KEYWORDS}
+
+
+class AlphabetMap(dict):
+    """
+    str.translate table mapping each char to the ALPHABET representative of its class, filled in
+    on first sight.
+    """
+
+    def __missing__(self, i: int) -> str:
+        key = char_key(chr(i))
+        self[i] = "\n" if i == ord("\n") else ALPHABET.get(key, key)
+        return self[i]
+
+
+ALPHABET_MAP = AlphabetMap()
+
+
+def close_comment(text: str, star: bool) -> tuple:
+    """
+    Looks for the end of a comment left open by the text before, only reading the new text.
+
+    args
+        text: text following the open comment
+        star: whether the comment so far ends in a '*' the next char can close it with
+
+    returns
+        position past the closing '*/', -1 if the comment is still open, and star at the end of text
+    """
+    pos = 0
+    while True:
+        end = text.find("/", pos)
+        if end < 0:
+            break
+        # a run of '*' closes when its length, with the one carried over, is odd
+        i = end
+        while i > 0 and text[i - 1] == "*":
+            i -= 1
+        stars = end - i + (star if i == 0 else 0)
+        if stars % 2:
+            return end + 1, False
+        pos = end + 1
+
+    i = len(text)
+    while i > 0 and text[i - 1] == "*":
+        i -= 1
+    return -1, bool((len(text) - i + (star if i == 0 else 0)) % 2)
+
+
+def iter_tokens(code_file: str, number_symbol_table: SymbolTable = None, identifier_symbol_table: SymbolTable = None, verbose: bool = False, stats=None):
+    """
+    Runs the regex scanner lazily, yielding the same tokens and errors as scanner.iter_tokens.
+
+    args
+        code_file: a str with the file location and name of the source code, or an open text file.
+        number_symbol_table: SymbolTable numbers are interned into while scanning.
+        identifier_symbol_table: SymbolTable identifiers are interned into while scanning.
+        stats: optional util.stats.Stats characters read are counted in.
+
+    yields
+        tokenIDs in format [line, ID, (position in symbol table)], ending with the '$' token.
+    """
+    if number_symbol_table is None:
+        number_symbol_table = SymbolTable()
+    if identifier_symbol_table is None:
+        identifier_symbol_table = SymbolTable()
+    intern_number = number_symbol_table.intern
+    intern_identifier = identifier_symbol_table.intern
+
+    opened = isinstance(code_file, str)
+    code = open(code_file) if opened else code_file
+
+    if verbose:
+        print("RUNNING SCANNER")
+
+    # text not scanned yet and its char classes, a token cut by the end of a block is carried over
+    text = ""
+    classes = ""
+    line = 1
+    eof = False
+    # star of close_comment while a comment cut by the end of a block is open, None otherwise
+    comment_star = None
+
+    while not eof:
+        block = code.read(BLOCK_SIZE).lower()
+        if stats is not None:
+            stats.count("chars", len(block))
+        eof = not block
+
+        if comment_star is not None:
+            # only the new block is searched for the end of the comment, its text is not kept
+            if eof:
+                if opened:
+                    code.close()
+                raise Exception(f"LEXICAL ERROR: Unexpected end of file in line {line}")
+            closed, comment_star = close_comment(block, comment_star)
+            if closed < 0:
+                line += block.count("\n")
+                continue
+            line += block.count("\n", 0, closed)
+            block = block[closed:]
+            comment_star = None
+
+        text += block
+        classes += block.translate(ALPHABET_MAP)
+
+        end_of_text = len(text)
+        scanned = end_of_text
+        for match in MASTER_PATTERN.finditer(classes):
+            kind = match.lastgroup
+            if kind is None:  # nothing but spaces left
+                break
+            start, end = match.span(kind)
+            if not eof and kind == "open_comment":
+                # the next blocks may end the comment
+                line += text.count("\n", start)
+                _, comment_star = close_comment(text[start + 2:], False)
+                break
+            # the next block may still extend the token
+            if not eof and end == end_of_text:
+                scanned = start
+                break
+
+            if kind == "id":
+                identifier = text[start:end]
+                if verbose:
+                    print(identifier)
+                # the char ending the token is counted, even if it is a newline
+                token_line = line + (classes[end:end + 1] == "\n")
+                token = KEYWORD_IDS.get(identifier)
+                if token is None:
+                    yield [token_line, ID, intern_identifier(identifier)]
+                else:
+                    yield [token_line, token]
+
+            elif kind == "punctuation" or kind == "double":
+                if verbose:
+                    print(text[start:end])
+                yield [line, TOKEN_IDS[text[start:end]]]
+
+            elif kind == "newline":
+                line += 1
+
+            elif kind == "num":
+                if verbose:
+                    print(text[start:end])
+                yield [line + (classes[end:end + 1] == "\n"), NUM, intern_number(int(text[start:end]))]
+
+            elif kind == "single":
+                if verbose:
+                    print(text[start:end])
+                yield [line + (classes[end:end + 1] == "\n"), TOKEN_IDS[text[start:end]]]
+
+            elif kind == "comment":
+                line += text.count("\n", start, end)
+
+            elif kind == "open_comment":
+                line += text.count("\n", start)
+                if opened:
+                    code.close()
+                raise Exception(f"LEXICAL ERROR: Unexpected end of file in line {line}")
+
+            else:
+                if opened:
+                    code.close()
+                raise Exception(lexical_error(text, start, line))
+
+        text = text[scanned:]
+        classes = classes[scanned:]
+
+    if verbose:
+        print("End of source code file.")
+    if opened:
+        code.close()
+    yield [line, 30]  # add '$' token ID
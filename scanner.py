@@ -1,6 +1,42 @@
-from util.create_transition_table import create_transition_table
+import io
+from contextlib import nullcontext
+
+import lexer
+import numpy_scanner
+import regex_scanner
+from util.create_transition_table import (DELIM_ENDED_STATES, ERROR_MESSAGES, KEYWORDS, char_key,
+                                          get_compiled_transition_table)
+from util.stats import Stats
+from util.symbol_table import SymbolTable
+from util.token_stream import TokenBuffer
 from util.token_dict import create_token_dict
 
+# number of characters pulled from the source file per read
+BLOCK_SIZE = 1 << 16
+
+# scanner implementations yielding the same tokens and errors, "differential" runs dfa and regex
+BACKENDS = ["dfa", "lexer", "regex"]
+if numpy_scanner.np is not None:  # NumPy is optional
+    BACKENDS.append("numpy")
+
+
+def read_blocks(code, block_size: int = BLOCK_SIZE):
+    """
+    Reads an open source file in large blocks.
+
+    args
+        code: open text file with the source code.
+        block_size: number of characters to read per block.
+
+    yields
+        lowercased blocks of source code until EOF.
+    """
+    while True:
+        block = code.read(block_size)
+        if not block:
+            return
+        yield block.lower()
+
 
 def identify_char(char: str) -> str:
     """Identifies char to use in transition table.
@@ -13,43 +49,42 @@ def identify_char(char: str) -> str:
     Returns:
         A string identifying if the char is a letter, digit, or itself if otherwise.
     """
-    # identifier type groups
-    whitespace = [" ", "\t", "\n", ""]
-    accepted_chars = ['!', '<', '>', '=', '+', '-', '*',
-                      '/', ',', ';', '(', ')', '[', ']', '{', '}']
-
-    # return letter for transition table if char is a letter
-    if char.isalpha():
-        return "letter"
-
-    # return digit for transition table if char is a digit
-    elif char.isdigit():
-        return "digit"
-
-    elif char in whitespace:
+    # EOF is read as a delimiter
+    if char == "":
         return "delim"
 
-    # return char itself if it is an accepted character
-    elif char in accepted_chars:
-        return char
-    else:
-        return "bad_char"
+    return char_key(char)
 
 
-def run_scanner(code_file: str, verbose: bool = False):
+def iter_tokens(code_file: str, number_symbol_table: SymbolTable = None, identifier_symbol_table: SymbolTable = None, verbose: bool = False, transition_table=None, stats=None):
     """
-    Runs the scanner.
+    Runs the scanner lazily, yielding each token as soon as it is recognized.
 
     args
-        code_file: a str with the file location and name of the source code.
-
-    returns
-        scanner_output: list of lists with tokenIDs in format [line, ID, (position in symbol table)]
-        number_symbol_table: list of numbers
-        identifier_symbol_table: list of identifiers
+        code_file: a str with the file location and name of the source code, or an open text file
+            (e.g. io.StringIO) to scan source code that is not on disk. Open files are not closed.
+        number_symbol_table: SymbolTable numbers are interned into while scanning.
+        identifier_symbol_table: SymbolTable identifiers are interned into while scanning.
+        transition_table: CompiledTransitionTable to scan with, the one from util/transitions.csv if None.
+        stats: optional util.stats.Stats characters read are counted in.
+
+    yields
+        tokenIDs in format [line, ID, (position in symbol table)], ending with the '$' token.
     """
+    if number_symbol_table is None:
+        number_symbol_table = SymbolTable()
+    if identifier_symbol_table is None:
+        identifier_symbol_table = SymbolTable()
+
     # file name, change here
-    code = open(code_file)
+    opened = isinstance(code_file, str)
+    code = open(code_file) if opened else code_file
+
+    # source is walked block by block, pos being the offset in the current block
+    blocks = read_blocks(code)
+    buffer = ""
+    char_classes = b""  # char class of every char in buffer
+    pos = 0
 
     if verbose:
         print("RUNNING SCANNER")
@@ -58,45 +93,54 @@ def run_scanner(code_file: str, verbose: bool = False):
     identifier = ""
     state = 0
 
-    prev_char = ""
+    # set when the leftover char after an acceptor state must be read again
+    reread = False
 
     line = 1
 
-    transition_table = create_transition_table()
+    # transitions[state * n_classes + char_class] is the next state
+    compiled_table = transition_table if transition_table is not None else get_compiled_transition_table(
+        stats=stats)
+    transitions = compiled_table.transitions
+    n_classes = compiled_table.n_classes
 
     # states that reach acceptor states with delims, nums or letters
-    delim_ended_states = [10, 11, 13, 15, 17, 22]
+    delim_ended_states = DELIM_ENDED_STATES
 
     # token dictionary to translate into symbol table and output
     token_dict = create_token_dict()
 
     # keyword list to check if an identifier is a keyword
-    keywords = ['if', 'else', 'void', 'return',
-                'int', 'while', 'input', 'output']
+    keywords = KEYWORDS
 
     # error messages
-    error_messages = ['Invalid Char', 'Identifiers cannot have numbers',
-                      'Numbers cannot have letters', "expected '='"]
-
-    # scanner output
-    scanner_output = []
-
-    # empty number and identifier tables
-    number_symbol_table = []
-    identifier_symbol_table = []
+    error_messages = ERROR_MESSAGES
 
-    # loop forever, reading 1 char at a time...
+    # loop forever, walking the buffer 1 char at a time...
     while True:
-        # deal with leftover char after acceptor state
-        if prev_char == "":
-            char = code.read(1).lower()
-        # "double up" on leftover char
+        # refill buffer once the current block is exhausted
+        if pos == len(buffer):
+            buffer = next(blocks, "")
+            char_classes = compiled_table.classify(buffer)
+            pos = 0
+            if stats is not None:
+                stats.count("chars", len(buffer))
+
+        # empty buffer means EOF, read as a delimiter
+        if buffer:
+            char = buffer[pos]
+            char_class = char_classes[pos]
         else:
+            char = ""
+            char_class = compiled_table.delim
+        pos += 1
+
+        # "double up" on leftover char
+        if reread:
             # if delim was newline, substract 1 from line to avoid counting double newline
-            if prev_char == "\n":
+            if char == "\n":
                 line -= 1
-            char = prev_char
-            prev_char = ""  # ensure this only happens once
+            reread = False  # ensure this only happens once
 
         # track line of code
         if char == "\n":
@@ -106,15 +150,19 @@ def run_scanner(code_file: str, verbose: bool = False):
         if not char and identifier == "":
             if verbose:
                 print("End of source code file.")
-            code.close()
-            scanner_output.append([line, 30])  # add '$' token ID
-            break
-
-        # translate char into transition
-        transition = identify_char(char)
+            if opened:
+                code.close()
+            yield [line, 30]  # add '$' token ID
+            return
 
         # change state
-        state = transition_table[state][transition]
+        state = transitions[state * n_classes + char_class]
+
+        # only comments are still open after reading EOF, the delimiter keeps them open forever
+        if not char and 0 < state < 10:
+            if opened:
+                code.close()
+            raise Exception(f"LEXICAL ERROR: Unexpected end of file in line {line}")
 
         # ignore blanks
         if state == 0:
@@ -127,8 +175,9 @@ def run_scanner(code_file: str, verbose: bool = False):
             # handle leftover character when ending in a delimiter
             if state in delim_ended_states and char != "":  # confirm char != "" to avoid removing identifier
 
-                # assign last char of identifier to prev_char
-                prev_char = identifier[-1]
+                # step back so the leftover char is read again
+                pos -= 1
+                reread = True
 
                 # remove last char from identifier
                 identifier = identifier[:-1]
@@ -139,32 +188,20 @@ def run_scanner(code_file: str, verbose: bool = False):
             if state == 10:
                 # identifier is a keyword and is added to symbol table directly
                 if identifier in keywords:
-                    scanner_output.append([line, token_dict[identifier]])
+                    yield [line, token_dict[identifier]]
                 else:
-                    # identifier is not a keyword and is new
-                    if identifier not in identifier_symbol_table:
-                        # add identifier
-                        identifier_symbol_table.append(identifier)
-
-                    # append token 2 and entry no.
-                    scanner_output.append(
-                        [line, 2, identifier_symbol_table.index(identifier) + 1])
+                    # identifier is not a keyword, append token 2 and entry no.
+                    yield [line, 2, identifier_symbol_table.intern(identifier)]
 
             # check if identifier is number
             elif state == 11:
                 num = int(identifier)
 
-                # number is new
-                if num not in number_symbol_table:
-                    # add number
-                    number_symbol_table.append(num)
-
                 # append token 1 and entry no.
-                scanner_output.append(
-                    [line, 1, number_symbol_table.index(num) + 1])
+                yield [line, 1, number_symbol_table.intern(num)]
 
             else:
-                scanner_output.append([line, token_dict[identifier]])
+                yield [line, token_dict[identifier]]
 
             state = 0
             identifier = ""
@@ -178,11 +215,120 @@ def run_scanner(code_file: str, verbose: bool = False):
             # raise exception from error_messages list
             error_msg = f"{error_messages[state - 32]}: '{identifier}'"
 
+            if opened:
+                code.close()
             raise Exception(f"LEXICAL ERROR: {error_msg} in line {line}")
 
+
+def get_backend(backend: str):
+    """
+    Gets the iter_tokens function of a scanner backend, they all take the same arguments.
+
+    args
+        backend: "dfa" for the table-driven scanner in this module, "lexer" for the lexer generated
+            from the same table (lexer.py), "regex" for the master pattern one (regex_scanner.py) or
+            "numpy" for the block classifying one (numpy_scanner.py).
+    """
+    if backend == "dfa":
+        return iter_tokens
+    elif backend == "lexer":
+        return lexer.iter_tokens
+    elif backend == "regex":
+        return regex_scanner.iter_tokens
+    elif backend == "numpy":
+        return numpy_scanner.iter_tokens
+    raise ValueError(f"backend must be one of {BACKENDS}")
+
+
+def diff_backends(code_file: str, backends: list = ("regex", "dfa")) -> str:
+    """
+    Scans a source file with several backends and compares their tokens, symbol tables and
+    lexical errors.
+
+    args
+        code_file: a str with the file location and name of the source code, or an open text file.
+        backends: names of the backends to compare, the first one is the reference.
+
+    returns
+        description of the first difference, None if every backend agrees.
+    """
+    source = None if isinstance(code_file, str) else code_file.read()
+
+    results = []
+    for backend in backends:
+        number_symbol_table = SymbolTable()
+        identifier_symbol_table = SymbolTable()
+        tokens = []
+        error = None
+        try:
+            for token in get_backend(backend)(code_file if source is None else io.StringIO(source),
+                                              number_symbol_table, identifier_symbol_table):
+                tokens.append(token)
+        except Exception as e:
+            error = str(e)
+        results.append((tokens, number_symbol_table.to_list(),
+                        identifier_symbol_table.to_list(), error))
+
+        reference = results[0]
+        result = results[-1]
+        for i, (expected, got) in enumerate(zip(reference[0], result[0])):
+            if expected != got:
+                return f"token {i}: {backends[0]} {expected}, {backend} {got}"
+        if len(reference[0]) != len(result[0]):
+            return f"{backends[0]} yields {len(reference[0])} tokens, {backend} {len(result[0])}"
+        if reference[3] != result[3]:
+            return f"{backends[0]} error {reference[3]!r}, {backend} error {result[3]!r}"
+        if reference[1] != result[1] or reference[2] != result[2]:
+            return f"symbol tables differ between {backends[0]} and {backend}"
+
+    return None
+
+
+def run_scanner(code_file: str, verbose: bool = False, compact: bool = False, stats: Stats = None, backend: str = "dfa"):
+    """
+    Runs the scanner.
+
+    args
+        code_file: a str with the file location and name of the source code, or an open text file.
+        compact: store scanner_output in a TokenBuffer instead of a list of lists.
+        stats: optional Stats the scanner phase, characters, tokens and symbol table sizes are recorded in.
+        backend: one of BACKENDS, or "differential" to check the regex backend against the dfa one
+            first, raising if they differ.
+
+    returns
+        scanner_output: list of lists with tokenIDs in format [line, ID, (position in symbol table)]
+        number_symbol_table: list of numbers
+        identifier_symbol_table: list of identifiers
+    """
+    # empty number and identifier tables
+    number_symbol_table = SymbolTable()
+    identifier_symbol_table = SymbolTable()
+
+    if backend == "differential":
+        if not isinstance(code_file, str):
+            code_file = io.StringIO(code_file.read())
+        difference = diff_backends(code_file)
+        if difference is not None:
+            raise Exception(f"SCANNER BACKENDS DIFFER: {difference}")
+        if not isinstance(code_file, str):
+            code_file.seek(0)
+        backend = "regex"
+
+    # scanner output
+    with stats.phase("scanner") if stats is not None else nullcontext():
+        tokens = get_backend(backend)(code_file, number_symbol_table,
+                                      identifier_symbol_table, verbose, stats=stats)
+        scanner_output = TokenBuffer(tokens) if compact else list(tokens)
+
+    if stats is not None:
+        stats.count("tokens", len(scanner_output))
+        stats.maximum("number_symbol_table_size", len(number_symbol_table))
+        stats.maximum("identifier_symbol_table_size",
+                      len(identifier_symbol_table))
+
     print("SCANNER DONE")
 
-    return scanner_output, number_symbol_table, identifier_symbol_table
+    return scanner_output, number_symbol_table.to_list(), identifier_symbol_table.to_list()
 
 
 # when called as a module, run whole program
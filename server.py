@@ -0,0 +1,185 @@
+import argparse
+import io
+import json
+import os
+import re
+import socketserver
+import sys
+import time
+
+import util.grammar as gram
+from parser import LL1
+from regex_scanner import iter_tokens
+from util.symbol_table import SymbolTable
+from util.token_dict import TOKENS
+from util.trace import Tracer
+
+GRAMMAR_TXT = os.path.join(os.path.dirname(__file__), "util", "grammar.txt")
+
+# line number at the end of scanner and parser error messages
+ERROR_LINE = re.compile(r"in line (\d+)")
+
+
+class SymbolTableTracer(Tracer):
+    """
+    Keeps the final symbol table LL1 accepts with.
+    """
+
+    def __init__(self):
+        self.symbol_table = None
+
+    def accept(self, symbol_table: list):
+        self.symbol_table = symbol_table
+
+
+class ParseServer:
+    """
+    Scans and parses requests against grammar tables loaded once for the life of the process.
+
+    Requests and responses are JSON objects. A request holds either "source" (the code itself) or
+    "path" (a source file), plus an optional "id" echoed back and "tokens": false to leave the
+    token list out of the response.
+    """
+
+    def __init__(self, grammar_file: str = GRAMMAR_TXT):
+        grammar, non_terminals, terminals, productions, parse_table = gram.load_grammar_tables(
+            grammar_file)
+        self.grammar = grammar
+        self.parse_table = gram.compile_parse_table(grammar, parse_table, TOKENS)
+
+    def check(self, request: dict) -> dict:
+        """
+        Scans and parses the source of a single request.
+
+        returns
+            response: dict with whether it passed, tokens, symbol tables, diagnostics and timings in seconds
+        """
+        response = {"id": request.get("id"), "passed": False, "tokens": [],
+                    "symbol_table": [], "numbers": [], "diagnostics": [],
+                    "scan_seconds": 0.0, "parse_seconds": 0.0}
+
+        start = time.perf_counter()
+        scanned = None  # time scanning ended
+        number_symbol_table = SymbolTable()
+        identifier_symbol_table = SymbolTable()
+        try:
+            if "source" in request:
+                code = io.StringIO(request["source"])
+            elif "path" in request:
+                code = request["path"]
+            else:
+                raise Exception("REQUEST: expected 'source' or 'path'")
+
+            scanner_output = list(iter_tokens(code, number_symbol_table, identifier_symbol_table))
+            scanned = time.perf_counter()
+            if request.get("tokens", True):
+                response["tokens"] = scanner_output
+
+            tracer = SymbolTableTracer()
+            LL1(self.grammar, self.parse_table, scanner_output,
+                identifier_symbol_table.to_list(), trace=tracer)
+            response["passed"] = True
+            response["symbol_table"] = tracer.symbol_table
+        except Exception as e:
+            response["diagnostics"].append(diagnostic(str(e)))
+        end = time.perf_counter()
+
+        if not response["symbol_table"]:  # failed, only the identifiers found are known
+            response["symbol_table"] = [[identifier, None, None]
+                                        for identifier in identifier_symbol_table]
+        response["numbers"] = number_symbol_table.to_list()
+
+        if scanned is None:  # failed while scanning
+            response["scan_seconds"] = end - start
+        else:
+            response["scan_seconds"] = scanned - start
+            response["parse_seconds"] = end - scanned
+
+        return response
+
+    def handle_line(self, line: str) -> str:
+        """
+        Answers one JSON-lines request with one JSON-lines response.
+        """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            response = {"id": None, "passed": False,
+                        "diagnostics": [diagnostic(f"REQUEST: invalid JSON: {e}")]}
+        else:
+            response = self.check(request)
+        return json.dumps(response) + "\n"
+
+    def serve_stdio(self, stdin=None, stdout=None):
+        """
+        Answers requests read from stdin, one per line, until EOF.
+
+        Anything else printed while parsing (e.g. parser error context) goes to stderr so stdout
+        only carries responses.
+        """
+        stdin = stdin if stdin is not None else sys.stdin
+        stdout = stdout if stdout is not None else sys.stdout
+        sys.stdout = sys.stderr
+        try:
+            for line in stdin:
+                if not line.strip():
+                    continue
+                stdout.write(self.handle_line(line))
+                stdout.flush()
+        finally:
+            sys.stdout = stdout
+
+    def serve_socket(self, socket_path: str):
+        """
+        Answers JSON-lines requests on a Unix socket, one connection at a time, until interrupted.
+        """
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    line = line.decode("utf-8")
+                    if not line.strip():
+                        continue
+                    self.wfile.write(server.handle_line(line).encode("utf-8"))
+                    self.wfile.flush()
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        with socketserver.UnixStreamServer(socket_path, Handler) as unix_server:
+            try:
+                unix_server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                os.unlink(socket_path)
+
+
+def diagnostic(message: str) -> dict:
+    """
+    Turns a scanner or parser error message into a diagnostic with its kind and line.
+    """
+    match = ERROR_LINE.search(message)
+    return {
+        "kind": message.split(":")[0].split(" ")[0],  # LEXICAL, SYNTAX, SEMANTIC, INPUT...
+        "line": int(match.group(1)) if match else None,
+        "message": message,
+    }
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Keep the C- scanner and parser warm and answer JSON-lines requests.")
+    arg_parser.add_argument("--socket", default=None,
+                            help="listen on this Unix socket instead of stdin/stdout")
+    arg_parser.add_argument("--grammar", default=GRAMMAR_TXT,
+                            help="grammar .txt file")
+    args = arg_parser.parse_args()
+
+    parse_server = ParseServer(args.grammar)
+    if args.socket:
+        parse_server.serve_socket(args.socket)
+    else:
+        parse_server.serve_stdio()
@@ -1,14 +1,44 @@
 # The transition table is an array made up of dictionaries, allowing whichever character is being read to be used as a key to return the state it must move to.
 # This file is used to generate that dictionary array based on a .csv file with the transition table.
 # This is done to reduce time spent in a manual task, it has no effect on the final scanner software component.
+# Run as a script it also generates lexer.py, a lexer with the table compiled into its code.
 import csv
+import os
+import re
+from array import array
+from contextlib import nullcontext
 
+# location of the transition table, independent of the working directory
+TRANSITIONS_CSV = os.path.join(os.path.dirname(__file__), 'transitions.csv')
 
-def create_transition_table():
+# identifier type groups
+WHITESPACE = [" ", "\t", "\n"]
+ACCEPTED_CHARS = ['!', '<', '>', '=', '+', '-', '*',
+                  '/', ',', ';', '(', ')', '[', ']', '{', '}']
+
+# scanner states with a meaning beyond the transition table
+IDENTIFIER_STATE = 10
+NUMBER_STATE = 11
+LAST_ACCEPTOR_STATE = 30
+COMMENT_END_STATE = 31
+FIRST_ERROR_STATE = 32
+
+# states that reach acceptor states with delims, nums or letters
+DELIM_ENDED_STATES = [10, 11, 13, 15, 17, 22]
+
+KEYWORDS = ['if', 'else', 'void', 'return',
+            'int', 'while', 'input', 'output']
+
+# error message of each error state, from FIRST_ERROR_STATE on
+ERROR_MESSAGES = ['Invalid Char', 'Identifiers cannot have numbers',
+                  'Numbers cannot have letters', "expected '='"]
+
+
+def create_transition_table(csv_path: str = 'util/transitions.csv'):
     transition_table = []
 
     # open file
-    with open('util/transitions.csv', encoding='utf-8-sig') as csvfile:
+    with open(csv_path, encoding='utf-8-sig') as csvfile:
         # create reader object named transitions
         transitions = csv.reader(csvfile, delimiter=',')
 
@@ -34,3 +64,517 @@ def create_transition_table():
             transition_table.append(transition_dict)
 
     return transition_table
+
+
+def char_key(char: str) -> str:
+    """
+    Gets the transition table column of a single (lowercased) char.
+
+    args
+        char: the character to identify
+
+    returns
+        'letter', 'digit', 'delim', the char itself if accepted, or 'bad_char'.
+    """
+    if char.isalpha():
+        return "letter"
+    elif char.isdigit():
+        return "digit"
+    elif char in WHITESPACE:
+        return "delim"
+    elif char in ACCEPTED_CHARS:
+        return char
+    else:
+        return "bad_char"
+
+
+class CharClassMap(dict):
+    """
+    str.translate table mapping each char to chr(column of its class).
+
+    Without char_classes the first 256 code points are filled in up front. With them, e.g. mapped
+    from shared memory, code points are only added as they are seen. Anything past them is
+    classified on first sight.
+    """
+
+    def __init__(self, keys: list, char_classes: bytes = None):
+        super().__init__()
+        self.keys = keys
+        self.char_classes = char_classes
+        if char_classes is None:
+            for i in range(256):
+                self[i] = chr(keys.index(char_key(chr(i))))
+
+    def __missing__(self, i: int) -> str:
+        if i < 256 and self.char_classes is not None:
+            self[i] = chr(self.char_classes[i])
+        else:
+            self[i] = chr(self.keys.index(char_key(chr(i))))
+        return self[i]
+
+
+class CompiledTransitionTable:
+    """
+    Integer form of the transition table.
+
+    attributes
+        keys: column names in transitions.csv order.
+        n_classes: number of columns (char classes).
+        transitions: flat array where transitions[state * n_classes + char_class] is the next state.
+        char_classes: 256 entry bytes mapping a latin-1 code point to its char class.
+        delim: char class used for EOF.
+    """
+
+    def __init__(self, keys: list, transitions, char_classes: bytes = None):
+        """
+        args
+            keys: column names in transitions.csv order.
+            transitions: flat transition table, any int sequence (array, shared memoryview...)
+            char_classes: 256 entry char classes, computed from keys if None.
+        """
+        self.keys = keys
+        self.n_classes = len(keys)
+        self.transitions = transitions
+        self.class_map = CharClassMap(keys, char_classes)
+        if char_classes is None:
+            char_classes = bytes(ord(self.class_map[i]) for i in range(256))
+        self.char_classes = char_classes
+        self.delim = keys.index("delim")
+
+    def classify(self, block: str) -> bytes:
+        """
+        Translates a block of source code into one char class per char.
+        """
+        return block.translate(self.class_map).encode('latin-1')
+
+
+def compile_transition_table(csv_path: str = TRANSITIONS_CSV, stats=None) -> CompiledTransitionTable:
+    """
+    Reads the transition table .csv and flattens it into a CompiledTransitionTable.
+
+    args
+        csv_path: location of the transition table .csv
+        stats: optional util.stats.Stats the build time is recorded in
+
+    returns
+        CompiledTransitionTable built from the .csv
+    """
+    with stats.phase("transition_table") if stats is not None else nullcontext():
+        with open(csv_path, encoding='utf-8-sig') as csvfile:
+            keys = next(csv.reader(csvfile, delimiter=','))
+        transitions = array('i', [row[key] for row in create_transition_table(
+            csv_path) for key in keys])
+        return CompiledTransitionTable(keys, transitions)
+
+
+# compiled tables shared by every scanner run, keyed by .csv location
+_compiled_transition_tables = {}
+
+
+def get_compiled_transition_table(csv_path: str = TRANSITIONS_CSV, stats=None) -> CompiledTransitionTable:
+    """
+    Builds the compiled transition table once and reuses it across calls.
+
+    args
+        csv_path: location of the transition table .csv
+        stats: optional util.stats.Stats, the build time is only recorded on the first call
+
+    returns
+        CompiledTransitionTable built from the .csv
+    """
+    if csv_path not in _compiled_transition_tables:
+        _compiled_transition_tables[csv_path] = compile_transition_table(
+            csv_path, stats)
+
+    return _compiled_transition_tables[csv_path]
+
+
+def lexical_error(text: str, start: int, line: int) -> str:
+    """
+    Walks the transition table from state 0 over text[start:] until it reaches an error state,
+    the end of text being read as a delimiter. Lets scanner backends that find tokens some other
+    way report errors exactly like the scanner.
+
+    args
+        text: lowercased source code
+        start: where the token with the error starts
+        line: line number at start
+
+    returns
+        the scanner's error message for the first error found
+    """
+    compiled_table = get_compiled_transition_table()
+    state = 0
+    identifier = ""
+    for i in range(start, len(text) + 1):
+        if i == len(text):
+            char = ""
+            char_class = compiled_table.delim
+        else:
+            char = text[i]
+            char_class = ord(compiled_table.class_map[ord(char)])
+        if char == "\n":
+            line += 1
+        state = compiled_table.transitions[state * compiled_table.n_classes + char_class]
+        identifier += char
+        if state >= FIRST_ERROR_STATE:
+            return f"LEXICAL ERROR: {ERROR_MESSAGES[state - FIRST_ERROR_STATE]}: '{identifier}' in line {line}"
+
+    raise ValueError(f"no lexical error in {text[start:]!r}")
+
+
+def lexer_action(state: int, target: int) -> tuple:
+    """
+    Classifies the transition from state to target.
+
+    returns
+        ('loop',), ('move', target), ('accept', target), ('reset',) or ('error', target)
+    """
+    if target == state or target == 0:
+        return ('loop',)
+    if target < IDENTIFIER_STATE:
+        return ('move', target)
+    if target <= LAST_ACCEPTOR_STATE:
+        return ('accept', target)
+    if target == COMMENT_END_STATE:
+        return ('reset',)
+    return ('error', target)
+
+
+def generate_lexer(csv_path: str = TRANSITIONS_CSV, csv_name: str = 'util/transitions.csv') -> str:
+    """
+    Generates the source of a lexer equivalent to scanner.iter_tokens.
+
+    Each state of the transition table becomes a branch of the scanning loop. The chars a state
+    loops on are consumed at once with a regex over the char classes of the block, and the rest
+    are dispatched by char class to hard-coded moves, tokens and errors. Single char tokens are
+    looked up straight from state 0 and keywords by dict.
+
+    Line numbers follow the scanner: a token ended by a newline is counted on the next line.
+    States that can never reach a token or an error (inside a comment) do not keep their text.
+    The end of an unterminated comment raises a lexical error, as in the scanner.
+
+    args
+        csv_path: location of the transition table .csv
+        csv_name: transition table named in the generated docstring
+
+    returns
+        source code of the generated module
+    """
+    with open(csv_path, encoding='utf-8-sig') as csvfile:
+        keys = next(csv.reader(csvfile, delimiter=','))
+    table = [[row[key] for key in keys] for row in create_transition_table(csv_path)]
+    delim = keys.index('delim')
+    literal_keys = [key for key in keys if key not in ('letter', 'digit', 'delim', 'bad_char')]
+
+    # whether a state's text can end up in a token or an error message
+    observed = set()
+    changed = True
+    while changed:
+        changed = False
+        for state, row in enumerate(table):
+            if state in observed:
+                continue
+            actions = [lexer_action(state, target) for target in row]
+            if any(action[0] in ('accept', 'error') or action[0] == 'move' and action[1] in observed
+                   for action in actions):
+                observed.add(state)
+                changed = True
+
+    def token(target: int, line: str, indent: str) -> list:
+        lines = [f"{indent}if verbose:",
+                 f"{indent}    print(identifier)"]
+        if target == IDENTIFIER_STATE:
+            lines += [f"{indent}token = KEYWORDS.get(identifier)",
+                      f"{indent}if token is None:",
+                      f"{indent}    yield [{line}, ID, intern_identifier(identifier)]",
+                      f"{indent}else:",
+                      f"{indent}    yield [{line}, token]"]
+        elif target == NUMBER_STATE:
+            lines.append(f"{indent}yield [{line}, NUM, intern_number(int(identifier))]")
+        else:
+            lines.append(f"{indent}yield [{line}, TOKEN_IDS[identifier]]")
+        return lines
+
+    def error(target: int, indent: str) -> list:
+        return [f"{indent}if opened:",
+                f"{indent}    code.close()",
+                f"{indent}raise Exception(f\"LEXICAL ERROR: {ERROR_MESSAGES[target - FIRST_ERROR_STATE]}: "
+                f"'{{identifier}}' in line {{line}}\")"]
+
+    def consume(state: int, target: int, newline: bool, indent: str) -> list:
+        lines = []
+        if state in observed or target in observed:
+            lines.append(f"{indent}identifier += buffer[pos]")
+        if newline:
+            lines.append(f'{indent}line += buffer[pos] == "\\n"')
+        if target < FIRST_ERROR_STATE:
+            lines.append(f"{indent}pos += 1")
+        return lines
+
+    lines = [
+        '"""',
+        f"C- lexer generated from {csv_name} by util/create_transition_table.py.",
+        "",
+        "Do not edit, regenerate with:",
+        "    python util/create_transition_table.py",
+        '"""',
+        "import re",
+        "",
+        "from util.create_transition_table import CharClassMap",
+        "from util.symbol_table import SymbolTable",
+        "from util.token_dict import create_token_dict",
+        "",
+        "# number of characters pulled from the source file per read, as in the scanner",
+        "BLOCK_SIZE = 1 << 16",
+        "",
+        "# transition table columns, a char class is the index of its column",
+        f"KEYS = {keys!r}",
+        "CLASS_MAP = CharClassMap(KEYS)",
+        "",
+        "TOKEN_IDS = create_token_dict()",
+        "ID = TOKEN_IDS['ID']",
+        "NUM = TOKEN_IDS['NUM']",
+        f"KEYWORDS = {{keyword: TOKEN_IDS[keyword] for keyword in {KEYWORDS!r}}}",
+    ]
+
+    # single char tokens accepted straight from state 0
+    single_chars = {}
+    for char_class, target in enumerate(table[0]):
+        if (keys[char_class] in literal_keys and lexer_action(0, target)[0] == 'accept'
+                and target not in DELIM_ENDED_STATES + [IDENTIFIER_STATE, NUMBER_STATE]):
+            single_chars[char_class] = keys[char_class]
+    lines += ["", "# single char tokens by char class, accepted straight from state 0",
+              "SINGLE_CHAR_TOKENS = {"]
+    lines += [f"    {char_class}: TOKEN_IDS[{key!r}]," for char_class, key in single_chars.items()]
+    lines += ["}", "", "# runs of the char classes each state loops on"]
+
+    loops = {}
+    for state, row in enumerate(table):
+        loop = [char_class for char_class, target in enumerate(row)
+                if lexer_action(state, target) == ('loop',)]
+        if loop:
+            loops[state] = loop
+            # the shorter of the char class set and its complement
+            others = [char_class for char_class in range(len(keys)) if char_class not in loop]
+            if len(others) < len(loop):
+                pattern = b'[^' + b''.join(re.escape(bytes([c])) for c in others) + b']*'
+                comment = f"all but {', '.join(keys[c] for c in others)}"
+            else:
+                pattern = b'[' + b''.join(re.escape(bytes([c])) for c in loop) + b']*'
+                comment = ', '.join(keys[c] for c in loop)
+            lines.append(f"RUN_{state} = re.compile({pattern!r}).match  # {comment}")
+
+    lines += [
+        "",
+        "",
+        "def iter_tokens(code_file: str, number_symbol_table: SymbolTable = None, identifier_symbol_table: SymbolTable = None, verbose: bool = False, stats=None):",
+        '    """',
+        "    Runs the lexer lazily, yielding the same tokens and errors as scanner.iter_tokens.",
+        "",
+        "    args",
+        "        code_file: a str with the file location and name of the source code, or an open text file.",
+        "        number_symbol_table: SymbolTable numbers are interned into while scanning.",
+        "        identifier_symbol_table: SymbolTable identifiers are interned into while scanning.",
+        "        stats: optional util.stats.Stats characters read are counted in.",
+        "",
+        "    yields",
+        "        tokenIDs in format [line, ID, (position in symbol table)], ending with the '$' token.",
+        '    """',
+        "    if number_symbol_table is None:",
+        "        number_symbol_table = SymbolTable()",
+        "    if identifier_symbol_table is None:",
+        "        identifier_symbol_table = SymbolTable()",
+        "",
+        "    intern_number = number_symbol_table.intern",
+        "    intern_identifier = identifier_symbol_table.intern",
+        "",
+        "    opened = isinstance(code_file, str)",
+        "    code = open(code_file) if opened else code_file",
+        "",
+        "    if verbose:",
+        '        print("RUNNING SCANNER")',
+        "",
+        "    buffer = \"\"",
+        "    classes = b\"\"  # char class of every char in buffer",
+        "    pos = end = 0",
+        "    identifier = \"\"",
+        "    state = 0",
+        "    line = 1",
+        "",
+        "    while True:",
+        "        if pos == end:",
+        "            buffer = code.read(BLOCK_SIZE).lower()",
+        "            if stats is not None:",
+        "                stats.count(\"chars\", len(buffer))",
+        "            if not buffer:",
+        "                break",
+        "            classes = buffer.translate(CLASS_MAP).encode('latin-1')",
+        "            pos = 0",
+        "            end = len(buffer)",
+    ]
+
+    def run(state: int, start: str, indent: str, current: int) -> list:
+        # consumes the chars state loops on from pos on, the text read since start belonging to it
+        lines = [f"{indent}pos = RUN_{state}(classes, {start}).end()"]
+        if state in observed and state != 0:
+            # the text is always empty in state 0
+            lines.append(f"{indent}identifier {'=' if current == 0 else '+='} buffer[start:pos]")
+        if delim in loops[state]:
+            lines.append(f'{indent}line += buffer.count("\\n", start, pos)')
+        return lines
+
+    def state_code(state: int, indent: str, current: int = None, entered: list = None) -> list:
+        """
+        Scanning code of one state. current is the value of the state variable when it differs from
+        state. entered are the char classes of the char just moved in with, still at pos, for moves
+        inlined into the state they come from.
+        """
+        row = table[state]
+        lines = []
+        current = state if current is None else current
+        if entered is not None:
+            if state in loops:
+                lines.append(f"{indent}start = pos")
+                lines += run(state, "pos + 1", indent, current)
+                if delim in entered and delim not in loops[state]:
+                    lines.append(f'{indent}line += buffer[start] == "\\n"')
+                lines += [f"{indent}if pos == end:",
+                          f"{indent}    state = {state}",
+                          f"{indent}    continue"]
+            else:
+                lines += consume(current, state, delim in entered, indent)
+                lines += [f"{indent}if pos == end:",
+                          f"{indent}    state = {state}",
+                          f"{indent}    continue"]
+        elif state in loops:
+            loop = loops[state]
+            if len(loop) == 1:
+                condition = f"classes[pos] == {loop[0]}"
+            else:
+                condition = f"classes[pos] in {tuple(loop)!r}"
+            lines += [f"{indent}if {condition}:",
+                      f"{indent}    start = pos"]
+            if delim in loop and (state == 0 or state not in observed):
+                # most whitespace is a single char, not worth a regex
+                lines += [f"{indent}    pos += 1",
+                          f"{indent}    if pos < end and {condition}:"]
+                lines += run(state, "pos", indent + "        ", current)
+                lines += [f"{indent}    else:",
+                          f'{indent}        line += buffer[start] == "\\n"']
+            else:
+                lines += run(state, "pos + 1", indent + "    ", current)
+            lines += [f"{indent}    if pos == end:",
+                      f"{indent}        continue"]
+
+        # char classes grouped by what they do, in column order
+        groups = {}
+        for char_class, target in enumerate(row):
+            action = lexer_action(state, target)
+            if action == ('loop',):
+                continue
+            if state == 0 and char_class in single_chars:
+                action = ('single_char',)
+            groups.setdefault(action, []).append(char_class)
+        # the biggest group needs no test
+        default = max(groups, key=lambda action: len(groups[action]))
+        branches = [action for action in groups if action != default] + [default]
+        if len(branches) > 1:
+            lines.append(f"{indent}char_class = classes[pos]")
+
+        for i, action in enumerate(branches):
+            char_classes = groups[action]
+            body = indent + "    "
+            if len(branches) == 1:
+                lines.append(f"{indent}# {', '.join(keys[c] for c in char_classes)}")
+                body = indent
+            elif action == default:
+                lines.append(f"{indent}else:  # {', '.join(keys[c] for c in char_classes)}")
+            else:
+                if action == ('single_char',):
+                    condition = "char_class in SINGLE_CHAR_TOKENS"
+                elif len(char_classes) == 1:
+                    condition = f"char_class == {char_classes[0]}"
+                else:
+                    condition = f"char_class in {tuple(char_classes)!r}"
+                lines.append(f"{indent}{'if' if i == 0 else 'elif'} {condition}:  "
+                             f"# {', '.join(keys[c] for c in char_classes)}")
+            newline = delim in char_classes
+
+            if action == ('single_char',):
+                lines += [f"{body}pos += 1",
+                          f"{body}if verbose:",
+                          f"{body}    print(buffer[pos - 1])",
+                          f"{body}yield [line, SINGLE_CHAR_TOKENS[char_class]]"]
+            elif action[0] == 'move':
+                target = action[1]
+                if entered is None:
+                    # go on scanning in target without another pass through the loop
+                    lines += state_code(target, body, current, char_classes)
+                else:
+                    lines += consume(state, target, newline, body)
+                    lines.append(f"{body}state = {target}")
+            elif action[0] == 'accept':
+                target = action[1]
+                if target in DELIM_ENDED_STATES:
+                    # the char ending the token is read again, but its newline already counts
+                    token_line = 'line + (buffer[pos] == "\\n")' if newline else "line"
+                else:
+                    lines += consume(state, target, newline, body)
+                    token_line = "line"
+                lines += token(target, token_line, body)
+                lines.append(f"{body}identifier = \"\"")
+                if current != 0:
+                    lines.append(f"{body}state = 0")
+            elif action[0] == 'reset':
+                lines += consume(state, COMMENT_END_STATE, newline, body)
+                lines.append(f"{body}identifier = \"\"")
+                if current != 0:
+                    lines.append(f"{body}state = 0")
+            else:
+                lines += consume(state, action[1], newline, body)
+                lines += error(action[1], body)
+        return lines
+
+    for state in range(len(table)):
+        lines += ["", f"        {'if' if state == 0 else 'elif'} state == {state}:"]
+        lines += state_code(state, "            ")
+
+    # EOF is read as a delimiter, following moves until a token, an error or a loop
+    lines += ["", "    # end of file, read as a delimiter"]
+    first = True
+    for state in range(1, len(table)):
+        seen = [state]
+        action = lexer_action(state, table[state][delim])
+        while action[0] == 'move' and action[1] not in seen:
+            seen.append(action[1])
+            action = lexer_action(action[1], table[action[1]][delim])
+
+        lines.append(f"    {'if' if first else 'elif'} state == {state}:")
+        first = False
+        indent = "        "
+        if action[0] == 'accept':
+            lines += token(action[1], "line", indent)
+        elif action[0] == 'error':
+            lines += error(action[1], indent)
+        elif action[0] == 'reset':
+            lines.append(f"{indent}pass")
+        else:
+            lines += [f"{indent}if opened:",
+                      f"{indent}    code.close()",
+                      f"{indent}raise Exception(f\"LEXICAL ERROR: Unexpected end of file in line {{line}}\")"]
+
+    lines += [
+        "",
+        "    if verbose:",
+        '        print("End of source code file.")',
+        "    if opened:",
+        "        code.close()",
+        "    yield [line, 30]  # add '$' token ID",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    with open('lexer.py', 'w') as f:
+        f.write(generate_lexer())
@@ -1,3 +1,17 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from array import array
+from contextlib import nullcontext
+
+# bump when the grammar analysis changes so cached tables are rebuilt
+CACHE_VERSION = 2
+
+# default location of cached grammar tables
+CACHE_DIR = os.path.join(os.path.dirname(__file__), ".cache")
+
+
 def get_grammar_from_txt(txt_name: str) -> tuple:
     """
     Turns a .txt file in the format "v1->p1 | ... | pn" into a dictionary for local processing.
@@ -86,7 +100,8 @@ def remove_unit_productions(grammar: dict, non_terminals: set) -> dict:
 def get_first_sets(grammar: dict, non_terminals: set) -> dict:
     """
     Gets first sets for each non-terminal symbol.
-    Goes in reverse order from keys to ensure other symbols have their first() sets complete.
+    Worklist algorithm: a non-terminal is only revisited when the first set of a symbol in one of its
+    productions changed, and the loop stops exactly at the fixed point.
 
     args
         grammar: previously built grammar dictionary
@@ -96,45 +111,72 @@ def get_first_sets(grammar: dict, non_terminals: set) -> dict:
         first_sets: dictionary of sets with each symbol's first set
     """
     first_sets = dict()  # Dictionary with first sets
+    users = dict()  # non-terminals whose productions contain each non-terminal
 
-    pending = set()  # Set with non-terminals pending to find first sets
-    # Iterate through keys in reverse order
-    # move in reverse order to reduce pending nt's
-    for symbol in list(grammar.keys())[::-1]:
-        current_set = set()
+    for symbol in grammar:
+        first_sets[symbol] = set()
+        users[symbol] = set()
+    for symbol in grammar:
         for production in grammar[symbol]:
-            first_symbol = production[0]
-            if first_symbol in non_terminals:   # if nt, first = first(nt)
-                if first_symbol in first_sets.keys():   # ensure first(nt) has been calculated before
-                    # first(X) = first(X) ∪ first(Y)
-                    current_set = current_set.union(first_sets[first_symbol])
-                else:
-                    # if first(nt) hasn't been calculated, add to pending
-                    pending.add(symbol)
-            else:
-                current_set.add(first_symbol)   # add terminal symbol
+            for rh_symbol in production:
+                if rh_symbol in non_terminals:
+                    users[rh_symbol].add(symbol)
 
-        first_sets[symbol] = current_set    # store current set in dict
+    # move in reverse order so most nt's find their dependencies already done
+    worklist = list(grammar.keys())
+    pending = set(worklist)  # nt's currently in worklist
+    while worklist:
+        symbol = worklist.pop()
+        pending.remove(symbol)
 
-    for symbol in pending:  # repeat for all pending nt's
         current_set = set()
         for production in grammar[symbol]:
-            first_symbol = production[0]
-            if first_symbol in non_terminals:
-                if first_symbol in first_sets.keys():
-                    current_set = current_set.union(first_sets[first_symbol])
-                else:
-                    pending.add(symbol)
-            else:
-                current_set.add(first_symbol)
-        first_sets[symbol] = current_set
+            current_set.update(first_of_sequence(
+                production, non_terminals, first_sets))
+
+        if current_set != first_sets[symbol]:
+            first_sets[symbol] = current_set
+            # revisit every nt whose productions read this first set
+            for user in users[symbol]:
+                if user not in pending:
+                    worklist.append(user)
+                    pending.add(user)
 
     return first_sets
 
 
+def first_of_sequence(symbols: list, non_terminals: set, first_sets: dict) -> set:
+    """
+    Gets the first set of a sequence of symbols, including ε only if every symbol can derive ε.
+
+    args
+        symbols: sequence of grammar symbols, ["ε"] for the empty production
+        non_terminals: set of all non-terminals in grammar
+        first_sets: dictionary of sets with each symbol's first set
+
+    returns
+        first: set of terminals, plus ε if the sequence is nullable
+    """
+    first = set()
+    for symbol in symbols:
+        if symbol == "ε":
+            continue
+        if symbol not in non_terminals:   # terminal, first(t) = {t}
+            first.add(symbol)
+            return first
+        first.update(first_sets[symbol])
+        first.discard("ε")
+        if "ε" not in first_sets[symbol]:
+            return first
+    first.add("ε")  # all symbols can derive ε
+    return first
+
+
 def get_follow_sets(grammar: dict, non_terminals: set, first_sets: dict) -> dict:
     """
     Gets follow sets for each non-terminal symbol.
+    Each A -> α B β adds first(β) to follow(B) once, and follow(A) flows into follow(B) when β can
+    derive ε. Those flows are propagated with a worklist until nothing changes.
 
     args
         grammar: previously built grammar dictionary
@@ -145,42 +187,39 @@ def get_follow_sets(grammar: dict, non_terminals: set, first_sets: dict) -> dict
         follow: dictionary of sets with each symbol's follow set
     """
     follow = dict()
+    flows_to = dict()  # follow(key) ⊆ follow(symbol) for symbol in flows_to[key]
 
     # initialize empty follow sets
     for symbol in non_terminals:
         follow[symbol] = set()
-    # run through grammar 5 times to ensure all follows are accounted for
-    for n in range(5):
-        for i, key in enumerate(list(grammar.keys())):
-            if i == 0:
-                # add $ follow to starting symbol in grammar
-                follow[key].add("$")
-            for production in grammar[key]:
-                for j, symbol in enumerate(production):  # go through each symbol
-                    if symbol in non_terminals:
-                        if j == len(production) - 1:
-                            follow[symbol] = follow[symbol].union(follow[key])
-                            break
-                        for follow_symbol in production[j+1:]:
-                            ended_eps = False
-                            if follow_symbol not in non_terminals:
-                                follow[symbol].add(follow_symbol)
-                                break
-                            elif "ε" in first_sets[follow_symbol]:
-                                follow[symbol] = follow[symbol].union(
-                                    first_sets[follow_symbol])
-                                ended_eps = True
-                            else:
-                                follow[symbol] = follow[symbol].union(
-                                    first_sets[follow_symbol])
-                                break
-                        if ended_eps:
-                            follow[symbol] = follow[symbol].union(follow[key])
-
-    # remove epsilons
-    for symbol in follow:
-        if "ε" in follow[symbol]:
-            follow[symbol].remove("ε")
+        flows_to[symbol] = set()
+
+    for i, key in enumerate(grammar):
+        if i == 0:
+            # add $ follow to starting symbol in grammar
+            follow[key].add("$")
+        for production in grammar[key]:
+            for j, symbol in enumerate(production):  # go through each symbol
+                if symbol in non_terminals:
+                    rest_first = first_of_sequence(
+                        production[j+1:], non_terminals, first_sets)
+                    if "ε" in rest_first:
+                        rest_first.remove("ε")
+                        if symbol != key:
+                            flows_to[key].add(symbol)
+                    follow[symbol].update(rest_first)
+
+    worklist = list(grammar.keys())
+    pending = set(worklist)  # nt's currently in worklist
+    while worklist:
+        key = worklist.pop()
+        pending.remove(key)
+        for symbol in flows_to[key]:
+            if not follow[key] <= follow[symbol]:
+                follow[symbol].update(follow[key])
+                if symbol not in pending:
+                    worklist.append(symbol)
+                    pending.add(symbol)
 
     return follow
 
@@ -224,13 +263,13 @@ def get_first_plus_sets(grammar: dict, non_terminals: set, first_sets: dict, fol
                             first_sets[symbol])
                         break
                     else:   # add first set without epsilon, remain in loop
-                        nt_first = first_sets[symbol]
-                        nt_first.remove("ε")
+                        # copy without ε, first_sets must not be modified
+                        nt_first = first_sets[symbol].difference({"ε"})
                         first_plus[production_key] = nt_first.union(
                             first_plus[production_key])
 
                         if j == len(production) - 1:    # if last symbol is nt with ε
-                            first_plus[production_key] = first_sets[symbol].union(
+                            first_plus[production_key] = nt_first.union(
                                 follow_sets[key])
 
     return first_plus
@@ -319,6 +358,360 @@ def create_parse_table(grammar: dict, terminals: set, first_plus_sets: dict, ver
     return parse_table
 
 
+class CompiledParseTable:
+    """
+    Integer form of the LL(1) parse table.
+
+    Terminals are numbered by their position in tokens + 1, matching the scanner token IDs, and
+    non-terminals are numbered after them in grammar order, so the parse stack and the table only
+    ever hold ints.
+
+    attributes
+        symbols: list with the name of each symbol ID, 'ε' at 0
+        ids: dict from symbol name to symbol ID
+        nt_base: ID of the first non-terminal, the start symbol
+        n_columns: number of columns in table, one per token ID
+        table: flat array where table[(nt - nt_base) * n_columns + token] is the production number, 0 on ERROR
+        productions: dict of productions in {n: [lhs, rhs...]} format with symbol IDs, ε as 0
+        expansions: list where expansions[n] is the tuple of RHS IDs of production n to push on
+            the stack, already reversed and without ε
+    """
+
+    EPSILON = 0
+
+    def __init__(self, symbols: list, nt_base: int, table, productions: dict, expansions: list = None,
+                 ids: dict = None):
+        """
+        args
+            symbols: list with the name of each symbol ID, 'ε' at 0
+            nt_base: ID of the first non-terminal
+            table: flat parse table, any int sequence (array, shared memoryview...)
+            productions: dict of productions in {n: [lhs, rhs...]} format with symbol IDs
+            expansions: expansions of productions if already built, e.g. in shared memory
+            ids: symbol IDs by name if already built
+        """
+        self.symbols = symbols
+        self.ids = ids if ids is not None else {symbol: i for i, symbol in enumerate(symbols)}
+        self.nt_base = nt_base
+        self.n_columns = nt_base
+        self.table = table
+
+        self.productions = productions
+        self.expansions = expansions
+        if expansions is None:
+            self.expansions = [()] * (len(productions) + 1)
+            for n, production in productions.items():
+                self.expansions[n] = tuple(
+                    symbol for symbol in production[:0:-1] if symbol != self.EPSILON)
+
+    def named_productions(self) -> dict:
+        """
+        Productions with symbol names, the same as enumerate_productions on the grammar.
+        """
+        return {n: [self.symbols[symbol] for symbol in production]
+                for n, production in self.productions.items()}
+
+
+def compile_parse_table(grammar: dict, parse_table: dict, tokens: list) -> CompiledParseTable:
+    """
+    Numbers terminals and non-terminals and flattens the parse table into an int array.
+
+    args
+        grammar: previously built grammar dictionary
+        parse_table: dictionary of dictionaries from create_parse_table
+        tokens: every terminal and '$', ordered by scanner token ID
+
+    returns
+        CompiledParseTable for the grammar
+    """
+    symbols = ['ε'] + list(tokens) + list(grammar.keys())
+    ids = {symbol: i for i, symbol in enumerate(symbols)}
+    nt_base = len(tokens) + 1
+    n_columns = nt_base  # one column per token ID, 0 unused
+
+    table = array('i', [0] * (len(grammar) * n_columns))
+    for nt in grammar:
+        row = (ids[nt] - nt_base) * n_columns
+        for t, production_number in parse_table[nt].items():
+            if isinstance(production_number, int):  # anything else is an ERROR
+                table[row + ids[t]] = production_number
+
+    productions = {}
+    for n, production in enumerate_productions(grammar).items():
+        productions[n] = [ids[symbol] for symbol in production]
+
+    return CompiledParseTable(symbols, nt_base, table, productions)
+
+
+def grammar_hash(txt_name: str) -> str:
+    """
+    Hashes the contents of a grammar .txt together with CACHE_VERSION.
+    """
+    with open(txt_name, "rb") as f:
+        digest = hashlib.sha256(f.read())
+    digest.update(str(CACHE_VERSION).encode())
+    return digest.hexdigest()
+
+
+def build_grammar_tables(txt_name: str, stats=None) -> tuple:
+    """
+    Reads a grammar and runs the whole analysis up to the parse table.
+
+    args
+        txt_name: location of the grammar .txt file
+        stats: optional util.stats.Stats the time of every step is recorded in
+
+    returns
+        grammar, non_terminals, terminals, productions and parse_table
+    """
+    phase = stats.phase if stats is not None else (lambda name: nullcontext())
+
+    with phase("grammar_read"):
+        grammar, non_terminals, terminals = get_grammar_from_txt(txt_name)
+    with phase("first_sets"):
+        first_sets = get_first_sets(grammar, non_terminals)
+    with phase("follow_sets"):
+        follow_sets = get_follow_sets(grammar, non_terminals, first_sets)
+    with phase("first_plus_sets"):
+        first_plus_sets = get_first_plus_sets(
+            grammar, non_terminals, first_sets, follow_sets)
+    productions = enumerate_productions(grammar)
+    with phase("parse_table"):
+        parse_table = create_parse_table(grammar, terminals, first_plus_sets)
+
+    return grammar, non_terminals, terminals, productions, parse_table
+
+
+def load_grammar_tables(txt_name: str, cache_dir: str = CACHE_DIR, stats=None) -> tuple:
+    """
+    Same as build_grammar_tables, cached on disk under the hash of the grammar.
+    Editing the grammar changes its hash, so the tables are rebuilt automatically.
+
+    args
+        txt_name: location of the grammar .txt file
+        cache_dir: directory for cached tables
+        stats: optional util.stats.Stats, records the cache load or every build step
+
+    returns
+        grammar, non_terminals, terminals, productions and parse_table
+    """
+    phase = stats.phase if stats is not None else (lambda name: nullcontext())
+
+    cache_file = os.path.join(
+        cache_dir, f"grammar-{grammar_hash(txt_name)}.pickle")
+
+    try:
+        with phase("grammar_cache_load"), open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass  # missing or unreadable cache, rebuild it
+
+    tables = build_grammar_tables(txt_name, stats)
+
+    # write to a temporary file first so concurrent runs never read half a cache
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+
+    return tables
+
+
+# names of punctuation terminals in generated code
+TERMINAL_NAMES = {
+    "(": "LPAREN", ")": "RPAREN", "[": "LBRACKET", "]": "RBRACKET", "{": "LBRACE", "}": "RBRACE",
+    ";": "SEMI", ",": "COMMA", "=": "ASSIGN", "==": "EQ", "!=": "NE", "<": "LT", "<=": "LE",
+    ">": "GT", ">=": "GE", "+": "PLUS", "-": "MINUS", "*": "TIMES", "/": "DIVIDE", "$": "EOF",
+}
+
+
+def terminal_constant(terminal: str) -> str:
+    return f"T_{TERMINAL_NAMES.get(terminal, terminal.upper())}"
+
+
+def non_terminal_name(nt: str) -> str:
+    return nt.replace("'", "_prime")
+
+
+def generate_parser(grammar: dict, first_plus_sets: dict, txt_name: str = "util/grammar.txt") -> str:
+    """
+    Generates the source of a recursive-descent parser equivalent to parser.LL1.
+
+    Each non-terminal becomes a function choosing its production by the current token, with the
+    FIRST+ sets in place of table lookups. Productions ending in their own non-terminal loop
+    instead of recursing. Matched IDs and brackets run the same semantic actions as LL1, and
+    errors are raised through the same handlers, so the messages are identical.
+
+    args
+        grammar: previously built grammar dictionary
+        first_plus_sets: dictionary of sets with each production's first plus set
+        txt_name: grammar file named in the generated docstring
+
+    returns
+        source code of the generated module
+    """
+    non_terminals = list(grammar.keys())
+    productions = enumerate_productions(grammar)
+
+    terminals = {"$"}
+    for nt in non_terminals:
+        for production in grammar[nt]:
+            terminals.update(
+                symbol for symbol in production if symbol not in grammar and symbol != "ε")
+    terminals = sorted(terminals)
+
+    lines = [
+        '"""',
+        f"Recursive-descent parser for C-, generated from {txt_name} by util/grammar.py.",
+        "",
+        "Do not edit, regenerate with:",
+        "    python util/grammar.py",
+        '"""',
+        "from parser import (check_identifier, handle_error_stack, handle_error_table,",
+        "                    initialize_symbol_table, last_fun_main)",
+        "from util.symbol_table import ScopedSymbolTable",
+        "from util.token_dict import TOKENS",
+        "",
+        "# scanner token IDs",
+    ]
+    for terminal in terminals:
+        lines.append(
+            f"{terminal_constant(terminal)} = TOKENS.index({terminal!r}) + 1")
+
+    lines += ["", "# non-terminal IDs, numbered after the tokens like in CompiledParseTable",
+              "NT_BASE = len(TOKENS) + 1"]
+    for i, nt in enumerate(non_terminals):
+        lines.append(f"N_{non_terminal_name(nt).upper()} = NT_BASE + {i}")
+
+    lines += ["", "# name of every symbol ID",
+              f"SYMBOLS = ['ε'] + TOKENS + {non_terminals!r}",
+              "", "# productions in {n: [production]} format, for error messages and tracers",
+              "PRODUCTIONS = {"]
+    for n, production in productions.items():
+        lines.append(f"    {n}: {production!r},")
+    lines.append("}")
+
+    # FIRST+ sets with more than two tokens are checked with a set lookup
+    first_plus_tokens = {}
+    set_constants = []
+    n = 1
+    for nt in non_terminals:
+        for production in grammar[nt]:
+            tokens = sorted(first_plus_sets[f"{nt}->{' '.join(production)}"].difference({"ε"}))
+            first_plus_tokens[n] = tokens
+            if len(tokens) > 2:
+                set_constants.append(
+                    f"FIRST_PLUS_{n} = frozenset(({', '.join(map(terminal_constant, tokens))}))")
+            n += 1
+    lines += ["", "# FIRST+ sets of the productions chosen by set lookup"] + set_constants
+
+    lines += [
+        "",
+        "",
+        "def parse(input, symbol_table: list, trace=None):",
+        '    """',
+        "    Parses input like parser.LL1 does, with the same semantic checks and errors.",
+        "    Nesting in the source is bounded by the Python recursion limit.",
+        "",
+        "    args",
+        "        input: list of lists from scanner output, or any indexable token sequence. Must not be empty.",
+        "        symbol_table: list of identifiers from scanner output",
+        "        trace: optional util.trace.Tracer. There is no parse stack, so step is never called.",
+        "",
+        "    returns",
+        "        bool indicating success.",
+        '    """',
+        "    symbol_table = initialize_symbol_table(symbol_table)",
+        "",
+        "    # Validate input, '$' is only ever the last token",
+        "    if input[0][1] == T_EOF:",
+        '        raise Exception("INPUT: code file cannot be empty")',
+        "",
+        "    current_scope = ScopedSymbolTable()  # accessible variables, one scope per block",
+        "",
+        "    pos = 0  # pointer to traverse input",
+        "    token = input[0][1]",
+        "    current_nt = 0  # non-terminal of the last production expanded",
+        "    production_number = 0",
+        "",
+        "    if trace is not None:",
+        "        trace.begin(SYMBOLS, PRODUCTIONS)",
+    ]
+
+    n = 1
+    for nt in non_terminals:
+        name = non_terminal_name(nt)
+        # a production ending in nt itself loops instead of recursing
+        loops = any(production[-1] == nt for production in grammar[nt])
+        branch_indent = "            " if loops else "        "
+        indent = branch_indent + "    "
+
+        lines += ["", f"    def {name}():",
+                  "        nonlocal pos, token, current_nt, production_number"]
+        if loops:
+            lines.append("        while True:")
+
+        for i, production in enumerate(grammar[nt]):
+            tokens = first_plus_tokens[n]
+            if len(tokens) > 2:
+                condition = f"token in FIRST_PLUS_{n}"
+            else:
+                condition = " or ".join(
+                    f"token == {terminal_constant(t)}" for t in tokens)
+            lines.append(f"{branch_indent}{'if' if i == 0 else 'elif'} {condition}:")
+            lines += [f"{indent}production_number = {n}",
+                      f"{indent}current_nt = N_{name.upper()}",
+                      f"{indent}if trace is not None:",
+                      f"{indent}    trace.production({n})"]
+
+            tail = loops and production[-1] == nt
+            for j, symbol in enumerate(production[:-1] if tail else production):
+                if symbol == "ε":
+                    continue
+                if symbol in grammar:
+                    lines.append(f"{indent}{non_terminal_name(symbol)}()")
+                    continue
+                if j > 0:  # a leading terminal was already checked choosing the production
+                    lines += [f"{indent}if token != {terminal_constant(symbol)}:",
+                              f"{indent}    handle_error_stack(SYMBOLS[token], input[pos][0], PRODUCTIONS, production_number)"]
+                lines += [f"{indent}if trace is not None:",
+                          f"{indent}    trace.match(token, current_nt)"]
+                if symbol == "ID":
+                    lines += [f"{indent}check_identifier(input, pos, SYMBOLS[current_nt],",
+                              f"{indent}                 symbol_table, current_scope, trace)"]
+                elif symbol == "{":
+                    lines.append(f"{indent}current_scope.push()")
+                elif symbol == "}":
+                    lines.append(f"{indent}current_scope.pop()")
+                lines += [f"{indent}pos += 1",
+                          f"{indent}token = input[pos][1]"]
+            if loops:
+                lines.append(f"{indent}{'continue' if tail else 'return'}")
+            n += 1
+
+        lines += [f"{branch_indent}else:",
+                  f"{indent}handle_error_table({nt!r}, SYMBOLS[token], input[pos][0])"]
+
+    lines += [
+        "",
+        f"    {non_terminal_name(non_terminals[0])}()",
+        "",
+        "    if token == T_EOF:  # program ended correctly",
+        "        if trace is not None:",
+        "            trace.accept(symbol_table)",
+        "        if last_fun_main(symbol_table):",
+        "            return True",
+        "        else:",
+        "            raise Exception(",
+        '                "SEMANTIC: Last function declaration must be void main(void){}")',
+        "    else:",
+        "        # did not end correctly",
+        "        raise Exception(f'TOP: Did not end on $, got {SYMBOLS[token]}')",
+    ]
+    return "\n".join(lines) + "\n"
+
+
 def write_to_file(filename: str, write: str):
     f = open(filename, "w")
     f.write(write)
@@ -341,3 +734,6 @@ if __name__ == "__main__":
     write_to_file("util/sets/FIRST+.txt", show_sets("FIRST+", first_plus_sets))
     parse_table = create_parse_table(
         grammar, terminals, first_plus_sets, verbose=True)
+
+    write_to_file("descent_parser.py",
+                  generate_parser(grammar, first_plus_sets))
@@ -0,0 +1,180 @@
+import hashlib
+import marshal
+import os
+import tempfile
+from collections import OrderedDict
+
+from util.create_transition_table import TRANSITIONS_CSV
+from util.grammar import CACHE_DIR, grammar_hash
+from util.token_stream import TokenBuffer
+
+# bump when the entry format changes, old entries are then never hit again
+RESULT_CACHE_VERSION = 1
+
+RESULTS_DIR = os.path.join(CACHE_DIR, "results")
+
+# default size bound of the cache directory
+MAX_BYTES = 64 * 2**20
+
+
+class ResultCache:
+    """
+    Disk cache of scanner and parser results, content addressed.
+
+    Entries are keyed by the hash of a source file's contents together with the grammar and
+    transition table versions, so editing a file, the grammar or transitions.csv never serves a
+    stale result. Each entry is one file holding the TokenBuffer columns as raw bytes and the
+    symbol tables and verdict marshalled.
+
+    The least recently used entries are deleted once the directory grows past max_bytes. Recency
+    is the entry's modification time, refreshed on every hit, so it survives between processes.
+    Processes sharing the directory scan it again before evicting, so together they stay within
+    max_bytes too.
+    """
+
+    def __init__(self, cache_dir: str = RESULTS_DIR, max_bytes: int = MAX_BYTES,
+                 grammar_file: str = None, csv_path: str = TRANSITIONS_CSV):
+        """
+        args
+            cache_dir: directory for cached results
+            max_bytes: size bound of the directory
+            grammar_file: grammar .txt the results were parsed with, util/grammar.txt if None
+            csv_path: transitions.csv the results were scanned with
+        """
+        if grammar_file is None:
+            grammar_file = os.path.join(os.path.dirname(__file__), "grammar.txt")
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+        version = hashlib.sha256(str(RESULT_CACHE_VERSION).encode())
+        version.update(grammar_hash(grammar_file).encode())
+        with open(csv_path, "rb") as f:
+            version.update(hashlib.sha256(f.read()).digest())
+        self.version = version.digest()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # {key: size in bytes}, least recently used first
+        self.entries = OrderedDict()
+        self.size = 0
+        # bytes put since the directory was last scanned, other processes may have written as many
+        self.unscanned = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self.scan()
+        self.evict()  # max_bytes may be lower than in the last run
+
+    def scan(self):
+        """
+        Reads the entries and their sizes back from the directory, which other processes sharing
+        the cache write to and evict from as well.
+        """
+        found = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".bin"):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue  # evicted by another process
+                found.append((stat.st_mtime, name[:-4], stat.st_size))
+
+        self.entries.clear()
+        self.size = 0
+        for mtime, key, size in sorted(found):
+            self.entries[key] = size
+            self.size += size
+        self.unscanned = 0
+
+    def key(self, code_file: str) -> str:
+        """
+        Hashes a source file's contents with the grammar and transition table versions.
+        """
+        digest = hashlib.sha256(self.version)
+        with open(code_file, "rb") as f:
+            digest.update(f.read())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.bin")
+
+    def get(self, key: str) -> dict:
+        """
+        Looks up a result.
+
+        returns
+            dict with the tokens (TokenBuffer), numbers, identifiers, whether it passed and its
+            first error, or None on a miss
+        """
+        try:
+            with open(self.path(key), "rb") as f:
+                lines, ids, positions, numbers, identifiers, passed, error = marshal.load(f)
+            os.utime(self.path(key))
+        except (OSError, EOFError, ValueError, TypeError):
+            # missing, evicted meanwhile or unreadable
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        if key in self.entries:
+            self.entries.move_to_end(key)
+
+        tokens = TokenBuffer()
+        tokens.lines.frombytes(lines)
+        tokens.ids.frombytes(ids)
+        tokens.positions.frombytes(positions)
+        return {"tokens": tokens, "numbers": numbers, "identifiers": identifiers,
+                "passed": passed, "error": error}
+
+    def put(self, key: str, tokens: TokenBuffer, numbers: list, identifiers: list, passed: bool, error: str = None):
+        """
+        Stores a result, evicting the least recently used entries if the cache grows too big.
+        """
+        data = marshal.dumps((tokens.lines.tobytes(), tokens.ids.tobytes(), tokens.positions.tobytes(),
+                              list(numbers), list(identifiers), passed, error))
+
+        # write to a temporary file first so concurrent runs never read half an entry
+        fd, tmp_file = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_file, self.path(key))
+
+        self.size += len(data) - self.entries.pop(key, 0)
+        self.entries[key] = len(data)
+        self.unscanned += len(data)
+
+        # every process only knows its own puts, so the directory is scanned again before evicting
+        # and every max_bytes // 16 bytes put, bounding what the other processes add meanwhile
+        if self.size > self.max_bytes or self.unscanned > self.max_bytes // 16:
+            self.scan()
+            self.evict()
+
+    def evict(self):
+        """
+        Deletes least recently used entries until the cache fits in max_bytes.
+        """
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            key, size = self.entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            try:
+                os.unlink(self.path(key))
+            except OSError:
+                pass  # already evicted by another process
+
+    def clear(self):
+        """
+        Deletes every entry.
+        """
+        for key in list(self.entries):
+            try:
+                os.unlink(self.path(key))
+            except OSError:
+                pass
+        self.entries.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self.entries), "bytes": self.size}
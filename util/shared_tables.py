@@ -0,0 +1,142 @@
+from array import array
+from multiprocessing import shared_memory
+
+from util.create_transition_table import CompiledTransitionTable
+from util.grammar import CompiledParseTable
+
+# size in bytes of every int in the shared block
+INT_SIZE = array('i').itemsize
+
+
+class SharedTables:
+    """
+    Compiled transition and parse tables placed in a single shared memory block, so worker
+    processes map the tables built by their parent instead of each building their own copy.
+
+    Every int array of both tables (transitions, parse table, productions and their expansions) is
+    stored back to back in the block, followed by the 256 char classes. The small metadata needed
+    to rebuild the table objects (column keys, symbol names and IDs, offsets) is kept in `layout`,
+    a plain dict that can be passed to workers as initargs, so workers never load the grammar.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, layout: dict, owner: bool):
+        self.shm = shm
+        self.layout = layout
+        self.owner = owner  # only the process that published the block unlinks it
+        self.buffer = shm.buf
+        ints = self.buffer[:layout["ints"] * INT_SIZE].cast('i')
+
+        regions = {}
+        for name, (start, end) in layout["regions"].items():
+            regions[name] = ints[start:end]
+        self.ints = ints
+
+        start = layout["ints"] * INT_SIZE
+        char_classes = bytes(self.buffer[start:start + 256])
+
+        self.transition_table = CompiledTransitionTable(
+            layout["keys"], regions["transitions"], char_classes)
+
+        # productions are stored flattened, production n spanning offsets[n - 1]:offsets[n]
+        offsets = regions["production_offsets"]
+        flat = regions["productions"]
+        productions = {}
+        for n in range(1, len(offsets)):
+            productions[n] = flat[offsets[n - 1]:offsets[n]]
+        # and so are expansions, from expansion 0
+        offsets = regions["expansion_offsets"]
+        flat = regions["expansions"]
+        expansions = [flat[offsets[n]:offsets[n + 1]] for n in range(len(offsets) - 1)]
+
+        self.parse_table = CompiledParseTable(
+            layout["symbols"], layout["nt_base"], regions["table"], productions, expansions,
+            layout["ids"])
+
+    @classmethod
+    def publish(cls, transition_table: CompiledTransitionTable, parse_table: CompiledParseTable):
+        """
+        Copies both tables into a new shared memory block.
+
+        args
+            transition_table: compiled scanner transition table
+            parse_table: compiled LL1 parse table
+
+        returns
+            SharedTables owning the block, call unlink() once every worker is done
+        """
+        offsets = array('i', [0])
+        flat = array('i')
+        for n in range(1, len(parse_table.productions) + 1):
+            flat.extend(parse_table.productions[n])
+            offsets.append(len(flat))
+
+        expansion_offsets = array('i', [0])
+        expansions = array('i')
+        for expansion in parse_table.expansions:
+            expansions.extend(expansion)
+            expansion_offsets.append(len(expansions))
+
+        arrays = [("transitions", array('i', transition_table.transitions)),
+                  ("table", array('i', parse_table.table)),
+                  ("productions", flat),
+                  ("production_offsets", offsets),
+                  ("expansions", expansions),
+                  ("expansion_offsets", expansion_offsets)]
+
+        regions = {}
+        n_ints = 0
+        for name, values in arrays:
+            regions[name] = (n_ints, n_ints + len(values))
+            n_ints += len(values)
+
+        shm = shared_memory.SharedMemory(
+            create=True, size=n_ints * INT_SIZE + 256)
+        for name, values in arrays:
+            start, end = regions[name]
+            shm.buf[start * INT_SIZE:end * INT_SIZE] = values.tobytes()
+        shm.buf[n_ints * INT_SIZE:n_ints * INT_SIZE +
+                256] = transition_table.char_classes
+
+        layout = {
+            "name": shm.name,
+            "ints": n_ints,
+            "regions": regions,
+            "keys": transition_table.keys,
+            "symbols": parse_table.symbols,
+            "ids": parse_table.ids,
+            "nt_base": parse_table.nt_base,
+        }
+        return cls(shm, layout, owner=True)
+
+    @classmethod
+    def attach(cls, layout: dict):
+        """
+        Maps a block published by another process.
+
+        args
+            layout: SharedTables.layout of the publishing process
+        """
+        # workers inherit the publisher's resource tracker, so the block is only tracked (and
+        # unlinked if leaked) once, however many workers attach
+        shm = shared_memory.SharedMemory(name=layout["name"])
+        return cls(shm, layout, owner=False)
+
+    def close(self):
+        """
+        Releases the views into the block and unmaps it from this process.
+        """
+        # views must be released before the mapping can be closed
+        self.transition_table = None
+        self.parse_table = None
+        self.ints.release()
+        self.ints = None
+        self.buffer = None
+        self.shm.close()
+
+    def unlink(self):
+        """
+        Closes and frees the block, only valid in the publishing process.
+        """
+        self.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,82 @@
+import json
+import time
+from contextlib import contextmanager
+
+
+class Stats:
+    """
+    Wall and CPU time per phase plus counters, filled in by the functions that take a `stats` argument
+    (scanner.run_scanner, parser.LL1, util.grammar.load_grammar_tables...).
+
+    Counters only ever grow and are summed when merging. Gauges (maximum stack depth, symbol table
+    size) keep the largest value seen.
+    """
+
+    def __init__(self):
+        self.phases = {}  # {name: {"wall_seconds", "cpu_seconds", "calls"}}
+        self.counters = {}
+        self.gauges = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Times the body of a with statement as phase `name`, adding up repeated calls.
+        """
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield self
+        finally:
+            phase = self.phases.setdefault(
+                name, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "calls": 0})
+            phase["wall_seconds"] += time.perf_counter() - wall
+            phase["cpu_seconds"] += time.process_time() - cpu
+            phase["calls"] += 1
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def maximum(self, name: str, value: int):
+        if value > self.gauges.get(name, value - 1):
+            self.gauges[name] = value
+
+    def merge(self, other):
+        """
+        Adds the phases and counters of another Stats (or its to_dict()) into this one.
+        """
+        if isinstance(other, Stats):
+            other = other.to_dict()
+        for name, other_phase in other["phases"].items():
+            phase = self.phases.setdefault(
+                name, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "calls": 0})
+            for key in phase:
+                phase[key] += other_phase[key]
+        for name, n in other["counters"].items():
+            self.count(name, n)
+        for name, value in other["gauges"].items():
+            self.maximum(name, value)
+
+    def to_dict(self) -> dict:
+        return {"phases": {name: dict(phase) for name, phase in self.phases.items()},
+                "counters": dict(self.counters), "gauges": dict(self.gauges)}
+
+    def to_json(self, indent: int = None) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "cminus") -> str:
+        """
+        Dumps the stats in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in ("wall_seconds", "cpu_seconds", "calls"):
+            name = f"{prefix}_phase_{metric}_total"
+            lines.append(f"# TYPE {name} counter")
+            for phase_name, phase in sorted(self.phases.items()):
+                lines.append(f'{name}{{phase="{phase_name}"}} {phase[metric]}')
+        for counter, n in sorted(self.counters.items()):
+            lines.append(f"# TYPE {prefix}_{counter}_total counter")
+            lines.append(f"{prefix}_{counter}_total {n}")
+        for gauge, value in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {prefix}_{gauge} gauge")
+            lines.append(f"{prefix}_{gauge} {value}")
+        return "\n".join(lines) + "\n"
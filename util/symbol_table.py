@@ -0,0 +1,114 @@
+class SymbolTable:
+    """
+    Interning symbol table for identifiers or numbers.
+
+    Entries keep the order they were first seen in and are numbered from 1, the same way
+    the scanner output refers to them in [line, ID, (position in symbol table)].
+    """
+
+    def __init__(self):
+        self.entries = []   # entries in order of appearance
+        self.positions = {}  # entry -> position in symbol table (1-indexed)
+
+    def intern(self, entry) -> int:
+        """
+        Adds entry if it is new.
+
+        args
+            entry: identifier or number to store
+
+        returns
+            position of entry in symbol table, 1-indexed
+        """
+        position = self.positions.get(entry)
+        if position is None:
+            self.entries.append(entry)
+            position = len(self.entries)
+            self.positions[entry] = position
+        return position
+
+    def to_list(self) -> list:
+        """
+        Exports the symbol table as a list of entries in order of appearance.
+        """
+        return list(self.entries)
+
+    def __contains__(self, entry) -> bool:
+        return entry in self.positions
+
+    def __getitem__(self, i: int):
+        return self.entries[i]
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class ScopedSymbolTable:
+    """
+    Stack of scopes, one hash map per block, from name to its [identifier, type(fun/var), return type or var scope] entry.
+
+    scopes[0] holds the global vars and functions, the rest are opened on each function's parameters and on every '{'.
+    A name declared again in an inner scope gets its own entry that shadows the outer one until its
+    scope is closed.
+
+    The global scope is a live index: globals are added to it as they are declared and every function
+    sees it by reference, so it is never rebuilt.
+    """
+
+    def __init__(self, global_scope: dict = None):
+        self.globals = global_scope if global_scope is not None else {}
+        self.scopes = [self.globals]
+
+    def enter_function(self):
+        """
+        Drops every scope but the globals and opens the scope for a function's params.
+        """
+        del self.scopes[1:]
+        self.push()
+
+    def declare_global(self, name: str, kind: str, type: str) -> list:
+        """
+        Adds an entry for name to the global scope.
+
+        returns
+            the new entry in format [identifier, type(fun/var), return type or var scope]
+        """
+        entry = [name, kind, type]
+        self.globals[name] = entry
+        return entry
+
+    def push(self):
+        self.scopes.append({})
+
+    def pop(self):
+        self.scopes.pop()
+
+    def declare(self, name: str, kind: str, type: str) -> list:
+        """
+        Adds an entry for name to the innermost scope.
+
+        returns
+            the new entry in format [identifier, type(fun/var), return type or var scope]
+        """
+        entry = [name, kind, type]
+        self.scopes[-1][name] = entry
+        return entry
+
+    def lookup(self, name: str) -> list:
+        """
+        Gets the innermost entry for name, None if it is not in scope.
+        """
+        for scope in reversed(self.scopes):
+            entry = scope.get(name)
+            if entry is not None:
+                return entry
+        return None
+
+    def __contains__(self, name: str) -> bool:
+        return self.lookup(name) is not None
+
+    def __repr__(self) -> str:
+        return ' > '.join(str(list(scope)) for scope in self.scopes)
@@ -0,0 +1,72 @@
+import sys
+
+
+class Node:
+    """
+    Parse tree node built by LL1 when called with build_tree=True.
+
+    Non-terminals hold the production they were expanded with and their children, terminals hold
+    the symbol table position of IDs and NUMs in value. Symbols are IDs, see CompiledParseTable.symbols.
+    """
+    __slots__ = ('symbol', 'line', 'value', 'production', 'children')
+
+    def __init__(self, symbol: int, line: int):
+        self.symbol = symbol
+        self.line = line
+        self.value = None
+        self.production = 0  # 0 for terminals
+        self.children = ()
+
+    def __repr__(self):
+        return f'Node({self.symbol}, line={self.line})'
+
+
+def iter_nodes(root: Node):
+    """
+    Walks the tree depth first, in source order.
+    """
+    nodes = [root]
+    while nodes:
+        node = nodes.pop()
+        yield node
+        nodes.extend(reversed(node.children))
+
+
+def show_tree(root: Node, symbols: list, identifiers: list = None, numbers: list = None) -> str:
+    """
+    Show tree in a readable format, one node per line indented by depth.
+
+    args
+        root: Node returned by LL1
+        symbols: list with the name of each symbol ID
+        identifiers: identifier symbol table, to show ID names instead of positions
+        numbers: number symbol table, to show NUM values instead of positions
+    """
+    s = ""
+    nodes = [(root, 0)]
+    while nodes:
+        node, depth = nodes.pop()
+        s += f"{'  ' * depth}{symbols[node.symbol]}"
+        if node.value is not None:
+            table = identifiers if symbols[node.symbol] == 'ID' else numbers
+            s += f" {table[node.value - 1] if table is not None else node.value}"
+        s += f"\t[line {node.line}]\n"
+        nodes.extend((child, depth + 1) for child in reversed(node.children))
+    return s
+
+
+def tree_memory(root: Node) -> dict:
+    """
+    Measures the memory held by a tree, nodes plus their children tuples.
+
+    returns
+        dict with the number of nodes, total bytes and bytes per node
+    """
+    nodes = 0
+    size = 0
+    for node in iter_nodes(root):
+        nodes += 1
+        size += sys.getsizeof(node)
+        if node.children:  # the empty tuple is shared
+            size += sys.getsizeof(node.children)
+    return {"nodes": nodes, "bytes": size, "bytes_per_node": size / nodes}
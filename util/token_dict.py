@@ -38,35 +38,38 @@ def create_token_dict():
     return token_dict
 
 
+# token by ID - 1, '$' closes the scanner output
+TOKENS = ["NUM",
+          "ID",
+          "if",
+          "else",
+          "void",
+          "return",
+          "int",
+          "while",
+          "input",
+          "output",
+          "!=",
+          "<",
+          "<=",
+          ">",
+          ">=",
+          "=",
+          "==",
+          "+",
+          "-",
+          "*",
+          "/",
+          ",",
+          ";",
+          "(",
+          ")",
+          "[",
+          "]",
+          "{",
+          "}",
+          "$"]
+
+
 def id_to_token(i: int) -> str:
-    keys = ["NUM",
-            "ID",
-            "if",
-            "else",
-            "void",
-            "return",
-            "int",
-            "while",
-            "input",
-            "output",
-            "!=",
-            "<",
-            "<=",
-            ">",
-            ">=",
-            "=",
-            "==",
-            "+",
-            "-",
-            "*",
-            "/",
-            ",",
-            ";",
-            "(",
-            ")",
-            "[",
-            "]",
-            "{",
-            "}",
-            "$"]
-    return keys[i - 1]
+    return TOKENS[i - 1]
@@ -0,0 +1,107 @@
+from array import array
+from collections import deque
+
+
+class TokenWindow:
+    """
+    Sliding window over a token iterator, indexed by absolute position like the scanner output list.
+
+    Only the tokens the parser can still look at are kept: `behind` tokens before the furthest
+    token read and `ahead` tokens of lookahead, so memory stays bounded for any input size.
+    """
+
+    def __init__(self, tokens, behind: int = 1, ahead: int = 3, on_token=None):
+        """
+        args
+            tokens: iterable of tokens in format [line, ID, (position in symbol table)]
+            behind: number of tokens to keep before the current one
+            ahead: number of tokens the parser may peek past the current one
+            on_token: optional function called with every token pulled from tokens
+        """
+        self.tokens = iter(tokens)
+        self.window = deque()
+        self.start = 0  # absolute position of window[0]
+        self.size = behind + ahead + 1
+        self.on_token = on_token
+
+    def __getitem__(self, i: int) -> list:
+        # pull tokens until position i is in the window
+        while i >= self.start + len(self.window):
+            try:
+                token = next(self.tokens)
+            except StopIteration:
+                raise IndexError(f'token {i} is past the end of input')
+            if self.on_token is not None:
+                self.on_token(token)
+            self.window.append(token)
+            # drop tokens the parser can no longer look back at
+            if len(self.window) > self.size:
+                self.window.popleft()
+                self.start += 1
+
+        if i < self.start:
+            raise IndexError(f'token {i} is no longer buffered')
+
+        return self.window[i - self.start]
+
+    def __len__(self) -> int:
+        """
+        Number of tokens pulled from the iterator so far.
+        """
+        return self.start + len(self.window)
+
+
+class TokenBuffer:
+    """
+    Compact token storage in three parallel array('i') columns: line, token ID and position in
+    symbol table (0 for tokens without one).
+
+    Indexing returns the token in the scanner output format, so LL1 can use it as its input directly.
+    """
+
+    def __init__(self, tokens=()):
+        """
+        args
+            tokens: iterable of tokens in format [line, ID, (position in symbol table)]
+        """
+        self.lines = array('i')
+        self.ids = array('i')
+        self.positions = array('i')
+        self.extend(tokens)
+
+    def append(self, token: list):
+        self.lines.append(token[0])
+        self.ids.append(token[1])
+        self.positions.append(token[2] if len(token) > 2 else 0)
+
+    def extend(self, tokens):
+        for token in tokens:
+            self.append(token)
+
+    def line(self, i: int) -> int:
+        return self.lines[i]
+
+    def token_id(self, i: int) -> int:
+        return self.ids[i]
+
+    def position(self, i: int) -> int:
+        return self.positions[i]
+
+    def to_list(self) -> list:
+        """
+        Exports the tokens as the list of lists returned by scanner.run_scanner.
+        """
+        return [list(token) for token in self]
+
+    def __getitem__(self, i: int) -> tuple:
+        position = self.positions[i]
+        if position:
+            return (self.lines[i], self.ids[i], position)
+        return (self.lines[i], self.ids[i])
+
+    def __iter__(self):
+        for i in range(len(self.ids)):
+            yield self[i]
+
+    def __len__(self) -> int:
+        return len(self.ids)
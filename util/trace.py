@@ -0,0 +1,237 @@
+import json
+import sys
+from collections import deque
+
+
+def format_symbol_table(symbol_table: list) -> str:
+    """
+    Formats a symbol table in a readable way, one tab separated entry per line.
+
+    args
+        symbol_table: list of identifiers in format [identifier, type(fun/var), return type or var scope]
+    """
+    return '\n'.join('\t'.join('None' if x is None else x for x in entry) for entry in symbol_table)
+
+
+class Tracer:
+    """
+    Trace hooks for parser.LL1. Every hook does nothing, subclass and override the events to record.
+
+    LL1 only calls hooks when it is given a tracer, and passes raw symbol IDs and its live stack, so
+    any formatting happens in the tracer and never when tracing is off.
+    """
+
+    def begin(self, symbols: list, productions: dict):
+        """
+        Called once before parsing.
+
+        args
+            symbols: list with the name of each symbol ID
+            productions: grammar productions in {n: [production]} format
+        """
+        self.symbols = symbols
+        self.productions = productions
+
+    def step(self, stack: list, token: int):
+        """
+        Called on every iteration with the stack of symbol IDs and the current token ID.
+        """
+
+    def match(self, token: int, nt: int):
+        """
+        Called when token is matched, nt being the non-terminal of the last production (0 if none).
+        """
+
+    def identifier(self, name: str):
+        """
+        Called with the name of every matched ID.
+        """
+
+    def production(self, production_number: int):
+        """
+        Called on every expansion.
+        """
+
+    def declare(self, entry: list):
+        """
+        Called with the [identifier, type(fun/var), return type or var scope] entry of every variable or param.
+        """
+
+    def scope(self, current_scope):
+        """
+        Called with the ScopedSymbolTable when a function declaration opens its scope.
+        """
+
+    def accept(self, symbol_table: list):
+        """
+        Called once the whole input was matched, with the final symbol table.
+        """
+
+
+class PrintTracer(Tracer):
+    """
+    Human-readable trace, one line per event.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+
+    def write(self, line: str):
+        print(line, file=self.stream)
+
+    def step(self, stack: list, token: int):
+        self.write(
+            f'stack: {[self.symbols[s] for s in stack]}\ttoken: {self.symbols[token]}')
+
+    def match(self, token: int, nt: int):
+        self.write(
+            f'matched {self.symbols[token]}. nt: {self.symbols[nt] if nt else ""}')
+
+    def identifier(self, name: str):
+        self.write(name)
+
+    def production(self, production_number: int):
+        production_symbols = self.productions[production_number]
+        self.write(f'{production_symbols[0]} -> {production_symbols[1:]}')
+
+    def declare(self, entry: list):
+        self.write(f'declared: {entry}')
+
+    def scope(self, current_scope):
+        self.write(f'current_scope: {current_scope}')
+
+    def accept(self, symbol_table: list):
+        self.write('-----------SUCCESS-----------')
+        if symbol_table:
+            self.write(format_symbol_table(symbol_table))
+
+
+class JSONLinesTracer(Tracer):
+    """
+    Machine-readable trace, one JSON object per event.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+
+    def write(self, event: dict):
+        self.stream.write(json.dumps(event) + '\n')
+
+    def step(self, stack: list, token: int):
+        self.write({'event': 'step', 'stack': [self.symbols[s] for s in stack],
+                    'token': self.symbols[token]})
+
+    def match(self, token: int, nt: int):
+        self.write({'event': 'match', 'token': self.symbols[token],
+                    'nt': self.symbols[nt] if nt else None})
+
+    def identifier(self, name: str):
+        self.write({'event': 'identifier', 'name': name})
+
+    def production(self, production_number: int):
+        production_symbols = self.productions[production_number]
+        self.write({'event': 'production', 'number': production_number,
+                    'lhs': production_symbols[0], 'rhs': production_symbols[1:]})
+
+    def declare(self, entry: list):
+        self.write({'event': 'declare', 'entry': entry})
+
+    def scope(self, current_scope):
+        self.write({'event': 'scope', 'scopes': [
+                   list(scope) for scope in current_scope.scopes]})
+
+    def accept(self, symbol_table: list):
+        self.write({'event': 'accept', 'symbol_table': symbol_table})
+
+
+class RingBufferTracer(Tracer):
+    """
+    Keeps only the last `size` events, unformatted, e.g. to show what led up to an error.
+    """
+
+    def __init__(self, size: int = 1000):
+        self.buffer = deque(maxlen=size)
+
+    def step(self, stack: list, token: int):
+        self.buffer.append(('step', tuple(stack), token))
+
+    def match(self, token: int, nt: int):
+        self.buffer.append(('match', token, nt))
+
+    def identifier(self, name: str):
+        self.buffer.append(('identifier', name))
+
+    def production(self, production_number: int):
+        self.buffer.append(('production', production_number))
+
+    def declare(self, entry: list):
+        self.buffer.append(('declare', list(entry)))
+
+    def scope(self, current_scope):
+        self.buffer.append(('scope', repr(current_scope)))
+
+    def accept(self, symbol_table: list):
+        self.buffer.append(('accept', len(symbol_table)))
+
+    def dump(self, stream=None):
+        """
+        Writes the buffered events in the PrintTracer format.
+        """
+        printer = PrintTracer(stream)
+        printer.begin(self.symbols, self.productions)
+        for event, *args in self.buffer:
+            if event == 'scope':
+                printer.write(f'current_scope: {args[0]}')
+            elif event == 'accept':
+                printer.write('-----------SUCCESS-----------')
+            else:
+                getattr(printer, event)(*args)
+
+
+class StatsTracer(Tracer):
+    """
+    Counts productions expanded, tokens matched and the maximum stack depth into a util.stats.Stats,
+    forwarding every event to another tracer if given.
+    """
+
+    def __init__(self, stats, tracer: Tracer = None):
+        self.stats = stats
+        self.tracer = tracer
+        self.max_stack_depth = 0
+
+    def begin(self, symbols: list, productions: dict):
+        super().begin(symbols, productions)
+        if self.tracer is not None:
+            self.tracer.begin(symbols, productions)
+
+    def step(self, stack: list, token: int):
+        if len(stack) > self.max_stack_depth:
+            self.max_stack_depth = len(stack)
+        if self.tracer is not None:
+            self.tracer.step(stack, token)
+
+    def match(self, token: int, nt: int):
+        self.stats.count("tokens_matched")
+        if self.tracer is not None:
+            self.tracer.match(token, nt)
+
+    def identifier(self, name: str):
+        if self.tracer is not None:
+            self.tracer.identifier(name)
+
+    def production(self, production_number: int):
+        self.stats.count("productions")
+        if self.tracer is not None:
+            self.tracer.production(production_number)
+
+    def declare(self, entry: list):
+        if self.tracer is not None:
+            self.tracer.declare(entry)
+
+    def scope(self, current_scope):
+        if self.tracer is not None:
+            self.tracer.scope(current_scope)
+
+    def accept(self, symbol_table: list):
+        if self.tracer is not None:
+            self.tracer.accept(symbol_table)